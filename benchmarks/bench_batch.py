@@ -0,0 +1,47 @@
+"""Order-file submission throughput: one order per request vs. batched and concurrent.
+
+    python -m benchmarks.bench_batch --orders 200 --rtt 0.05 --workers 1 4 8
+"""
+import argparse
+import csv
+import os
+import tempfile
+
+from benchmarks.common import LatencyExchange
+from src.batch_orders import submit_file
+from src.rate_limit import OrderRateLimiter, RateLimitedClient, WeightLimiter
+
+
+def write_orders(path, n):
+    with open(path, 'w', newline='') as fh:
+        w = csv.writer(fh)
+        w.writerow(['symbol', 'side', 'type', 'quantity', 'price'])
+        for i in range(n):
+            w.writerow(['BTCUSDT', 'BUY' if i % 2 else 'SELL', 'LIMIT', '0.001', 25000 + i])
+
+
+def run(path, rtt, workers, batch_size):
+    # real limits, fresh windows: every run starts with the full budget
+    client = RateLimitedClient(LatencyExchange(rtt), WeightLimiter(), OrderRateLimiter())
+    return submit_file(path, out=path + '.out', workers=workers, batch_size=batch_size, client=client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=200)
+    parser.add_argument('--rtt', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'orders.csv')
+    write_orders(path, args.orders)
+    print(f'orders={args.orders} rtt={args.rtt * 1000:.0f} ms')
+    cases = [('single orders, sequential', 1, 1)] + [(f'batches of 5, {w} workers', w, 5) for w in args.workers]
+    for label, workers, size in cases:
+        s = run(path, args.rtt, workers, size)
+        print(f'  {label:<28} {s["seconds"]:7.3f} s  {s["orders_per_sec"]:8.1f} orders/s  '
+              f'({s["requests"]} requests)')
+
+
+if __name__ == '__main__':
+    main()
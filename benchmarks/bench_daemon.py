@@ -0,0 +1,107 @@
+"""Command-to-wire latency: cold CLI process vs. forwarding to a warm ``serve`` daemon.
+
+    python -m benchmarks.bench_daemon --runs 10 --calls 1000 --rtt 0
+
+Cold runs pay interpreter start, the binance import and client setup per
+order. Warm CLI runs still start an interpreter but forward their argv over
+the socket. Scripted runs keep one socket open and only pay the round trip.
+"""
+import argparse
+import itertools
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ORDER = ['market', 'BTCUSDT', 'BUY', '0.01']
+
+
+class Exchange:
+    """Fake client sleeping ``rtt`` per order (no pandas import, unlike benchmarks.common)."""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+        self._ids = itertools.count(1)
+
+    def futures_create_order(self, **order):
+        time.sleep(self.rtt)
+        return dict(order, orderId=next(self._ids), status='NEW')
+
+
+def child(mode, rtt, path):
+    from src import config, daemon, main
+    with config.use_client(Exchange(rtt)):
+        if mode == 'serve':
+            daemon.serve(path)
+        else:
+            # the real CLI imports binance to build its client; the fake skips that, so pay it here
+            import binance.client  # noqa: F401
+            main.main(['--local'] + ORDER)
+
+
+def _spawn(args, env):
+    return subprocess.run([sys.executable] + args, env=env, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.DEVNULL, check=True)
+
+
+def timed_runs(args, env, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _spawn(args, env)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='CLI processes per path')
+    parser.add_argument('--calls', type=int, default=1000, help='orders over one open socket')
+    parser.add_argument('--rtt', type=float, default=0.0, help='fake exchange round trip in seconds')
+    parser.add_argument('--child', choices=['serve', 'cold'], help=argparse.SUPPRESS)
+    parser.add_argument('--socket', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.rtt, args.socket)
+
+    from src import daemon
+    path = os.path.join(tempfile.mkdtemp(), 'bench.sock')
+    env = dict(os.environ, BOT_SOCKET=path, BOT_LOG_FILE=os.devnull)
+    me = ['-m', 'benchmarks.bench_daemon', '--rtt', str(args.rtt), '--socket', path]
+
+    cold = timed_runs(me + ['--child', 'cold'], env, args.runs)
+
+    server = subprocess.Popen([sys.executable] + me + ['--child', 'serve'], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 60
+        while not daemon.running(path):
+            if time.monotonic() > deadline or server.poll() is not None:
+                raise RuntimeError('daemon did not start')
+            time.sleep(0.05)
+        warm = timed_runs(['-m', 'src.main'] + ORDER, env, args.runs)
+        with daemon.Connection(path) as conn:
+            scripted = []
+            for _ in range(args.calls):
+                start = time.perf_counter()
+                reply = conn.call({'argv': ORDER})
+                scripted.append(time.perf_counter() - start)
+            assert reply['ok'], reply
+            conn.call({'op': 'shutdown'})
+    finally:
+        server.wait(10)
+
+    def row(label, times):
+        print(f'  {label:<26} median {statistics.median(times) * 1000:8.2f} ms   '
+              f'max {max(times) * 1000:8.2f} ms   (n={len(times)})')
+
+    print(f'rtt={args.rtt * 1000:.1f} ms')
+    row('cold CLI process', cold)
+    row('CLI forwarded to daemon', warm)
+    row('open socket (scripted)', scripted)
+
+
+if __name__ == '__main__':
+    main()
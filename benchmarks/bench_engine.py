@@ -0,0 +1,47 @@
+"""Streaming engine throughput (ticks/s) with a grid, a TWAP and an OCO on one tape.
+
+    python -m benchmarks.bench_engine --rows 10000000 --chunk-rows 1000000
+"""
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import synthetic_ticks
+from src.advanced import tick_store
+from src.advanced.backtester import DATE_COLUMNS
+from src.advanced.engine import BacktestEngine, GridStrategy, OCOStrategy, TwapStrategy, iter_ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10**6)
+    parser.add_argument('--chunk-rows', type=int, default=10**6)
+    parser.add_argument('--levels', type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'historical_data.csv'
+        df = synthetic_ticks(args.rows)
+        prices = df['Execution Price']
+        lo, hi, first = prices.min(), prices.max(), prices.iloc[0]
+        df.to_csv(path, index=False)
+        del df, prices
+        tick_store.build_cache(path, parse_dates=DATE_COLUMNS)
+
+        for label, use_cache in (('columnar cache', True), ('csv chunks', False)):
+            engine = BacktestEngine([
+                GridStrategy(lo, hi, args.levels, 0.001),
+                TwapStrategy(1.0, 1000, every='1min'),
+                OCOStrategy('BUY', 0.01, first * 1.02, first * 0.98),
+            ])
+            tracemalloc.start()
+            _, stats = engine.run(iter_ticks(path, chunk_rows=args.chunk_rows, use_cache=use_cache))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{label:<15} {stats["ticks"]} ticks  {stats["seconds"]:7.3f} s  '
+                  f'{stats["ticks_per_sec"]:>14,.0f} ticks/s  peak alloc {peak / 2**20:7.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""Compare the vectorized grid fill engine against the legacy per-level loop.
+
+    python -m benchmarks.bench_grid --rows 100000 1000000 10000000 --levels 50
+"""
+import argparse
+
+import pandas as pd
+
+from benchmarks.common import synthetic_ticks, timed
+from src.advanced import backtester
+
+
+def legacy_grid_fills(df, grid_prices):
+    """The original ``iterrows`` implementation, kept as the baseline."""
+    out = []
+    for price in grid_prices:
+        filled_idx = None
+        buy_price_market = None
+        for idx, row in df.iterrows():
+            if float(row['Execution Price']) <= price:
+                filled_idx = idx
+                buy_price_market = float(row['Execution Price'])
+                break
+        if filled_idx is None:
+            continue
+        sell_price_market = None
+        for idx2 in range(filled_idx + 1, len(df)):
+            p2 = float(df.at[idx2, 'Execution Price'])
+            if p2 > buy_price_market:
+                sell_price_market = p2
+                break
+        if sell_price_market is None:
+            sell_price_market = float(df['Execution Price'].iloc[-1])
+        out.append((price, filled_idx, sell_price_market))
+    return out
+
+
+def run(rows, levels, loop_max_rows):
+    df = synthetic_ticks(rows)
+    prices = df['Execution Price'].to_numpy()
+    lo, hi = prices.min(), prices.max()
+    step = (hi - lo) / max(1, levels - 1)
+    grid_prices = [lo + i * step for i in range(levels)]
+
+    timings = {}
+    with timed(timings, 'vectorized'):
+        buy_idx, sell_market = backtester.grid_fills(prices, grid_prices)
+    if rows <= loop_max_rows:
+        with timed(timings, 'loop'):
+            expected = legacy_grid_fills(df, grid_prices)
+        filled = buy_idx < len(prices)
+        got = [(p, int(i), float(s)) for p, i, s, f in zip(grid_prices, buy_idx, sell_market, filled) if f]
+        assert got == expected, 'vectorized fills diverge from the loop'
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10**5, 10**6, 10**7])
+    parser.add_argument('--levels', type=int, default=50)
+    parser.add_argument('--loop-max-rows', type=int, default=10**5,
+                        help='skip the (slow) legacy loop above this size')
+    args = parser.parse_args()
+
+    rows = []
+    for n in args.rows:
+        t = run(n, args.levels, args.loop_max_rows)
+        rows.append({'rows': n, 'levels': args.levels, 'vectorized_s': t['vectorized'],
+                     'loop_s': t.get('loop'), 'speedup': t['loop'] / t['vectorized'] if 'loop' in t else None})
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
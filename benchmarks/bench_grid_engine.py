@@ -0,0 +1,86 @@
+"""Grid engine bookkeeping cost: fill events and reconcile passes over many levels and symbols.
+
+    python -m benchmarks.bench_grid_engine --symbols 4 --levels 500 --fills 2000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.advanced.grid_engine import BUY, SELL, GridEngine
+from src.rate_limit import OrderRateLimiter, RateLimitedClient, WeightLimiter
+
+
+class InstantExchange:
+    """Zero-latency client: acks batches, reports every acked order as open."""
+
+    def __init__(self):
+        self.next_id = 0
+        self.open = {}
+
+    def futures_place_batch_order(self, batchOrders):
+        out = []
+        for params in batchOrders:
+            self.next_id += 1
+            order = dict(params, orderId=self.next_id, status='NEW', clientOrderId=params['newClientOrderId'])
+            self.open.setdefault(params['symbol'], {})[self.next_id] = order
+            out.append(order)
+        return out
+
+    def futures_get_open_orders(self, symbol):
+        return list(self.open.get(symbol, {}).values())
+
+    def fill(self, symbol, oid):
+        self.open[symbol].pop(oid, None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=4)
+    parser.add_argument('--levels', type=int, default=500)
+    parser.add_argument('--fills', type=int, default=2000)
+    args = parser.parse_args()
+
+    ex = InstantExchange()
+    # unlimited limiters: measure the engine, not the pacing
+    client = RateLimitedClient(ex, WeightLimiter(capacity=10 ** 12), OrderRateLimiter(limits=((10 ** 12, 1),)))
+    engine = GridEngine(client, poll_interval=0)
+    symbols = ['SYM%dUSDT' % i for i in range(args.symbols)]
+    start = time.perf_counter()
+    books = [engine.add_grid(s, 100, 100 + args.levels - 1, args.levels, 1, mid=100 + args.levels // 2)
+             for s in symbols]
+    engine.flush()
+    batches = engine.stats['batches']
+    setup = time.perf_counter() - start
+
+    # walk each symbol's price up and down across its grid, one fill at a time
+    rng = np.random.default_rng(0)
+    handled = 0
+    start = time.perf_counter()
+    for _ in range(args.fills):
+        book = books[rng.integers(len(books))]
+        live = np.flatnonzero(book.order_id != 0)
+        sells = live[book.side[live] == SELL]
+        buys = live[book.side[live] == BUY]
+        pick = sells[0] if len(sells) and (rng.random() < 0.5 or not len(buys)) else buys[-1]
+        oid = int(book.order_id[pick])
+        ex.fill(book.symbol, oid)
+        engine.on_event({'e': 'ORDER_TRADE_UPDATE', 'o': {'i': oid, 'X': 'FILLED'}})
+        handled += engine.flush()
+    events = time.perf_counter() - start
+
+    start = time.perf_counter()
+    passes = 20
+    for _ in range(passes):
+        engine.reconcile()
+    reconcile = (time.perf_counter() - start) / passes
+
+    total = args.symbols * args.levels
+    print(f'symbols={args.symbols} levels={args.levels} ({total} total)')
+    print(f'  initial placement     {setup * 1000:8.1f} ms for {batches} batches')
+    print(f'  fill -> re-arm        {events / args.fills * 1e6:8.1f} us/fill   ({handled} orders placed)')
+    print(f'  reconcile pass        {reconcile * 1000:8.2f} ms over {total} levels')
+
+
+if __name__ == '__main__':
+    main()
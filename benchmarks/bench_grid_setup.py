@@ -0,0 +1,41 @@
+"""Grid initialization time: sequential orders vs batched concurrent placement.
+
+    python -m benchmarks.bench_grid_setup --levels 50 --rtt 0.05
+"""
+import argparse
+from unittest import mock
+
+from benchmarks.common import LatencyExchange, timed
+from src.advanced import grid_trading
+
+
+class SequentialExchange(LatencyExchange):
+    def __getattribute__(self, name):
+        if name == 'futures_place_batch_order':
+            raise AttributeError(name)
+        return super().__getattribute__(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', type=int, default=50)
+    parser.add_argument('--rtt', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=grid_trading.MAX_WORKERS)
+    args = parser.parse_args()
+
+    cases = {
+        'sequential': (SequentialExchange(args.rtt), 1, 1),
+        'batched': (LatencyExchange(args.rtt), grid_trading.BATCH_SIZE, args.workers),
+    }
+    t = {}
+    for label, (fake, batch_size, workers) in cases.items():
+        with mock.patch.object(grid_trading, 'get_client', lambda fake=fake: fake), timed(t, label):
+            grid_trading.start_grid('BTCUSDT', 25000, 35000, args.levels, 0.001,
+                                    batch_size=batch_size, max_workers=workers)
+        print(f'{label:<11} {t[label]:7.3f} s  requests={fake.requests}')
+    print(f'speedup {t["sequential"] / t["batched"]:.1f}x (ideal {args.levels * args.rtt:.2f}s -> '
+          f'{-(-args.levels // grid_trading.BATCH_SIZE) / args.workers * args.rtt:.2f}s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Caller-side cost of a log call: legacy synchronous handlers vs the queue pipeline.
+
+    python -m benchmarks.bench_logging --records 100000
+"""
+import argparse
+import io
+import logging
+import os
+import tempfile
+import time
+
+from src.log_pipeline import JsonFormatter, LogPipeline
+
+
+def legacy_logger(path):
+    """The original setup: text file + console + JSON file, all on the caller."""
+    log = logging.getLogger('bench.legacy')
+    text = logging.FileHandler(path)
+    text.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    console = logging.StreamHandler(io.StringIO())
+    console.setFormatter(text.formatter)
+    js = logging.FileHandler(path)
+    js.setFormatter(JsonFormatter())
+    for h in (text, console, js):
+        log.addHandler(h)
+    return log, lambda: [h.close() for h in (text, console, js)]
+
+
+def pipeline_logger(path):
+    pipe = LogPipeline(path, console=False)
+    log = logging.getLogger('bench.pipeline')
+    pipe.install(log)
+    return log, pipe.stop
+
+
+def measure(log, records, fstring):
+    lat = []
+    for i in range(records):
+        t0 = time.perf_counter_ns()
+        if fstring:
+            log.info(f'TWAP Progress: {i + 1}/{records} executed. OrderID: {i}')
+        else:
+            log.info('TWAP Progress: %d/%s executed. OrderID: %s', i + 1, records, i)
+        lat.append(time.perf_counter_ns() - t0)
+    lat.sort()
+    return lat[len(lat) // 2] / 1000, lat[int(len(lat) * 0.99)] / 1000, sum(lat) / 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, factory, fstring in (('legacy, f-string', legacy_logger, True),
+                                        ('pipeline, %-args', pipeline_logger, False)):
+            path = os.path.join(tmp, label.split(',')[0] + '.log')
+            log, close = factory(path)
+            log.propagate = False
+            log.setLevel(logging.INFO)
+            p50, p99, caller = measure(log, args.records, fstring)
+            t0 = time.perf_counter()
+            close()
+            drain = time.perf_counter() - t0
+            print(f'{label:<18} p50 {p50:7.2f} us   p99 {p99:7.2f} us   '
+                  f'caller total {caller:6.3f} s   drain {drain:6.3f} s')
+
+
+if __name__ == '__main__':
+    main()
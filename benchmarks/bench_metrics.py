@@ -0,0 +1,44 @@
+"""Per-call overhead of ``InstrumentedClient`` on a no-op client method.
+
+    python -m benchmarks.bench_metrics --calls 1000000
+"""
+import argparse
+import time
+
+from src.metrics import InstrumentedClient, LatencyHistogram, Metrics
+
+
+class NoopClient:
+    def futures_get_order(self, **params):
+        return params
+
+
+def per_call_ns(fn, calls):
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        fn(symbol='BTCUSDT', orderId=1)
+    return (time.perf_counter_ns() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=10**6)
+    args = parser.parse_args()
+
+    raw = NoopClient()
+    wrapped = InstrumentedClient(raw, Metrics())
+    bare = per_call_ns(raw.futures_get_order, args.calls)
+    timed = per_call_ns(wrapped.futures_get_order, args.calls)
+    h = LatencyHistogram()
+    start = time.perf_counter_ns()
+    for i in range(args.calls):
+        h.record(i & 0xFFFFF)
+    record = (time.perf_counter_ns() - start) / args.calls
+    print(f'calls={args.calls}')
+    print(f'  bare method          {bare:7.0f} ns/call')
+    print(f'  instrumented         {timed:7.0f} ns/call   overhead {timed - bare:6.0f} ns')
+    print(f'  histogram.record     {record:7.0f} ns/call')
+
+
+if __name__ == '__main__':
+    main()
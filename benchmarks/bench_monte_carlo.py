@@ -0,0 +1,53 @@
+"""Monte Carlo paths per second: batched 2-D evaluation vs. looping the single-path backtest.
+
+    python -m benchmarks.bench_monte_carlo --rows 1000000 --paths 5000 --length 1440 --workers 1 2 4
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import synthetic_ticks, timed
+from src.advanced import backtester, monte_carlo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10**6)
+    parser.add_argument('--paths', type=int, default=5000)
+    parser.add_argument('--length', type=int, default=1440, help='ticks per path')
+    parser.add_argument('--levels', type=int, default=20)
+    parser.add_argument('--loop-paths', type=int, default=200, help='paths for the per-path loop baseline')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    df = synthetic_ticks(args.rows)
+    prices = df['Execution Price'].to_numpy()
+    cases = {
+        'twap': {'total_qty': 1.0, 'intervals': 24, 'side': 'BUY'},
+        'grid': {'lower_price': float(prices[0] * 0.99), 'upper_price': float(prices[0] * 1.01),
+                 'levels': args.levels, 'qty_per_order': 0.001},
+    }
+    run = {'twap': lambda d, p: backtester.run_twap(d, bucket='time', **p)['pnl'],
+           'grid': lambda d, p: backtester.run_grid(d, **p)['total_pnl']}
+    print(f'rows={args.rows} paths={args.paths} length={args.length}')
+
+    ts = pd.date_range('2024-01-01', periods=args.length, freq='s')
+    for strategy, params in cases.items():
+        t = {}
+        paths = monte_carlo.bootstrap_paths(np.random.default_rng(0), prices, args.loop_paths, args.length)
+        with timed(t, 'loop'):
+            for row in paths:
+                run[strategy](pd.DataFrame({'Timestamp IST': ts, 'Execution Price': row}), params)
+        print(f'  {strategy}: per-path loop       {args.loop_paths / t["loop"]:10.0f} paths/s')
+        for w in args.workers:
+            with timed(t, w):
+                res = monte_carlo.run_monte_carlo(strategy, params, df=df, paths=args.paths,
+                                                  length=args.length, workers=w)
+            s = res['summary']
+            print(f'  {strategy}: batched, {w} workers  {args.paths / t[w]:10.0f} paths/s  '
+                  f'(p5 {s["quantiles"][0.05]:.4f}, p50 {s["quantiles"][0.5]:.4f}, p95 {s["quantiles"][0.95]:.4f})')
+
+
+if __name__ == '__main__':
+    main()
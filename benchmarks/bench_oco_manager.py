@@ -0,0 +1,71 @@
+"""REST calls per poll cycle: one place_oco loop per pair vs the shared OCOManager.
+
+    python -m benchmarks.bench_oco_manager --pairs 20 --symbols 3 --cycles 30
+"""
+import argparse
+import random
+from collections import Counter
+
+from src.advanced.oco_manager import OCOManager
+
+
+class CountingExchange:
+    def __init__(self):
+        self.orders = {}
+        self.calls = Counter()
+
+    def futures_create_order(self, **kwargs):
+        oid = len(self.orders) + 1
+        self.orders[oid] = {'orderId': oid, 'symbol': kwargs['symbol'], 'status': 'NEW'}
+        return dict(self.orders[oid])
+
+    def futures_get_open_orders(self, symbol):
+        self.calls['futures_get_open_orders'] += 1
+        return [dict(o) for o in self.orders.values() if o['symbol'] == symbol and o['status'] == 'NEW']
+
+    def futures_get_order(self, symbol, orderId):
+        self.calls['futures_get_order'] += 1
+        return dict(self.orders[orderId])
+
+    def futures_cancel_order(self, symbol, orderId):
+        self.calls['futures_cancel_order'] += 1
+        self.orders[orderId]['status'] = 'CANCELED'
+
+    def futures_cancel_orders(self, symbol, orderidlist):
+        self.calls['futures_cancel_orders'] += 1
+        for oid in orderidlist:
+            self.orders[oid]['status'] = 'CANCELED'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pairs', type=int, default=20)
+    parser.add_argument('--symbols', type=int, default=3)
+    parser.add_argument('--cycles', type=int, default=30)
+    args = parser.parse_args()
+
+    ex = CountingExchange()
+    mgr = OCOManager(ex)
+    symbols = [f'SYM{i}USDT' for i in range(args.symbols)]
+    for i in range(args.pairs):
+        mgr.place(symbols[i % len(symbols)], 'BUY', 0.001, 50000, 40000)
+
+    rng = random.Random(0)
+    for cycle in range(args.cycles):
+        # fill one random open leg now and then
+        if cycle % 3 == 2:
+            open_ids = [o['orderId'] for o in ex.orders.values() if o['status'] == 'NEW']
+            if open_ids:
+                ex.orders[rng.choice(open_ids)]['status'] = 'FILLED'
+        mgr.poll_once()
+
+    legacy = 2 * args.pairs * args.cycles
+    total = sum(ex.calls.values())
+    print(f'pairs={args.pairs} symbols={args.symbols} cycles={args.cycles}')
+    print(f'  place_oco per pair (upper bound): {legacy} futures_get_order calls')
+    print(f'  OCOManager: {total} calls {dict(ex.calls)}')
+    print(f'  reduction: {legacy / max(1, total):.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""Tick replay throughput of the simulated exchange with a resting grid.
+
+    python -m benchmarks.bench_sim_exchange --rows 10000000 --levels 50
+"""
+import argparse
+
+from benchmarks.common import synthetic_ticks, timed
+from src.advanced.sim_exchange import SimExchange
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10**6)
+    parser.add_argument('--levels', type=int, default=50)
+    args = parser.parse_args()
+
+    prices = synthetic_ticks(args.rows)['Execution Price'].to_numpy()
+    ex = SimExchange()
+    ex.load_tape(prices)
+    lo, hi = prices.min(), prices.max()
+    step = (hi - lo) / (args.levels + 1)
+    for i in range(1, args.levels + 1):
+        level = lo + i * step
+        side = 'BUY' if level < prices[0] else 'SELL'
+        ex.futures_create_order(symbol='BTCUSDT', side=side, type='LIMIT', quantity=0.001, price=round(level, 2))
+
+    t = {}
+    with timed(t, 'replay'):
+        ex.advance()
+    print(f'rows={args.rows} levels={args.levels} fills={len(ex.fills)}')
+    print(f'  replay {t["replay"]:.3f} s  ({args.rows / t["replay"]:,.0f} ticks/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Measure how the grid parameter sweep scales with worker processes.
+
+    python -m benchmarks.bench_sweep --rows 1000000 --workers 1 2 4 8
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import synthetic_ticks, timed
+from src.advanced import sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10**6)
+    parser.add_argument('--configs', type=int, default=64)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    df = synthetic_ticks(args.rows)
+    prices = df['Execution Price'].to_numpy()
+    lowers = np.linspace(prices.min(), np.median(prices), max(1, args.configs // 4))
+    tasks = sweep.build_tasks('grid', {
+        'lower_price': list(lowers), 'upper_price': [float(prices.max())], 'levels': [10, 25, 50, 100],
+        'qty_per_order': [0.001], 'slippage_pct': [0.02], 'fee_pct': [0.04],
+    })
+
+    t = {}
+    for w in args.workers:
+        with timed(t, w):
+            sweep.run_sweep('grid', tasks, df=df, workers=w)
+    base = t[args.workers[0]]
+    print(f'rows={args.rows} configs={len(tasks)}')
+    for w, secs in t.items():
+        print(f'  workers={w:<3} {secs:8.3f} s  speedup={base / secs:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Compare CSV parsing with warm loads from the columnar tick cache.
+
+    python -m benchmarks.bench_tick_store --rows 1000000
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.common import synthetic_ticks, timed
+from src.advanced import backtester, tick_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10**6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'historical_data.csv'
+        synthetic_ticks(args.rows).to_csv(path, index=False)
+
+        t = {}
+        with timed(t, 'read_csv'):
+            pd.read_csv(path, parse_dates=backtester.DATE_COLUMNS)
+        with timed(t, 'cache build (cold)'):
+            tick_store.build_cache(path, parse_dates=backtester.DATE_COLUMNS)
+        with timed(t, 'cache load (warm)'):
+            df = backtester.load_data(path, columns=backtester.TICK_COLUMNS)
+            df['Execution Price'].sum()
+
+    print(f'rows={args.rows}')
+    for label, secs in t.items():
+        print(f'  {label:<20} {secs * 1000:10.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Vectorized TWAP simulator timings, time-bucketed over the full history.
+
+    python -m benchmarks.bench_twap --rows 10000000 --slices 100 1000 5000
+"""
+import argparse
+
+from benchmarks.common import synthetic_ticks, timed
+from src.advanced import backtester
+
+
+def legacy_twap(df, total_qty, intervals, side='BUY', slippage_pct=0.02, fee_pct=0.04):
+    """The original ``iterrows`` first-N-rows loop, kept as the baseline."""
+    chunk = float(total_qty) / intervals
+    total_notional = total_fees = 0.0
+    for _, row in df.head(intervals).iterrows():
+        exec_price = backtester.apply_slippage(float(row['Execution Price']), side, slippage_pct)
+        total_notional += exec_price * chunk
+        total_fees += exec_price * chunk * (fee_pct / 100.0)
+    return total_notional / float(total_qty)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10**7)
+    parser.add_argument('--slices', type=int, nargs='+', default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    df = synthetic_ticks(args.rows)
+    print(f'rows={args.rows}')
+    for n in args.slices:
+        t = {}
+        with timed(t, 'time'):
+            backtester.run_twap(df, 1.0, n, bucket='time')
+        with timed(t, 'rows'):
+            res = backtester.run_twap(df, 1.0, n)
+        with timed(t, 'legacy'):
+            avg = legacy_twap(df, 1.0, n)
+        assert avg == res['avg_price']
+        print(f'  slices={n:<6} time-bucketed {t["time"] * 1000:8.2f} ms   first-N rows {t["rows"] * 1000:8.2f} ms'
+              f'   legacy loop {t["legacy"] * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Per-order validation cost: Decimal ``validate_quantity``/``validate_price`` vs the compiled validator.
+
+    python -m benchmarks.bench_validation --orders 200000
+"""
+import argparse
+import time
+
+from src.exchange_info import SymbolFilters
+from src.validation import OrderValidator, validate_price, validate_quantity
+
+SYMBOL = {
+    'symbol': 'BTCUSDT',
+    'filters': [
+        {'filterType': 'LOT_SIZE', 'minQty': '0.001', 'maxQty': '1000', 'stepSize': '0.001'},
+        {'filterType': 'PRICE_FILTER', 'minPrice': '556.80', 'maxPrice': '4529764', 'tickSize': '0.10'},
+    ],
+}
+
+
+def per_call_ns(fn, values):
+    start = time.perf_counter_ns()
+    for v in values:
+        fn(v)
+    return (time.perf_counter_ns() - start) / len(values)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=200000)
+    args = parser.parse_args()
+
+    qtys = [round(0.001 * (1 + i % 500), 3) for i in range(args.orders)]
+    prices = [round(30000 + 0.1 * (i % 1000), 1) for i in range(args.orders)]
+    filters = SymbolFilters(SYMBOL)
+    v = OrderValidator(filters)
+
+    rows = [
+        ('validate_quantity (raw dict)', per_call_ns(lambda q: validate_quantity(SYMBOL, q), qtys)),
+        ('validate_quantity (SymbolFilters)', per_call_ns(lambda q: validate_quantity(filters, q), qtys)),
+        ('OrderValidator.check_qty', per_call_ns(v.check_qty, qtys)),
+        ('OrderValidator.snap_qty', per_call_ns(v.snap_qty, qtys)),
+        ('validate_price (SymbolFilters)', per_call_ns(lambda p: validate_price(filters, p), prices)),
+        ('OrderValidator.check_price', per_call_ns(v.check_price, prices)),
+        ('OrderValidator.snap_price', per_call_ns(v.snap_price, prices)),
+    ]
+    print(f'orders={args.orders}')
+    for label, ns in rows:
+        print(f'  {label:<36} {ns:8.0f} ns/call')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Volume-profile build time (full and after an append) and the VWAP vs TWAP backtest.
+
+    python -m benchmarks.bench_volume_profile --rows 5000000 --append 100000 --slices 48
+"""
+import argparse
+import os
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import synthetic_ticks, timed
+from src.advanced.backtester import run_vwap
+from src.advanced.volume_profile import build_profile
+
+
+def with_volume(df, seed=1):
+    # heavier trading around the IST morning and evening sessions
+    rng = np.random.default_rng(seed)
+    hour = df['Timestamp IST'].dt.hour.to_numpy()
+    session = 1.0 + 4.0 * ((hour >= 9) & (hour < 11)) + 2.0 * ((hour >= 18) & (hour < 21))
+    df['Size Tokens'] = np.round(rng.exponential(session), 3)
+    df['Coin'] = np.where(rng.random(len(df)) < 0.5, 'BTC', 'ETH')
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5_000_000, help='one tick per second')
+    parser.add_argument('--append', type=int, default=100_000)
+    parser.add_argument('--slices', type=int, default=48)
+    args = parser.parse_args()
+
+    df = with_volume(synthetic_ticks(args.rows + args.append))
+    path = os.path.join(tempfile.mkdtemp(), 'ticks.csv')
+    df.iloc[:args.rows].to_csv(path, index=False)
+    mb = os.path.getsize(path) / 1e6
+    days = args.rows / 86400
+    print(f'rows={args.rows} ({days:.1f} days, {mb:.0f} MB)  append={args.append}')
+
+    t = {}
+    with timed(t, 'full build'):
+        build_profile(path)
+    with timed(t, 'cached, unchanged'):
+        build_profile(path)
+    with open(path, 'a') as fh:
+        fh.write(df.iloc[args.rows:].to_csv(index=False, header=False))
+    with timed(t, f'after +{args.append} rows'):
+        profile = build_profile(path)
+    with timed(t, 'uncached rebuild'):
+        build_profile(path, use_cache=False)
+    for label, seconds in t.items():
+        print(f'  {label:<22} {seconds * 1000:10.1f} ms')
+
+    day = df.iloc[-86400:].reset_index(drop=True)
+    with timed(t, 'backtest'):
+        res = run_vwap(day, total_qty=100, intervals=args.slices, slippage_pct=0.0, fee_pct=0.0, profile=profile)
+    print(f'  VWAP vs TWAP over the last day, {args.slices} slices ({t["backtest"] * 1000:.1f} ms):')
+    for name in ('vwap', 'twap'):
+        r = res[name]
+        print(f'    {name}: slippage {r["slippage_bps"]:7.3f} bps, max participation {r["max_participation"]:.4%}')
+
+
+if __name__ == '__main__':
+    main()
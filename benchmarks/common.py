@@ -0,0 +1,47 @@
+import itertools
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ticks(rows, start_price=30000.0, vol=0.0005, seed=0):
+    """Random-walk tick series shaped like ``data/historical_data.csv``."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, vol, int(rows))
+    prices = np.round(start_price * np.exp(np.cumsum(steps)), 2)
+    ts = pd.date_range('2024-01-01', periods=int(rows), freq='s')
+    return pd.DataFrame({'Timestamp IST': ts, 'Execution Price': prices})
+
+
+@contextmanager
+def timed(results, label):
+    start = time.perf_counter()
+    yield
+    results[label] = time.perf_counter() - start
+
+
+class LatencyExchange:
+    """Fake futures client that sleeps ``rtt`` seconds per request."""
+
+    def __init__(self, rtt=0.05):
+        self.rtt = rtt
+        self._ids = itertools.count(1)
+        self._calls = itertools.count(1)
+        self.requests = 0
+
+    def _ack(self, order):
+        return {'orderId': next(self._ids), 'status': 'NEW', **order}
+
+    def _round_trip(self):
+        self.requests = next(self._calls)
+        time.sleep(self.rtt)
+
+    def futures_create_order(self, **order):
+        self._round_trip()
+        return self._ack(order)
+
+    def futures_place_batch_order(self, batchOrders):
+        self._round_trip()
+        return [self._ack(o) for o in batchOrders]
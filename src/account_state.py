@@ -0,0 +1,260 @@
+"""Local account state kept current by the futures user-data stream.
+
+``AccountState`` is seeded from one REST snapshot (open orders, positions,
+balances). After that, ``ORDER_TRADE_UPDATE`` and ``ACCOUNT_UPDATE`` events
+are applied to it incrementally, so readers get orders, positions and
+balances from dicts instead of REST round trips. ``reconcile`` compares the
+local view against a fresh snapshot, reports any drift and, by default,
+adopts the exchange's view.
+"""
+import asyncio
+import threading
+from collections import OrderedDict
+
+from src.config import logger
+
+TERMINAL_STATUSES = ('FILLED', 'CANCELED', 'EXPIRED', 'REJECTED', 'EXPIRED_IN_MATCH')
+CLOSED_ORDERS_KEPT = 1000
+RECONCILE_INTERVAL = 60
+
+# ORDER_TRADE_UPDATE field -> REST order field
+_ORDER_FIELDS = {
+    's': 'symbol', 'c': 'clientOrderId', 'S': 'side', 'o': 'type', 'f': 'timeInForce',
+    'q': 'origQty', 'p': 'price', 'ap': 'avgPrice', 'sp': 'stopPrice', 'X': 'status',
+    'i': 'orderId', 'z': 'executedQty', 'R': 'reduceOnly', 'ps': 'positionSide', 'T': 'updateTime',
+}
+
+
+def order_from_event(o):
+    """REST-shaped order dict from the ``o`` payload of an ``ORDER_TRADE_UPDATE``."""
+    return {field: o[key] for key, field in _ORDER_FIELDS.items() if key in o}
+
+
+def _position_key(symbol, side=None):
+    return symbol.upper(), side or 'BOTH'
+
+
+class AccountState:
+    def __init__(self, client=None, closed_kept=CLOSED_ORDERS_KEPT):
+        self.client = client
+        self.orders = {}          # open orders by id
+        self.by_symbol = {}       # symbol -> {orderId: order}
+        self.closed = OrderedDict()
+        self.closed_kept = closed_kept
+        self.positions = {}       # (symbol, positionSide) -> position
+        self.balances = {}        # asset -> balance
+        self.synced = False
+        self.stats = {'events': 0, 'stale': 0, 'snapshots': 0, 'drift': 0}
+        self._lock = threading.RLock()
+        self._buffer = None
+
+    # -- reads: plain dict lookups, no REST -------------------------------
+
+    def order(self, order_id):
+        """Open or recently closed order by id, or None."""
+        return self.orders.get(order_id) or self.closed.get(order_id)
+
+    def open_orders(self, symbol=None):
+        if symbol is None:
+            return list(self.orders.values())
+        return list(self.by_symbol.get(symbol.upper(), {}).values())
+
+    def position(self, symbol, side=None):
+        return self.positions.get(_position_key(symbol, side))
+
+    def balance(self, asset='USDT'):
+        return self.balances.get(asset)
+
+    # -- writes ----------------------------------------------------------
+
+    def _put_order(self, order):
+        oid = order['orderId']
+        symbol = order.get('symbol', '').upper()
+        if order.get('status') in TERMINAL_STATUSES:
+            self.orders.pop(oid, None)
+            book = self.by_symbol.get(symbol)
+            if book is not None:
+                book.pop(oid, None)
+                if not book:
+                    del self.by_symbol[symbol]
+            self.closed[oid] = order
+            self.closed.move_to_end(oid)
+            while len(self.closed) > self.closed_kept:
+                self.closed.popitem(last=False)
+        else:
+            self.orders[oid] = order
+            self.by_symbol.setdefault(symbol, {})[oid] = order
+
+    def _put_position(self, position):
+        key = _position_key(position['symbol'], position.get('positionSide'))
+        if float(position.get('positionAmt') or 0) == 0:
+            self.positions.pop(key, None)
+        else:
+            self.positions[key] = position
+
+    def record_order(self, order):
+        """Track an order acknowledged by a REST call before its stream event arrives."""
+        oid = order.get('orderId')
+        if oid is None:
+            return
+        with self._lock:
+            # the stream may already have moved it on, even to ``closed``
+            current = self.order(oid)
+            if current is None:
+                self._put_order(dict(order))
+            elif int(order.get('updateTime') or 0) > int(current.get('updateTime') or 0):
+                self._put_order(dict(current, **order))
+
+    def load_snapshot(self, orders, positions, balances):
+        """Replace local state with a REST snapshot."""
+        with self._lock:
+            self.orders = {}
+            self.by_symbol = {}
+            for order in orders:
+                self._put_order(dict(order))
+            self.positions = {}
+            for position in positions:
+                self._put_position(dict(position))
+            self.balances = {b['asset']: dict(b) for b in balances}
+            self.synced = True
+            self.stats['snapshots'] += 1
+
+    def fetch_snapshot(self):
+        client = self.client
+        return (client.futures_get_open_orders(),
+                client.futures_position_information(),
+                client.futures_account_balance())
+
+    def sync(self):
+        """Seed from REST. Stream events that arrive meanwhile are replayed afterwards."""
+        with self._lock:
+            self._buffer = []
+        try:
+            snapshot = self.fetch_snapshot()
+        except Exception:
+            with self._lock:
+                self._buffer = None
+            raise
+        with self._lock:
+            self.load_snapshot(*snapshot)
+            pending, self._buffer = self._buffer, None
+            for event in pending:
+                self._apply(event)
+
+    def on_event(self, event):
+        """User-data stream handler (``UserDataStream.subscribe``)."""
+        with self._lock:
+            if self._buffer is not None:
+                self._buffer.append(event)
+                return
+            self._apply(event)
+
+    def _apply(self, event):
+        kind = event.get('e')
+        if kind == 'ORDER_TRADE_UPDATE':
+            order = order_from_event(event.get('o', {}))
+            if 'orderId' not in order:
+                return
+            current = self.order(order['orderId'])
+            if current is not None:
+                if int(current.get('updateTime') or 0) > int(order.get('updateTime') or 0):
+                    self.stats['stale'] += 1
+                    return
+                order = dict(current, **order)
+            self._put_order(order)
+        elif kind == 'ACCOUNT_UPDATE':
+            data = event.get('a', {})
+            for b in data.get('B', ()):
+                balance = dict(self.balances.get(b['a'], {'asset': b['a']}))
+                balance['balance'] = b.get('wb', balance.get('balance'))
+                balance['crossWalletBalance'] = b.get('cw', balance.get('crossWalletBalance'))
+                self.balances[b['a']] = balance
+            for p in data.get('P', ()):
+                self._put_position({'symbol': p['s'], 'positionSide': p.get('ps', 'BOTH'),
+                                    'positionAmt': p.get('pa'), 'entryPrice': p.get('ep'),
+                                    'unRealizedProfit': p.get('up')})
+        else:
+            return
+        self.stats['events'] += 1
+
+    # -- reconciliation --------------------------------------------------
+
+    def diff(self, orders, positions, balances):
+        """Differences between local state and a REST snapshot (empty dict when in sync)."""
+        drift = {}
+        remote = {o['orderId']: o for o in orders}
+        missing = sorted(set(remote) - set(self.orders))
+        unknown = sorted(set(self.orders) - set(remote))
+        changed = sorted(oid for oid in set(remote) & set(self.orders)
+                         if (remote[oid].get('status'), remote[oid].get('executedQty'))
+                         != (self.orders[oid].get('status'), self.orders[oid].get('executedQty')))
+        if missing:
+            drift['orders_missing'] = missing
+        if unknown:
+            drift['orders_unknown'] = unknown
+        if changed:
+            drift['orders_changed'] = changed
+        remote_pos = {_position_key(p['symbol'], p.get('positionSide')): float(p.get('positionAmt') or 0)
+                      for p in positions}
+        keys = set(self.positions) | {k for k, amt in remote_pos.items() if amt}
+        pos = sorted(k for k in keys
+                     if remote_pos.get(k, 0.0) != float(self.positions.get(k, {}).get('positionAmt') or 0))
+        if pos:
+            drift['positions'] = pos
+        bal = sorted(b['asset'] for b in balances
+                     if float(b.get('balance') or 0)
+                     != float(self.balances.get(b['asset'], {}).get('balance') or 0))
+        if bal:
+            drift['balances'] = bal
+        return drift
+
+    def reconcile(self, fix=True):
+        """Compare against a fresh REST snapshot; returns the drift found."""
+        snapshot = self.fetch_snapshot()
+        with self._lock:
+            drift = self.diff(*snapshot)
+            if drift:
+                self.stats['drift'] += 1
+                logger.warning('Account state drift: %s', drift)
+                if fix:
+                    self.load_snapshot(*snapshot)
+        return drift
+
+    async def reconcile_forever(self, interval=RECONCILE_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reconcile)
+            except Exception as e:
+                logger.warning('Account reconciliation failed: %s', e)
+
+    # -- wiring to the user-data stream ----------------------------------
+
+    def attach(self, stream):
+        """Feed ``stream`` events into this state and re-seed on every (re)connect."""
+        stream.subscribe(self.on_event)
+        stream.on_connect.append(lambda: asyncio.to_thread(self.sync))
+        return stream
+
+
+class AccountStateService:
+    """Runs a user-data stream plus the periodic reconciliation for an ``AccountState``."""
+
+    def __init__(self, client, stream=None, reconcile_interval=RECONCILE_INTERVAL):
+        from src.user_stream import UserDataStream
+        self.state = AccountState(client)
+        self.stream = self.state.attach(stream or UserDataStream(client))
+        self.reconcile_interval = reconcile_interval
+        self._task = None
+
+    async def start(self):
+        await self.stream.start()
+        self._task = asyncio.create_task(self.state.reconcile_forever(self.reconcile_interval))
+        return self.state
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.stream.stop()
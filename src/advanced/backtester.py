@@ -1,15 +1,41 @@
 import os
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
+from src.advanced import tick_store
 
 DATA_PATH = Path(__file__).parents[2] / 'data' / 'historical_data.csv'
+DATE_COLUMNS = ['Timestamp IST']
+# the simulators only ever read these two columns
+TICK_COLUMNS = ['Timestamp IST', 'Execution Price']
+# traded size per tick, used by the VWAP comparison when the history has it
+VOLUME_COLUMN = 'Size Tokens'
+# share of the history the VWAP comparison trains its volume profile on by default
+TRAIN_FRACTION = 0.7
 
 
-def load_data(path=DATA_PATH):
-    df = pd.read_csv(path, parse_dates=['Timestamp IST'])
-    return df
+def load_data(path=DATA_PATH, columns=None, use_cache=True):
+    """Load the tick history, optionally projected to ``columns``.
+
+    Goes through the memory-mapped columnar cache in ``tick_store`` and falls
+    back to parsing the CSV when the cache directory cannot be written.
+    """
+    if use_cache:
+        try:
+            return tick_store.load_frame(path, columns=columns, parse_dates=DATE_COLUMNS)
+        except OSError:
+            if not os.path.exists(path):
+                raise
+    parse_dates = [c for c in DATE_COLUMNS if columns is None or c in columns]
+    return pd.read_csv(path, usecols=columns, parse_dates=parse_dates)
+
+
+def sort_ticks(df):
+    """Order ticks by time, skipping the sort (and its copy) when already ordered."""
+    if df['Timestamp IST'].is_monotonic_increasing:
+        return df
+    return df.sort_values('Timestamp IST').reset_index(drop=True)
 
 
 def apply_slippage(price, side, slippage_pct):
@@ -20,116 +46,380 @@ def apply_slippage(price, side, slippage_pct):
         return price * (1.0 - s)
 
 
-def simulate_twap(total_qty, intervals, side='BUY', slippage_pct=0.02, fee_pct=0.04, out_dir=None):
-    df = load_data()
-    df = df.sort_values('Timestamp IST').reset_index(drop=True)
+def twap_slice_index(ts, intervals, bucket='rows', every=None):
+    """Row index of the tick each TWAP slice executes at.
+
+    ``bucket='rows'`` keeps the original behaviour (the first ``intervals``
+    ticks). ``bucket='time'`` splits the history into ``intervals``
+    equal wall-clock slices, or slices ``every`` apart (e.g. ``'5min'``). Each
+    slice then fills at the first tick at or after its start, found with one
+    ``searchsorted`` over the timestamps. Slices that start after the last
+    tick are dropped.
+    """
+    intervals = int(intervals)
+    n = len(ts)
+    if bucket == 'rows':
+        return np.arange(min(intervals, n))
+    if bucket != 'time':
+        raise ValueError(f'unknown TWAP bucket mode: {bucket}')
+    if n == 0:
+        return np.arange(0)
+    t = np.asarray(ts, dtype='datetime64[ns]').view('i8')
+    if every is not None:
+        edges = t[0] + np.arange(intervals, dtype=np.int64) * pd.Timedelta(every).value
+    else:
+        edges = t[0] + (np.arange(intervals, dtype=np.int64) * (t[-1] - t[0])) // intervals
+    idx = np.searchsorted(t, edges, side='left')
+    return idx[idx < n]
+
+
+def run_twap(df, total_qty, intervals, side='BUY', slippage_pct=0.02, fee_pct=0.04, bucket='rows', every=None):
+    """TWAP simulation over already loaded, time-ordered ticks; no charting.
+
+    Slices are priced as arrays; running totals use ``cumsum`` (sequential
+    accumulation), so results match the former per-row loop exactly.
+    Slices that would start after the last tick (``bucket='time'``) are
+    not filled: averages and PnL cover ``filled_qty`` only and the rest is
+    reported as ``unfilled_qty``.
+    """
     intervals = int(intervals)
     chunk = float(total_qty) / intervals
-    slice_df = df.head(intervals).copy()
-    executed = []
-    total_notional = 0.0
-    total_fees = 0.0
-
-    for _, row in slice_df.iterrows():
-        market_price = float(row['Execution Price'])
-        exec_price = apply_slippage(market_price, side, slippage_pct)
-        notional = exec_price * chunk
-        fee = notional * (fee_pct / 100.0)
-        total_notional += notional
-        total_fees += fee
-        executed.append({'ts': row['Timestamp IST'], 'exec_price': exec_price, 'qty': chunk, 'fee': fee})
-
-    avg_price = total_notional / float(total_qty)
-    last_price = float(df['Execution Price'].iloc[-1])
+    prices = df['Execution Price'].to_numpy(dtype=float)
+    idx = twap_slice_index(df['Timestamp IST'], intervals, bucket=bucket, every=every)
 
-    if side.upper() == 'BUY':
-        pnl = (last_price - avg_price) * float(total_qty) - total_fees
+    exec_price = apply_slippage(prices[idx], side, slippage_pct)
+    notional = exec_price * chunk
+    fee = notional * (fee_pct / 100.0)
+    total_notional = float(np.cumsum(notional)[-1]) if len(idx) else 0.0
+    total_fees = float(np.cumsum(fee)[-1]) if len(idx) else 0.0
+
+    # every slice filled: exactly total_qty, as the legacy loop divided by
+    if len(idx) == intervals:
+        filled_qty, unfilled_qty = float(total_qty), 0.0
+    else:
+        filled_qty = chunk * len(idx)
+        unfilled_qty = float(total_qty) - filled_qty
+    avg_price = total_notional / filled_qty if len(idx) else float('nan')
+    last_price = float(prices[-1])
+
+    if not len(idx):
+        pnl = 0.0
+    elif side.upper() == 'BUY':
+        pnl = (last_price - avg_price) * filled_qty - total_fees
     else:
-        pnl = (avg_price - last_price) * float(total_qty) - total_fees
+        pnl = (avg_price - last_price) * filled_qty - total_fees
 
-    res_df = pd.DataFrame(executed)
+    res_df = pd.DataFrame({
+        'ts': df['Timestamp IST'].take(idx).reset_index(drop=True),
+        'exec_price': exec_price,
+        'qty': np.full(len(idx), chunk),
+        'fee': fee,
+    })
     res_df['cumulative_fee'] = res_df['fee'].cumsum()
     res_df['cumulative_qty'] = res_df['qty'].cumsum()
     res_df['avg_price_so_far'] = (res_df['exec_price'] * res_df['qty']).cumsum() / res_df['cumulative_qty']
+    return {'executions': res_df, 'avg_price': avg_price, 'pnl': pnl, 'last_price': last_price,
+            'filled_qty': filled_qty, 'unfilled_qty': unfilled_qty}
+
+
+def simulate_twap(total_qty, intervals, side='BUY', slippage_pct=0.02, fee_pct=0.04, out_dir=None, render=False,
+                  bucket='rows', every=None):
+    """Load the history and run a TWAP; the chart is only drawn when ``render`` is set."""
+    df = sort_ticks(load_data(columns=TICK_COLUMNS))
+    res = run_twap(df, total_qty, intervals, side=side, slippage_pct=slippage_pct, fee_pct=fee_pct,
+                   bucket=bucket, every=every)
+    img = render_twap(res, out_dir) if render else None
+    return res, img
+
+
+def window_volume(ts, prices, volume, intervals):
+    """Split the history into ``intervals`` equal wall-clock windows.
+
+    Returns ``(starts, window_volume, window_vwap, market_vwap)``. Window
+    bounds come from one ``searchsorted`` and the sums from differences of
+    running totals, so the cost does not grow with the number of windows.
+    A window with no volume gets the price of the next tick instead of a VWAP.
+    """
+    t = np.asarray(ts, dtype='datetime64[ns]').view('i8')
+    n = len(t)
+    edges = t[0] + (np.arange(int(intervals) + 1, dtype=np.int64) * (t[-1] - t[0])) // int(intervals)
+    bounds = np.searchsorted(t, edges, side='left')
+    bounds[-1] = n
+    cum_v = np.concatenate(([0.0], np.cumsum(volume)))
+    cum_pv = np.concatenate(([0.0], np.cumsum(prices * volume)))
+    lo, hi = bounds[:-1], bounds[1:]
+    vol = cum_v[hi] - cum_v[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = np.where(vol > 0, (cum_pv[hi] - cum_pv[lo]) / vol, prices[np.minimum(lo, n - 1)])
+    return edges[:-1], vol, vwap, cum_pv[-1] / cum_v[-1]
+
+
+def _execute(qty, vol, window_vwap, benchmark, side, slippage_pct, fee_pct, impact_pct):
+    sign = 1.0 if side.upper() == 'BUY' else -1.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        participation = np.where(vol > 0, np.minimum(qty / vol, 1.0), np.where(qty > 0, 1.0, 0.0))
+    exec_price = window_vwap * (1.0 + sign * (slippage_pct + impact_pct * np.sqrt(participation)) / 100.0)
+    notional = exec_price * qty
+    fee = notional * (fee_pct / 100.0)
+    avg_price = float(notional.sum() / qty.sum())
+    return {
+        'executions': pd.DataFrame({'qty': qty, 'participation': participation,
+                                    'exec_price': exec_price, 'fee': fee}),
+        'avg_price': avg_price,
+        'slippage_bps': sign * (avg_price - benchmark) / benchmark * 1e4,
+        'fees': float(fee.sum()),
+        'max_participation': float(participation.max()),
+    }
+
+
+def run_vwap(df, total_qty, intervals, side='BUY', slippage_pct=0.02, fee_pct=0.04, impact_pct=0.1,
+             profile=None, symbol=None):
+    """VWAP vs TWAP over already loaded, time-ordered ticks.
+
+    Both split ``total_qty`` across ``intervals`` equal wall-clock windows
+    spanning the history. TWAP sends equal slices. VWAP sizes each slice
+    from ``profile`` (a ``VolumeProfile``). Without one, the profile is
+    built from ``df`` itself, which is in-sample. A slice fills at its
+    window's market VWAP, moved against us by ``slippage_pct`` plus
+    ``impact_pct * sqrt(participation)``, where participation is the
+    slice's share of the window's volume. Slippage is reported in basis
+    points against the market VWAP over the whole horizon.
+    """
+    from src.advanced.volume_profile import VolumeProfile
+    ts = df['Timestamp IST']
+    prices = df['Execution Price'].to_numpy(dtype=float)
+    if VOLUME_COLUMN in df:
+        volume = df[VOLUME_COLUMN].to_numpy(dtype=float)
+    else:
+        volume = np.ones(len(prices))
+    if profile is None:
+        profile = VolumeProfile().add(ts.to_numpy(), volume)
+    starts, vol, window_vwap, benchmark = window_volume(ts, prices, volume, intervals)
+
+    t = np.asarray(ts, dtype='datetime64[ns]').view('i8')
+    start_minute = (t[0] % (86400 * 10**9)) / 60e9
+    duration = (t[-1] - t[0]) / 60e9
+    total = float(total_qty)
+    qty = {'vwap': total * profile.schedule(start_minute, duration, int(intervals), symbol=symbol),
+           'twap': np.full(int(intervals), total / int(intervals))}
+    res = {name: _execute(q, vol, window_vwap, benchmark, side, slippage_pct, fee_pct, impact_pct)
+           for name, q in qty.items()}
+    window_start = pd.to_datetime(starts)
+    for r in res.values():
+        r['executions'].insert(0, 'ts', window_start)
+        r['executions']['window_volume'] = vol
+    res['market_vwap'] = float(benchmark)
+    res['improvement_bps'] = res['twap']['slippage_bps'] - res['vwap']['slippage_bps']
+    return res
+
+
+def split_vwap(df, total_qty, intervals, train_until=None, symbol=None, **kwargs):
+    """Out-of-sample ``run_vwap``: profile from ticks before ``train_until``, scored on the rest.
+
+    ``train_until`` defaults to ``TRAIN_FRACTION`` of the way through the
+    history. The profile only ever sees the training ticks, so the reported
+    ``improvement_bps`` carries no look-ahead.
+    """
+    from src.advanced.volume_profile import SYMBOL_COLUMN, VolumeProfile
+    ts = df['Timestamp IST']
+    if train_until is None:
+        cut = ts.iloc[0] + (ts.iloc[-1] - ts.iloc[0]) * TRAIN_FRACTION
+    else:
+        cut = pd.Timestamp(train_until)
+    train = df[ts < cut]
+    test = df[ts >= cut].reset_index(drop=True)
+    if train.empty or len(test) < 2:
+        raise ValueError(f'no ticks on one side of the training cut {cut}')
+    profile = VolumeProfile().add(
+        train['Timestamp IST'].to_numpy(),
+        train[VOLUME_COLUMN].to_numpy(dtype=float) if VOLUME_COLUMN in train else None,
+        train[SYMBOL_COLUMN].astype(str).to_numpy() if SYMBOL_COLUMN in train else None)
+    res = run_vwap(test, total_qty, intervals, profile=profile, symbol=symbol, **kwargs)
+    res['train_until'] = cut
+    res['in_sample'] = False
+    return res
 
-    if not out_dir:
-        out_dir = Path(__file__).parents[2] / 'data'
-    out_dir = Path(out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
 
-    img = out_dir / 'twap_pnl.png'
-    plt.figure(figsize=(8, 4))
-    plt.plot(pd.to_datetime(res_df['ts']), res_df['avg_price_so_far'], marker='o', label='avg_exec_price')
-    plt.axhline(last_price, color='green', linestyle='--', label='last_price')
-    plt.title(f'TWAP average exec price vs last price (pnl={pnl:.4f})')
-    plt.xlabel('Timestamp IST')
-    plt.ylabel('Price')
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(img)
-    plt.close()
-    return {'executions': res_df, 'avg_price': avg_price, 'pnl': pnl}, img
-
-
-def simulate_grid(lower_price, upper_price, levels, qty_per_order, slippage_pct=0.02, fee_pct=0.04, out_dir=None):
-    df = load_data()
-    df = df.sort_values('Timestamp IST').reset_index(drop=True)
+def _load_vwap_ticks():
+    from src.advanced.volume_profile import SYMBOL_COLUMN
+    for extra in ([VOLUME_COLUMN, SYMBOL_COLUMN], [VOLUME_COLUMN], [SYMBOL_COLUMN]):
+        try:
+            return load_data(columns=TICK_COLUMNS + extra)
+        except (KeyError, ValueError):
+            continue
+    return load_data(columns=TICK_COLUMNS)
+
+
+def simulate_vwap(total_qty, intervals, side='BUY', slippage_pct=0.02, fee_pct=0.04, impact_pct=0.1,
+                  symbol=None, train_until=None, in_sample=False):
+    """Load the history and compare VWAP against TWAP.
+
+    By default this is ``split_vwap``: train on the start of the history,
+    score on the rest. ``in_sample`` builds the profile from, and scores on,
+    the whole history instead; its result is flagged ``in_sample``.
+    """
+    df = sort_ticks(_load_vwap_ticks())
+    kw = dict(side=side, slippage_pct=slippage_pct, fee_pct=fee_pct, impact_pct=impact_pct)
+    if not in_sample:
+        return split_vwap(df, total_qty, intervals, train_until=train_until, symbol=symbol, **kw)
+    res = run_vwap(df, total_qty, intervals, symbol=symbol, **kw)
+    res['train_until'] = None
+    res['in_sample'] = True
+    return res
+
+
+def _first_above(prices, start, threshold, window=1024):
+    """Index of the first price after ``start`` strictly above ``threshold``, or -1.
+
+    Scans forward in doubling windows so a nearby rebound costs one small
+    comparison while a long drawdown still runs as a handful of array ops.
+    """
+    n = len(prices)
+    lo = start + 1
+    while lo < n:
+        hi = min(n, lo + window)
+        hits = prices[lo:hi] > threshold
+        k = int(hits.argmax())
+        if hits[k]:
+            return lo + k
+        lo = hi
+        window *= 2
+    return -1
+
+
+def grid_fills(prices, grid_prices):
+    """Resolve first-touch buy and sell fills for all grid levels together.
+
+    A level buys at the first tick trading at or below it; that is the first
+    index where the running minimum crosses the level, found with one
+    ``searchsorted`` over the (monotonic) running minimum. The sell is the
+    first later tick above the buy tick. Returns ``(buy_idx, sell_market)``
+    aligned with ``grid_prices``; unfilled levels have ``buy_idx == len(prices)``.
+    """
+    prices = np.asarray(prices, dtype=float)
+    grid_prices = np.asarray(grid_prices, dtype=float)
+    n = len(prices)
+    sell_market = np.full(len(grid_prices), np.nan)
+    if n == 0:
+        return np.full(len(grid_prices), 0, dtype=np.int64), sell_market
+
+    running_min = np.minimum.accumulate(prices)
+    buy_idx = np.searchsorted(-running_min, -grid_prices, side='left').astype(np.int64)
+
+    filled = buy_idx < n
+    for i in np.unique(buy_idx[filled]):
+        j = _first_above(prices, int(i), prices[i])
+        sell_market[buy_idx == i] = prices[j] if j >= 0 else prices[-1]
+    return buy_idx, sell_market
+
+
+def run_grid(df, lower_price, upper_price, levels, qty_per_order, slippage_pct=0.02, fee_pct=0.04):
+    """Grid simulation over already loaded, time-ordered ticks; no charting."""
     lower = float(lower_price)
     upper = float(upper_price)
     levels = int(levels)
     step = (upper - lower) / max(1, (levels - 1))
-    grid_prices = [lower + i * step for i in range(levels)]
-
-    fills = []
-    for price in grid_prices:
-        filled_idx = None
-        buy_price_market = None
-        for idx, row in df.iterrows():
-            if float(row['Execution Price']) <= price:
-                filled_idx = idx
-                buy_price_market = float(row['Execution Price'])
-                break
-
-        if filled_idx is None:
-            continue
+    grid_prices = lower + np.arange(max(0, levels)) * step
 
-        buy_price = apply_slippage(buy_price_market, 'BUY', slippage_pct)
-        buy_fee = buy_price * float(qty_per_order) * (fee_pct / 100.0)
+    prices = df['Execution Price'].to_numpy(dtype=float)
+    buy_idx, sell_market = grid_fills(prices, grid_prices)
+    filled = buy_idx < len(prices)
 
-        sell_price_market = None
-        for idx2 in range(filled_idx + 1, len(df)):
-            p2 = float(df.at[idx2, 'Execution Price'])
-            if p2 > buy_price_market:
-                sell_price_market = p2
-                break
-        if sell_price_market is None:
-            sell_price_market = float(df['Execution Price'].iloc[-1])
+    if filled.any():
+        qty = float(qty_per_order)
+        idx = buy_idx[filled]
+        buy_price = apply_slippage(prices[idx], 'BUY', slippage_pct)
+        buy_fee = buy_price * qty * (fee_pct / 100.0)
+        sell_price = apply_slippage(sell_market[filled], 'SELL', slippage_pct)
+        sell_fee = sell_price * qty * (fee_pct / 100.0)
+        pnl = (sell_price - buy_price) * qty - (buy_fee + sell_fee)
+        res_df = pd.DataFrame({
+            'level_price': grid_prices[filled],
+            'buy_ts': df['Timestamp IST'].take(idx).reset_index(drop=True),
+            'buy_price': buy_price,
+            'sell_price': sell_price,
+            'pnl': pnl,
+        })
+    else:
+        res_df = pd.DataFrame()
+    return {'fills': res_df, 'total_pnl': res_df['pnl'].sum() if not res_df.empty else 0.0}
 
-        sell_price = apply_slippage(sell_price_market, 'SELL', slippage_pct)
-        sell_fee = sell_price * float(qty_per_order) * (fee_pct / 100.0)
 
-        pnl = (sell_price - buy_price) * float(qty_per_order) - (buy_fee + sell_fee)
-        fills.append({'level_price': price, 'buy_ts': df.at[filled_idx, 'Timestamp IST'], 'buy_price': buy_price, 'sell_price': sell_price, 'pnl': pnl})
+def simulate_grid(lower_price, upper_price, levels, qty_per_order, slippage_pct=0.02, fee_pct=0.04, out_dir=None, render=False):
+    """Load the history and run a grid; the chart is only drawn when ``render`` is set."""
+    df = sort_ticks(load_data(columns=TICK_COLUMNS))
+    res = run_grid(df, lower_price, upper_price, levels, qty_per_order, slippage_pct=slippage_pct, fee_pct=fee_pct)
+    img = render_grid(res, out_dir) if render else None
+    return res, img
 
-    res_df = pd.DataFrame(fills)
 
+def _chart_path(out_dir, filename):
     if not out_dir:
         out_dir = Path(__file__).parents[2] / 'data'
     out_dir = Path(out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir / filename
 
-    img = out_dir / 'grid_pnl.png'
-    plt.figure(figsize=(8, 4))
+
+def _figure():
+    # Figure + Agg canvas directly: no pyplot state, no GUI backend, safe in workers
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(8, 4))
+    return fig, fig.subplots()
+
+
+def render_twap(res, out_dir=None, filename='twap_pnl.png'):
+    res_df = res['executions']
+    img = _chart_path(out_dir, filename)
+    fig, ax = _figure()
+    ax.plot(pd.to_datetime(res_df['ts']), res_df['avg_price_so_far'], marker='o', label='avg_exec_price')
+    ax.axhline(res['last_price'], color='green', linestyle='--', label='last_price')
+    ax.set_title(f"TWAP average exec price vs last price (pnl={res['pnl']:.4f})")
+    ax.set_xlabel('Timestamp IST')
+    ax.set_ylabel('Price')
+    ax.legend()
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(img)
+    return img
+
+
+def render_grid(res, out_dir=None, filename='grid_pnl.png'):
+    res_df = res['fills']
+    img = _chart_path(out_dir, filename)
+    fig, ax = _figure()
     if not res_df.empty:
-        plt.bar(res_df['level_price'].astype(str), res_df['pnl'])
-    plt.title('Grid PnL per filled level')
-    plt.xlabel('Grid Level Price')
-    plt.ylabel('PnL')
-    plt.tight_layout()
-    plt.savefig(img)
-    plt.close()
-    return {'fills': res_df, 'total_pnl': res_df['pnl'].sum() if not res_df.empty else 0.0}, img
+        ax.bar(res_df['level_price'].astype(str), res_df['pnl'])
+    ax.set_title('Grid PnL per filled level')
+    ax.set_xlabel('Grid Level Price')
+    ax.set_ylabel('PnL')
+    fig.tight_layout()
+    fig.savefig(img)
+    return img
+
+
+RENDERERS = {'twap': render_twap, 'grid': render_grid}
+
+
+def _render_job(job):
+    kind, res, out_dir, filename = job
+    return RENDERERS[kind](res, out_dir, filename)
+
+
+def render_batch(jobs, workers=None):
+    """Render many results to PNG files at once.
+
+    ``jobs`` is a list of ``(kind, res, out_dir, filename)`` with ``kind`` in
+    ``RENDERERS``. Charts are drawn on the Agg canvas across a process pool and
+    the image paths are returned in input order.
+    """
+    jobs = list(jobs)
+    workers = max(1, min(len(jobs), int(workers or os.cpu_count() or 1)))
+    if workers == 1:
+        return [_render_job(job) for job in jobs]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_job, jobs))
 
 
 def cli():
@@ -142,6 +432,23 @@ def cli():
     t.add_argument('--side', choices=['BUY', 'SELL'], default='BUY')
     t.add_argument('--slippage', type=float, default=0.02, help='slippage percent')
     t.add_argument('--fee', type=float, default=0.04, help='fee percent')
+    t.add_argument('--no-chart', action='store_true', help='skip rendering data/twap_pnl.png')
+    t.add_argument('--bucket', choices=['rows', 'time'], default='rows',
+                   help='rows: first N ticks (default); time: N equal wall-clock slices')
+    t.add_argument('--every', default=None, help="fixed slice length for --bucket time, e.g. '5min'")
+
+    v = sub.add_parser('vwap', help='compare volume-profile slicing against equal TWAP slices')
+    v.add_argument('total_qty')
+    v.add_argument('intervals', type=int)
+    v.add_argument('--side', choices=['BUY', 'SELL'], default='BUY')
+    v.add_argument('--slippage', type=float, default=0.02, help='slippage percent')
+    v.add_argument('--fee', type=float, default=0.04, help='fee percent')
+    v.add_argument('--impact', type=float, default=0.1, help='impact percent at 100%% participation')
+    v.add_argument('--symbol', help='profile symbol (default: all symbols)')
+    v.add_argument('--train-until', help='build the profile from ticks before this time and score the rest '
+                                         '(default: the first 70%% of the history)')
+    v.add_argument('--in-sample', action='store_true',
+                   help='build the profile from and score on the whole history (look-ahead)')
 
     g = sub.add_parser('grid')
     g.add_argument('lower')
@@ -150,16 +457,49 @@ def cli():
     g.add_argument('qty')
     g.add_argument('--slippage', type=float, default=0.02)
     g.add_argument('--fee', type=float, default=0.04)
+    g.add_argument('--no-chart', action='store_true', help='skip rendering data/grid_pnl.png')
+
+    from src.advanced import sweep
+    sweep.add_arguments(sub.add_parser('sweep', help='run many TWAP/grid configurations in parallel'))
+
+    from src.advanced import monte_carlo
+    monte_carlo.add_arguments(sub.add_parser('montecarlo', help='PnL distribution over bootstrapped price paths'))
+
+    from src.advanced import engine
+    engine.add_arguments(sub.add_parser('engine', help='run several strategies over streamed ticks in one pass'))
 
     args = parser.parse_args()
     if args.cmd == 'twap':
-        res, img = simulate_twap(args.total_qty, args.intervals, side=args.side, slippage_pct=args.slippage, fee_pct=args.fee)
-        print('TWAP simulation complete. Chart saved to', img)
+        res, img = simulate_twap(args.total_qty, args.intervals, side=args.side, slippage_pct=args.slippage, fee_pct=args.fee, render=not args.no_chart,
+                                 bucket=args.bucket, every=args.every)
+        print('TWAP simulation complete.' + (f' Chart saved to {img}' if img else ''))
         print('Pnl:', res['pnl'])
+        if res['unfilled_qty'] > 0:
+            print(f"Unfilled: {res['unfilled_qty']:g} (slices past the end of the history)")
+    elif args.cmd == 'vwap':
+        res = simulate_vwap(args.total_qty, args.intervals, side=args.side, slippage_pct=args.slippage,
+                            fee_pct=args.fee, impact_pct=args.impact, symbol=args.symbol,
+                            train_until=args.train_until, in_sample=args.in_sample)
+        if res['in_sample']:
+            print('IN-SAMPLE: the profile was built from the ticks it is scored on.')
+        else:
+            print(f"Out-of-sample: profile from ticks before {res['train_until']}, scored on the rest.")
+        print(f"Market VWAP: {res['market_vwap']:.4f}")
+        for name in ('vwap', 'twap'):
+            r = res[name]
+            print(f"{name.upper()}: avg {r['avg_price']:.4f}  slippage {r['slippage_bps']:.2f} bps  "
+                  f"fees {r['fees']:.4f}  max participation {r['max_participation']:.2%}")
+        print(f"VWAP saves {res['improvement_bps']:.2f} bps over TWAP")
     elif args.cmd == 'grid':
-        res, img = simulate_grid(args.lower, args.upper, args.levels, args.qty, slippage_pct=args.slippage, fee_pct=args.fee)
-        print('Grid simulation complete. Chart saved to', img)
+        res, img = simulate_grid(args.lower, args.upper, args.levels, args.qty, slippage_pct=args.slippage, fee_pct=args.fee, render=not args.no_chart)
+        print('Grid simulation complete.' + (f' Chart saved to {img}' if img else ''))
         print('Total PnL:', res['total_pnl'])
+    elif args.cmd == 'sweep':
+        sweep.main(args)
+    elif args.cmd == 'montecarlo':
+        monte_carlo.main(args)
+    elif args.cmd == 'engine':
+        engine.main(args)
     else:
         parser.print_help()
 
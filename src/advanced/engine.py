@@ -0,0 +1,334 @@
+"""Event-driven backtest engine: several strategies, one pass, streamed ticks.
+
+Ticks arrive as ``(timestamps, prices)`` chunks, either memory-mapped from
+the columnar cache or read incrementally from the CSV. Each chunk goes to
+every registered strategy, which keeps its own state, position, fees and
+PnL across chunks. Memory therefore depends on the chunk size, not on the
+length of the history. Strategies work on whole chunks with array
+operations, so Python overhead is paid per chunk, not per tick.
+
+The input must already be time-ordered; out-of-order ticks, within a chunk
+or across chunks, raise ``ValueError`` because a stream cannot be re-sorted.
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.advanced import backtester, tick_store
+from src.advanced.backtester import apply_slippage, _first_above
+
+CHUNK_ROWS = 1_000_000
+
+
+def iter_ticks(path=None, chunk_rows=CHUNK_ROWS, use_cache=True):
+    """Yield ``(timestamps, prices)`` array chunks from the tick history."""
+    path = path or backtester.DATA_PATH
+    if use_cache:
+        cols = tick_store.load_columns(path, backtester.TICK_COLUMNS, parse_dates=backtester.DATE_COLUMNS)
+        ts, _ = cols['Timestamp IST']
+        prices, _ = cols['Execution Price']
+        for i in range(0, len(prices), chunk_rows):
+            yield ts[i:i + chunk_rows], np.asarray(prices[i:i + chunk_rows], dtype=float)
+        return
+    reader = pd.read_csv(path, usecols=backtester.TICK_COLUMNS, parse_dates=backtester.DATE_COLUMNS,
+                         chunksize=chunk_rows)
+    for chunk in reader:
+        yield chunk['Timestamp IST'].to_numpy(), chunk['Execution Price'].to_numpy(dtype=float)
+
+
+def iter_frame(df, chunk_rows=CHUNK_ROWS):
+    """Chunk an in-memory tick frame the same way ``iter_ticks`` chunks a file."""
+    ts = df['Timestamp IST'].to_numpy()
+    prices = df['Execution Price'].to_numpy(dtype=float)
+    for i in range(0, len(prices), chunk_rows):
+        yield ts[i:i + chunk_rows], prices[i:i + chunk_rows]
+
+
+class Ledger:
+    """Running position, average entry, realized PnL and fees for one strategy."""
+
+    def __init__(self, fee_pct):
+        self.fee_pct = fee_pct
+        self.qty = 0.0
+        self.entry_price = 0.0
+        self.realized_pnl = 0.0
+        self.fees = 0.0
+        self.trades = 0
+
+    def fill(self, side, price, qty):
+        signed = qty if side == 'BUY' else -qty
+        self.fees += price * qty * (self.fee_pct / 100.0)
+        self.trades += 1
+        if self.qty == 0 or (self.qty > 0) == (signed > 0):
+            total = self.qty + signed
+            self.entry_price = (self.entry_price * abs(self.qty) + price * qty) / abs(total)
+            self.qty = total
+            return
+        closed = min(qty, abs(self.qty))
+        self.realized_pnl += (price - self.entry_price) * closed * (1.0 if self.qty > 0 else -1.0)
+        remaining = self.qty + signed
+        if abs(remaining) < 1e-12:
+            self.qty, self.entry_price = 0.0, 0.0
+        else:
+            if (remaining > 0) != (self.qty > 0):
+                self.entry_price = price
+            self.qty = remaining
+
+    def snapshot(self, last_price):
+        unrealized = (last_price - self.entry_price) * self.qty
+        return {
+            'position': self.qty,
+            'entry_price': self.entry_price,
+            'realized_pnl': self.realized_pnl,
+            'unrealized_pnl': unrealized,
+            'fees': self.fees,
+            'pnl': self.realized_pnl + unrealized - self.fees,
+            'trades': self.trades,
+        }
+
+
+class Strategy:
+    """Base class: ``on_ticks`` per chunk, ``finish`` once after the last tick."""
+
+    name = 'strategy'
+
+    def __init__(self, fee_pct=0.04):
+        self.ledger = Ledger(fee_pct)
+
+    def on_ticks(self, ts, prices):
+        raise NotImplementedError
+
+    def finish(self, ts, price):
+        pass
+
+    def result(self, last_price):
+        return self.ledger.snapshot(last_price)
+
+
+class GridStrategy(Strategy):
+    """Streaming version of ``simulate_grid``: buy each level on first touch, sell on the next uptick."""
+
+    name = 'grid'
+
+    def __init__(self, lower_price, upper_price, levels, qty_per_order, slippage_pct=0.02, fee_pct=0.04):
+        super().__init__(fee_pct)
+        lower, upper, levels = float(lower_price), float(upper_price), int(levels)
+        step = (upper - lower) / max(1, (levels - 1))
+        self.levels = lower + np.arange(max(0, levels)) * step
+        self.qty = float(qty_per_order)
+        self.slippage_pct = slippage_pct
+        self.fee_pct = fee_pct
+        self.waiting = np.ones(len(self.levels), dtype=bool)
+        self.holding = np.zeros(len(self.levels), dtype=bool)
+        self.buy_market = np.full(len(self.levels), np.nan)
+        self.buy_ts = [None] * len(self.levels)
+        self.fills = {}
+
+    def _sell(self, i, market_price):
+        buy_price = apply_slippage(self.buy_market[i], 'BUY', self.slippage_pct)
+        sell_price = apply_slippage(market_price, 'SELL', self.slippage_pct)
+        buy_fee = buy_price * self.qty * (self.fee_pct / 100.0)
+        sell_fee = sell_price * self.qty * (self.fee_pct / 100.0)
+        self.ledger.fill('SELL', sell_price, self.qty)
+        self.holding[i] = False
+        self.fills[i] = {'level_price': self.levels[i], 'buy_ts': self.buy_ts[i], 'buy_price': buy_price,
+                         'sell_price': sell_price,
+                         'pnl': (sell_price - buy_price) * self.qty - (buy_fee + sell_fee)}
+
+    def _sell_after(self, levels, start, prices):
+        """Sell holding ``levels`` at the first tick after ``start`` above their buy price."""
+        for market in np.unique(self.buy_market[levels]):
+            j = _first_above(prices, start, market)
+            if j >= 0:
+                for i in levels[self.buy_market[levels] == market]:
+                    self._sell(i, prices[j])
+
+    def on_ticks(self, ts, prices):
+        if len(prices) == 0:
+            return
+        # levels carried over from earlier chunks can sell from the first tick
+        held = np.flatnonzero(self.holding)
+        if len(held):
+            self._sell_after(held, -1, prices)
+
+        waiting = np.flatnonzero(self.waiting)
+        if len(waiting) == 0:
+            return
+        running_min = np.minimum.accumulate(prices)
+        hit = np.searchsorted(-running_min, -self.levels[waiting], side='left')
+        filled = hit < len(prices)
+        for idx in np.unique(hit[filled]):
+            levels = waiting[hit == idx]
+            self.waiting[levels] = False
+            self.holding[levels] = True
+            self.buy_market[levels] = prices[idx]
+            for i in levels:
+                self.buy_ts[i] = ts[idx]
+                self.ledger.fill('BUY', apply_slippage(prices[idx], 'BUY', self.slippage_pct), self.qty)
+            self._sell_after(levels, int(idx), prices)
+
+    def finish(self, ts, price):
+        for i in np.flatnonzero(self.holding):
+            self._sell(i, price)
+
+    def result(self, last_price):
+        res = super().result(last_price)
+        fills = pd.DataFrame([self.fills[i] for i in sorted(self.fills)])
+        res.update(fills=fills, total_pnl=fills['pnl'].sum() if not fills.empty else 0.0)
+        return res
+
+
+class TwapStrategy(Strategy):
+    """Streaming TWAP: the first ``intervals`` ticks, or one slice ``every`` apart from the first tick."""
+
+    name = 'twap'
+
+    def __init__(self, total_qty, intervals, side='BUY', slippage_pct=0.02, fee_pct=0.04, every=None):
+        super().__init__(fee_pct)
+        self.total_qty = float(total_qty)
+        self.intervals = int(intervals)
+        self.chunk = self.total_qty / self.intervals
+        self.side = side.upper()
+        self.slippage_pct = slippage_pct
+        self.every = pd.Timedelta(every).value if every is not None else None
+        self.executed = 0
+        self.next_edge = None
+
+    def on_ticks(self, ts, prices):
+        remaining = self.intervals - self.executed
+        if remaining <= 0 or len(prices) == 0:
+            return
+        if self.every is None:
+            idx = np.arange(min(remaining, len(prices)))
+        else:
+            t = np.asarray(ts, dtype='datetime64[ns]').view('i8')
+            if self.next_edge is None:
+                self.next_edge = t[0]
+            edges = self.next_edge + np.arange(remaining, dtype=np.int64) * self.every
+            idx = np.searchsorted(t, edges, side='left')
+            idx = idx[idx < len(t)]
+            self.next_edge = self.next_edge + len(idx) * self.every
+        for price in apply_slippage(prices[idx], self.side, self.slippage_pct):
+            self.ledger.fill(self.side, price, self.chunk)
+        self.executed += len(idx)
+
+
+class OCOStrategy(Strategy):
+    """Enter at the first tick, then exit at ``tp_price`` (limit) or ``sl_price`` (stop), whichever hits first."""
+
+    name = 'oco'
+
+    def __init__(self, side, quantity, tp_price, sl_price, slippage_pct=0.02, fee_pct=0.04):
+        super().__init__(fee_pct)
+        self.side = side.upper()
+        self.exit_side = 'SELL' if self.side == 'BUY' else 'BUY'
+        self.qty = float(quantity)
+        self.tp = float(tp_price)
+        self.sl = float(sl_price)
+        self.slippage_pct = slippage_pct
+        self.state = 'flat'
+        self.exit = None
+
+    def on_ticks(self, ts, prices):
+        if self.state == 'closed' or len(prices) == 0:
+            return
+        start = 0
+        if self.state == 'flat':
+            self.ledger.fill(self.side, apply_slippage(prices[0], self.side, self.slippage_pct), self.qty)
+            self.state = 'open'
+            start = 1
+        w = prices[start:]
+        if self.side == 'BUY':
+            tp_hit, sl_hit = w >= self.tp, w <= self.sl
+        else:
+            tp_hit, sl_hit = w <= self.tp, w >= self.sl
+        hit = tp_hit | sl_hit
+        k = int(hit.argmax()) if len(w) else 0
+        if len(w) and hit[k]:
+            if tp_hit[k]:
+                self.ledger.fill(self.exit_side, self.tp, self.qty)
+                self.exit = ('tp', ts[start + k])
+            else:
+                price = apply_slippage(w[k], self.exit_side, self.slippage_pct)
+                self.ledger.fill(self.exit_side, price, self.qty)
+                self.exit = ('sl', ts[start + k])
+            self.state = 'closed'
+
+    def result(self, last_price):
+        res = super().result(last_price)
+        res['filled'] = self.exit[0] if self.exit else None
+        res['exit_ts'] = self.exit[1] if self.exit else None
+        return res
+
+
+class BacktestEngine:
+    def __init__(self, strategies=None):
+        self.strategies = {}
+        for s in strategies or []:
+            self.register(s)
+
+    def register(self, strategy, name=None):
+        name = name or strategy.name
+        if name in self.strategies:
+            name = f'{name}_{len(self.strategies)}'
+        self.strategies[name] = strategy
+        return name
+
+    def run(self, chunks):
+        """Feed every chunk to every strategy; returns ``(results, stats)``."""
+        start = time.perf_counter()
+        ticks = n_chunks = 0
+        last_ts = last_price = None
+        for ts, prices in chunks:
+            if len(prices) == 0:
+                continue
+            if (last_ts is not None and ts[0] < last_ts) or np.any(ts[1:] < ts[:-1]):
+                raise ValueError('ticks must be time-ordered for streaming')
+            for strategy in self.strategies.values():
+                strategy.on_ticks(ts, prices)
+            ticks += len(prices)
+            n_chunks += 1
+            last_ts, last_price = ts[-1], float(prices[-1])
+        if last_price is None:
+            raise ValueError('no ticks to backtest')
+        for strategy in self.strategies.values():
+            strategy.finish(last_ts, last_price)
+        elapsed = time.perf_counter() - start
+        results = {name: s.result(last_price) for name, s in self.strategies.items()}
+        stats = {'ticks': ticks, 'chunks': n_chunks, 'seconds': elapsed,
+                 'ticks_per_sec': ticks / elapsed if elapsed > 0 else float('inf')}
+        return results, stats
+
+
+def add_arguments(parser):
+    """Register the ``engine`` sub-command on the backtester CLI."""
+    parser.add_argument('--grid', nargs=4, action='append', default=[], metavar=('LOWER', 'UPPER', 'LEVELS', 'QTY'))
+    parser.add_argument('--twap', nargs=2, action='append', default=[], metavar=('TOTAL_QTY', 'INTERVALS'))
+    parser.add_argument('--twap-side', choices=['BUY', 'SELL'], default='BUY')
+    parser.add_argument('--twap-every', default=None, help="slice length, e.g. '5min' (default: first N ticks)")
+    parser.add_argument('--oco', nargs=4, action='append', default=[], metavar=('SIDE', 'QTY', 'TP', 'SL'))
+    parser.add_argument('--slippage', type=float, default=0.02)
+    parser.add_argument('--fee', type=float, default=0.04)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--csv', action='store_true', help='stream from the CSV instead of the columnar cache')
+
+
+def main(args):
+    engine = BacktestEngine()
+    for lower, upper, levels, qty in args.grid:
+        engine.register(GridStrategy(lower, upper, levels, qty, slippage_pct=args.slippage, fee_pct=args.fee))
+    for total_qty, intervals in args.twap:
+        engine.register(TwapStrategy(total_qty, intervals, side=args.twap_side, slippage_pct=args.slippage,
+                                     fee_pct=args.fee, every=args.twap_every))
+    for side, qty, tp, sl in args.oco:
+        engine.register(OCOStrategy(side, qty, tp, sl, slippage_pct=args.slippage, fee_pct=args.fee))
+    if not engine.strategies:
+        raise SystemExit('register at least one of --grid, --twap, --oco')
+
+    results, stats = engine.run(iter_ticks(chunk_rows=args.chunk_rows, use_cache=not args.csv))
+    for name, res in results.items():
+        print(f"{name:<10} pnl={res['pnl']:.6f} position={res['position']:.6f} fees={res['fees']:.6f} trades={res['trades']}")
+    print(f"{stats['ticks']} ticks in {stats['chunks']} chunks, {stats['seconds']:.3f}s "
+          f"({stats['ticks_per_sec']:,.0f} ticks/s)")
+    return results, stats
@@ -0,0 +1,372 @@
+"""Long-running grid that re-arms levels as they fill.
+
+Each symbol's grid is a ``GridBook``: level prices plus two numpy arrays,
+one for the side each level should carry and one for the order id live
+there. When a BUY at level ``i`` fills, only a SELL at level ``i + 1`` is
+placed. When a SELL at ``j`` fills, only a BUY at ``j - 1`` is placed. The
+grid is never re-placed as a whole.
+
+Fills arrive from user-data stream events (``on_event``) or from
+``reconcile``. ``reconcile`` diffs each book against one
+``futures_get_open_orders`` call per symbol. New orders are queued and sent
+in batches from one worker thread, so hundreds of levels across several
+symbols cost one REST call per symbol per poll plus one order per fill.
+Orders carry a ``clientOrderId`` naming their level, so a restarted engine
+adopts its resting orders instead of placing duplicates. ``reconcile``
+adopts the same way, which picks up orders from a batch whose reply was
+lost after it reached the exchange.
+"""
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+
+import numpy as np
+
+from src.config import get_client, logger
+from src.advanced.grid_trading import BATCH_SIZE, _send_batch
+from src.validation import order_validator
+
+EMPTY, BUY, SELL = 0, 1, 2
+SIDES = {BUY: 'BUY', SELL: 'SELL'}
+CLOSED_STATUSES = ('CANCELED', 'EXPIRED', 'REJECTED', 'EXPIRED_IN_MATCH')
+# closed by the exchange, not by a person: the level goes straight back up
+REARM_STATUSES = ('EXPIRED', 'EXPIRED_IN_MATCH')
+
+
+class GridBook:
+    """Level state for one symbol's grid."""
+
+    def __init__(self, symbol, prices, quantity, tag=None):
+        self.symbol = symbol.upper()
+        self.prices = list(prices)        # exchange strings, ascending
+        self.quantity = quantity
+        self.tag = tag or 'grid-%s-' % self.symbol
+        n = len(self.prices)
+        self.side = np.zeros(n, dtype=np.int8)       # desired side per level
+        self.order_id = np.zeros(n, dtype=np.int64)  # live order per level, 0 = none
+        self.queued = np.zeros(n, dtype=bool)
+        self.seq = 0
+
+    def __len__(self):
+        return len(self.prices)
+
+    def client_id(self, level):
+        self.seq += 1
+        return '%s%d-%d' % (self.tag, level, self.seq)
+
+    def level_of(self, client_order_id):
+        """Level encoded in one of this book's client order ids, else None."""
+        if not client_order_id or not client_order_id.startswith(self.tag):
+            return None
+        try:
+            level = int(client_order_id[len(self.tag):].split('-', 1)[0])
+        except ValueError:
+            return None
+        return level if 0 <= level < len(self) else None
+
+    def order(self, level):
+        return {
+            'symbol': self.symbol,
+            'side': SIDES[int(self.side[level])],
+            'type': 'LIMIT',
+            'timeInForce': 'GTC',
+            'quantity': self.quantity,
+            'price': self.prices[level],
+            'newClientOrderId': self.client_id(level),
+        }
+
+    def counts(self):
+        live = self.order_id != 0
+        return {'levels': len(self), 'buys': int(np.sum(live & (self.side == BUY))),
+                'sells': int(np.sum(live & (self.side == SELL))), 'unarmed': int(np.sum((self.side != EMPTY) & ~live))}
+
+
+class GridEngine:
+    def __init__(self, client=None, poll_interval=5.0, batch_size=BATCH_SIZE):
+        self.client = client or get_client()
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.books = {}
+        self.stats = {'fills': 0, 'placed': 0, 'rejected': 0, 'adopted': 0, 'reconciles': 0,
+                      'open_order_calls': 0, 'get_order_calls': 0, 'batches': 0, 'disarmed': 0,
+                      'unknown': 0}
+        self._by_order = {}           # orderId -> (book, level)
+        self._cancelling = set()      # orderIds the engine itself asked to cancel
+        self._pending = deque()       # (book, level) waiting for an order
+        self._lock = threading.RLock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -- setup -------------------------------------------------------------
+
+    def add_grid(self, symbol, lower, upper, levels, quantity, mid, tag=None):
+        """Lay out ``levels`` prices in ``[lower, upper]`` and arm BUYs below ``mid``.
+
+        Resting orders from an earlier run of the same grid (matched by
+        client order id) are adopted; only the missing levels are queued.
+        """
+        symbol = symbol.upper()
+        lower, upper, levels = Decimal(str(lower)), Decimal(str(upper)), int(levels)
+        step = (upper - lower) / (levels - 1)
+        prices = [(lower + step * i).quantize(Decimal('0.00001')) for i in range(levels)]
+        validator = order_validator(self.client, symbol)
+        if validator is not None:
+            prices = [validator.snap_price(p) for p in prices]
+            quantity = validator.snap_qty(quantity)
+        else:
+            prices = [str(p) for p in prices]
+        book = GridBook(symbol, prices, str(quantity), tag)
+        book.side[np.asarray([float(p) for p in prices]) < float(mid)] = BUY
+        with self._lock:
+            self.books[symbol] = book
+        self._adopt(book)
+        with self._lock:
+            for level in np.flatnonzero((book.side != EMPTY) & (book.order_id == 0)):
+                self._enqueue(book, int(level))
+        logger.info('Grid %s: %d levels, %d adopted, %d to place', symbol, levels,
+                    int(np.sum(book.order_id != 0)), int(np.sum(book.queued)))
+        return book
+
+    def _adopt(self, book, orders=None):
+        """Take over open orders whose client order id names a level of ``book`` with no order."""
+        if orders is None:
+            self.stats['open_order_calls'] += 1
+            orders = self.client.futures_get_open_orders(symbol=book.symbol)
+        for o in orders:
+            if o['orderId'] in self._by_order:
+                continue
+            level = book.level_of(o.get('clientOrderId'))
+            if level is None or book.order_id[level]:
+                continue
+            with self._lock:
+                book.side[level] = BUY if o.get('side') == 'BUY' else SELL
+                book.order_id[level] = o['orderId']
+                self._by_order[o['orderId']] = (book, level)
+            self.stats['adopted'] += 1
+        with self._lock:
+            # a resting SELL at k means the BUY at k - 1 already filled: keep that slot empty
+            for level in np.flatnonzero((book.side == SELL) & (book.order_id != 0)):
+                if level > 0 and not book.order_id[level - 1]:
+                    book.side[level - 1] = EMPTY
+
+    def remove_grid(self, symbol, cancel=True):
+        """Stop managing ``symbol``; optionally cancel its resting orders."""
+        with self._lock:
+            book = self.books.pop(symbol.upper(), None)
+            if book is None:
+                return
+            ids = [int(i) for i in book.order_id[book.order_id != 0]]
+            for oid in ids:
+                self._by_order.pop(oid, None)
+        if cancel:
+            for oid in ids:
+                self.cancel(book.symbol, oid)
+
+    def cancel(self, symbol, order_id):
+        """Cancel one of the engine's orders; its level is re-armed once the cancel lands."""
+        with self._lock:
+            self._cancelling.add(order_id)
+        try:
+            self.client.futures_cancel_order(symbol=symbol, orderId=order_id)
+        except Exception as e:
+            with self._lock:
+                self._cancelling.discard(order_id)
+            logger.warning('Grid cancel %s on %s failed: %s', order_id, symbol, e)
+
+    # -- state transitions (cheap; called under the lock) --------------------
+
+    def _enqueue(self, book, level):
+        if not book.queued[level]:
+            book.queued[level] = True
+            self._pending.append((book, level))
+            self._wake.set()
+
+    def _release(self, order_id):
+        """Clear a filled order's level; returns ``(book, level, side)`` or None if unknown."""
+        entry = self._by_order.pop(order_id, None)
+        if entry is None:
+            return None
+        book, level = entry
+        side = int(book.side[level])
+        book.order_id[level] = 0
+        book.side[level] = EMPTY
+        self.stats['fills'] += 1
+        return book, level, side
+
+    def _rearm(self, book, level, side):
+        """Arm the opposite side one level away from a fill at ``level``."""
+        target = level + 1 if side == BUY else level - 1
+        if 0 <= target < len(book):
+            if book.order_id[target]:
+                logger.warning('Grid %s level %d already has order %d; not re-arming',
+                               book.symbol, target, book.order_id[target])
+            else:
+                book.side[target] = SELL if side == BUY else BUY
+                self._enqueue(book, target)
+
+    def _filled(self, order_id):
+        released = self._release(order_id)
+        if released is not None:
+            self._rearm(*released)
+        return released is not None
+
+    def _closed(self, order_id, status):
+        """Order left the book without filling.
+
+        Expiries and the engine's own cancels re-arm the same level. A cancel
+        or rejection from anywhere else disarms it, so a level the user
+        cancelled by hand stays down.
+        """
+        ours = order_id in self._cancelling
+        self._cancelling.discard(order_id)
+        entry = self._by_order.pop(order_id, None)
+        if entry is None:
+            return
+        book, level = entry
+        book.order_id[level] = 0
+        if ours or status in REARM_STATUSES:
+            self._enqueue(book, level)
+        else:
+            book.side[level] = EMPTY
+            self.stats['disarmed'] += 1
+            logger.info('Grid %s level %d %s outside the engine; leaving it disarmed',
+                        book.symbol, level, status)
+
+    def on_event(self, event):
+        """User-data stream handler: route ``ORDER_TRADE_UPDATE`` fills in O(1)."""
+        if event.get('e') != 'ORDER_TRADE_UPDATE':
+            return
+        o = event.get('o', {})
+        with self._lock:
+            if o.get('X') == 'FILLED':
+                self._filled(o.get('i'))
+            elif o.get('X') in CLOSED_STATUSES:
+                self._closed(o.get('i'), o.get('X'))
+
+    # -- exchange I/O (worker thread) ----------------------------------------
+
+    def flush(self):
+        """Send every queued level, ``batch_size`` orders per request; returns orders placed."""
+        with self._lock:
+            work = []
+            while self._pending:
+                book, level = self._pending.popleft()
+                book.queued[level] = False
+                if book.symbol in self.books and book.side[level] != EMPTY and not book.order_id[level]:
+                    work.append((book, level, book.order(level)))
+            self._wake.clear()
+        placed = 0
+        for i in range(0, len(work), self.batch_size):
+            chunk = work[i:i + self.batch_size]
+            self.stats['batches'] += 1
+            results = _send_batch(self.client, [params for _, _, params in chunk])
+            with self._lock:
+                for (book, level, params), res in zip(chunk, results):
+                    if res.get('orderId') is None and res.get('unknown'):
+                        # may be resting: reconcile adopts it by client order id
+                        self.stats['unknown'] += 1
+                        logger.warning('Grid %s %s at %s outcome unknown: %s', book.symbol, params['side'],
+                                       params['price'], res.get('msg'))
+                        continue
+                    if res.get('orderId') is None:
+                        self.stats['rejected'] += 1
+                        logger.error('Grid %s %s at %s rejected: %s', book.symbol, params['side'],
+                                     params['price'], res.get('msg'))
+                        continue
+                    book.order_id[level] = res['orderId']
+                    self._by_order[res['orderId']] = (book, level)
+                    placed += 1
+                    if res.get('status') == 'FILLED':
+                        # crossed the book on arrival
+                        self._filled(res['orderId'])
+        self.stats['placed'] += placed
+        return placed
+
+    def reconcile(self):
+        """Diff every book against the exchange's open orders and repair it.
+
+        Open orders the engine has no id for (a batch that failed after
+        reaching the exchange) are adopted by client order id. Orders
+        missing from the open list are looked up once. A fill re-arms the
+        neighbouring level. An expiry or an engine-made cancel re-arms the
+        same level; any other cancel disarms it. Armed levels with no order
+        are queued again. Returns the number of fills found.
+        """
+        self.stats['reconciles'] += 1
+        fills = 0
+        for book in list(self.books.values()):
+            try:
+                self.stats['open_order_calls'] += 1
+                orders = self.client.futures_get_open_orders(symbol=book.symbol)
+            except Exception as e:
+                logger.error('Grid reconcile for %s failed: %s', book.symbol, e)
+                continue
+            open_ids = np.fromiter((o['orderId'] for o in orders), dtype=np.int64)
+            self._adopt(book, orders)
+            with self._lock:
+                live = book.order_id != 0
+                gone = book.order_id[live & ~np.isin(book.order_id, open_ids)]
+            statuses = {}
+            for oid in (int(i) for i in gone):
+                try:
+                    self.stats['get_order_calls'] += 1
+                    statuses[oid] = self.client.futures_get_order(symbol=book.symbol, orderId=oid).get('status')
+                except Exception as e:
+                    logger.error('Grid lookup of %s failed: %s', oid, e)
+            with self._lock:
+                # clear every filled level before re-arming, so adjacent fills
+                # found in the same pass do not block each other
+                released = [r for r in (self._release(oid) for oid, s in statuses.items() if s == 'FILLED') if r]
+                for r in released:
+                    self._rearm(*r)
+                fills += len(released)
+                for oid, status in statuses.items():
+                    if status in CLOSED_STATUSES:
+                        self._closed(oid, status)
+                for level in np.flatnonzero((book.side != EMPTY) & (book.order_id == 0) & ~book.queued):
+                    self._enqueue(book, int(level))
+        return fills
+
+    def summary(self):
+        return {symbol: book.counts() for symbol, book in self.books.items()}
+
+    # -- running -------------------------------------------------------------
+
+    def run_once(self):
+        self.flush()
+        fills = self.reconcile()
+        self.flush()
+        return fills
+
+    def start(self):
+        """Run placement and periodic reconciliation in a daemon thread."""
+        def loop():
+            next_poll = time.monotonic()
+            while not self._stop.is_set():
+                if self._pending:
+                    self.flush()
+                if time.monotonic() >= next_poll:
+                    self.reconcile()
+                    next_poll = time.monotonic() + self.poll_interval
+                self._wake.wait(max(0.0, next_poll - time.monotonic()))
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name='grid-engine', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def attach(self, stream):
+        """React to fills from a ``UserDataStream`` and reconcile on every (re)connect."""
+        import asyncio
+        stream.subscribe(self.on_event)
+        stream.on_connect.append(lambda: asyncio.to_thread(self.reconcile))
+        return stream
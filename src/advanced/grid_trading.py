@@ -1,12 +1,69 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from src.config import get_client, logger
+from src.rate_limit import RateLimitedClient, order_limiter
+from src.validation import order_validator
 
-def start_grid(symbol, lower_price, upper_price, levels, qty_per_order, side='BOTH'):
+# Binance futures batchOrders accepts at most 5 orders per request
+BATCH_SIZE = 5
+MAX_WORKERS = 4
+
+
+# "send status unknown": the exchange timed out and the order may be live
+_UNKNOWN_CODES = (-1007,)
+
+
+def _error(e):
+    """Error result for an exception; ``unknown`` when the order may have reached the book.
+
+    Only an API error with a code is a definite rejection. A timeout, a reset
+    connection or an unparsable reply leaves the outcome open.
+    """
+    code = getattr(e, 'code', None)
+    res = {'code': code, 'msg': str(e)}
+    if code is None or code in _UNKNOWN_CODES:
+        res['unknown'] = True
+    return res
+
+
+def _send_batch(client, batch):
+    """Send up to BATCH_SIZE orders; returns one result dict per order.
+
+    If the request itself fails, every order gets the same error, flagged
+    ``unknown`` unless the exchange definitely refused it.
+    """
+    if not isinstance(client, RateLimitedClient):
+        # limited clients already count orders per call
+        order_limiter.acquire(len(batch))
+    if hasattr(client, 'futures_place_batch_order'):
+        try:
+            res = client.futures_place_batch_order(batchOrders=[dict(o) for o in batch])
+            return list(res)
+        except Exception as e:
+            return [_error(e) for _ in batch]
+    results = []
+    for order in batch:
+        try:
+            results.append(client.futures_create_order(**order))
+        except Exception as e:
+            results.append(_error(e))
+    return results
+
+
+def start_grid(symbol, lower_price, upper_price, levels, qty_per_order, side='BOTH',
+               batch_size=BATCH_SIZE, max_workers=MAX_WORKERS):
     """Start a simple grid between lower_price and upper_price with given levels.
 
-    This places buy limit orders across the grid and corresponding sell limit orders.
-    It is a simple implementation for demonstration and requires manual monitoring.
+    This places buy limit orders across the grid and returns; nothing re-arms
+    filled levels. Use ``src.advanced.grid_engine.GridEngine`` (``grid --run``)
+    for a grid that keeps trading.
+
+    Levels go out in batches of ``batch_size`` over at most ``max_workers``
+    concurrent requests, paced by the shared order-rate limiter. A failed level
+    does not stop the rest: the returned list has one entry per level, either
+    the exchange order or a ``{'code', 'msg'}`` error (with ``unknown`` set
+    when the order may be resting anyway).
     """
     client = get_client()
     symbol = symbol.upper()
@@ -15,24 +72,37 @@ def start_grid(symbol, lower_price, upper_price, levels, qty_per_order, side='BO
     levels = int(levels)
     step = (upper - lower) / (levels - 1)
 
-    orders = []
     try:
-        for i in range(levels):
-            price = (lower + step * i).quantize(Decimal('0.00001'))
-            # Place buy limit
-            buy = client.futures_create_order(
-                symbol=symbol,
-                side='BUY',
-                type='LIMIT',
-                timeInForce='GTC',
-                quantity=qty_per_order,
-                price=str(price)
-            )
-            orders.append(buy)
-            logger.info('Grid placed BUY at %s', price)
-
-        logger.info('Grid initialized with %d levels for %s', levels, symbol)
-        return orders
+        prices = [(lower + step * i).quantize(Decimal('0.00001')) for i in range(levels)]
+        validator = order_validator(client, symbol)
+        if validator is not None:
+            prices = [validator.snap_price(p) for p in prices]
+            qty_per_order = validator.snap_qty(qty_per_order)
+        orders = [{
+            'symbol': symbol,
+            'side': 'BUY',
+            'type': 'LIMIT',
+            'timeInForce': 'GTC',
+            'quantity': str(qty_per_order),
+            'price': str(price),
+        } for price in prices]
+        size = max(1, min(int(batch_size), BATCH_SIZE))
+        batches = [orders[i:i + size] for i in range(0, len(orders), size)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as pool:
+            results = [r for batch in pool.map(lambda b: _send_batch(client, b), batches) for r in batch]
+
+        placed = 0
+        for price, res in zip(prices, results):
+            if res.get('orderId') is not None:
+                placed += 1
+                logger.info('Grid placed BUY at %s', price)
+            else:
+                logger.error('Grid BUY at %s failed: %s', price, res.get('msg'))
+
+        logger.info('Grid initialized with %d/%d levels for %s in %.3fs', placed, levels, symbol, time.perf_counter() - start)
+        return results
     except Exception as e:
         logger.exception('Grid failed: %s', e)
         return None
@@ -0,0 +1,237 @@
+"""Monte Carlo robustness runs for the TWAP and grid backtests.
+
+``run_twap``/``run_grid`` give one PnL for the one path history took. Here
+the history's tick log-returns are block-bootstrapped into thousands of
+alternative paths. Each path starts at the first historical price, and
+contiguous blocks keep the short-range autocorrelation. Every path also
+draws its own slippage and fee (relative jitter around the configured
+values). A batch of paths is one 2-D array, ``(paths, ticks)``. The
+strategy is priced across every row at once with the same fill rules as
+the single-path backtest.
+
+Batches are independent tasks. Each one gets its own child of
+``SeedSequence(seed)``, so results depend on ``seed`` and ``batch_size``
+only, not on how many worker processes ran them. As in ``sweep``, the
+price array reaches the workers through shared memory (``shm``).
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.advanced import backtester, shm
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+BLOCK = 60
+BATCH_SIZE = 256
+# cap on float64 cells per batch array (~64 MB) so long paths shrink the batch instead
+BATCH_CELLS = 8_000_000
+
+
+def bootstrap_paths(rng, prices, n_paths, length=None, block=BLOCK, returns=None):
+    """``(n_paths, length)`` prices rebuilt from blocks of ``prices``' log-returns.
+
+    Pass ``returns`` (``np.diff(np.log(prices))``) to reuse them across batches.
+    """
+    prices = np.asarray(prices, dtype=float)
+    if returns is None:
+        returns = np.diff(np.log(prices))
+    length = int(length or len(prices))
+    block = max(1, min(int(block), len(returns)))
+    if length < 2 or not len(returns):
+        return np.full((n_paths, max(1, length)), prices[0])
+    steps = length - 1
+    n_blocks = -(-steps // block)
+    starts = rng.integers(0, len(returns) - block + 1, size=(n_paths, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :steps]
+    log_paths = np.empty((n_paths, length))
+    log_paths[:, 0] = 0.0
+    np.cumsum(returns[idx], axis=1, out=log_paths[:, 1:])
+    return prices[0] * np.exp(log_paths, out=log_paths)
+
+
+def jitter(rng, value, rel, n):
+    """``n`` draws of ``value * (1 + rel * N(0, 1))``, floored at zero."""
+    if not rel:
+        return np.full(n, float(value))
+    return np.maximum(0.0, float(value) * (1.0 + rel * rng.standard_normal(n)))
+
+
+def twap_pnl(paths, total_qty, intervals, side='BUY', slippage_pct=0.02, fee_pct=0.04):
+    """PnL of a wall-clock TWAP on every row of ``paths``.
+
+    Slices sit where ``run_twap(bucket='time')`` puts them for evenly spaced
+    ticks. ``slippage_pct``/``fee_pct`` may be scalars or per-path arrays.
+    """
+    paths = np.asarray(paths, dtype=float)
+    n = paths.shape[1]
+    intervals = int(intervals)
+    total_qty = float(total_qty)
+    idx = -(-(np.arange(intervals) * (n - 1)) // intervals)
+    sign = 1.0 if side.upper() == 'BUY' else -1.0
+    slip = np.asarray(slippage_pct, dtype=float).reshape(-1, 1) / 100.0
+    exec_price = paths[:, idx] * (1.0 + sign * slip)
+    notional = exec_price.sum(axis=1) * (total_qty / intervals)
+    fees = notional * (np.asarray(fee_pct, dtype=float) / 100.0)
+    avg_price = notional / total_qty
+    return sign * (paths[:, -1] - avg_price) * total_qty - fees
+
+
+def grid_pnl(paths, lower_price, upper_price, levels, qty_per_order, slippage_pct=0.02, fee_pct=0.04):
+    """PnL of the ``run_grid`` long grid on every row of ``paths``.
+
+    Each level buys at the first tick where the path's running minimum
+    reaches it. It sells at the first later tick trading above that buy, or
+    at the last price. Levels are looped; paths are not.
+    """
+    paths = np.asarray(paths, dtype=float)
+    m, n = paths.shape
+    lower, upper, levels = float(lower_price), float(upper_price), int(levels)
+    step = (upper - lower) / max(1, (levels - 1))
+    qty = float(qty_per_order)
+    slip = np.broadcast_to(np.asarray(slippage_pct, dtype=float) / 100.0, (m,))
+    fee = np.broadcast_to(np.asarray(fee_pct, dtype=float) / 100.0, (m,))
+    running_min = np.minimum.accumulate(paths, axis=1)
+    cols = np.arange(n)
+    total = np.zeros(m)
+    for level in lower + np.arange(max(0, levels)) * step:
+        # running_min never rises, so the count above the level is the first touch
+        buy_idx = (running_min > level).sum(axis=1)
+        rows = np.flatnonzero(buy_idx < n)
+        if not len(rows):
+            continue
+        b = buy_idx[rows]
+        sub = paths[rows]
+        buy_market = sub[np.arange(len(rows)), b]
+        later = (sub > buy_market[:, None]) & (cols > b[:, None])
+        j = later.argmax(axis=1)
+        sell_market = np.where(later[np.arange(len(rows)), j], sub[np.arange(len(rows)), j], sub[:, -1])
+        buy_price = buy_market * (1.0 + slip[rows])
+        sell_price = sell_market * (1.0 - slip[rows])
+        fees = (buy_price + sell_price) * qty * fee[rows]
+        total[rows] += (sell_price - buy_price) * qty - fees
+    return total
+
+
+STRATEGIES = {'twap': twap_pnl, 'grid': grid_pnl}
+
+
+def _run_batch(job):
+    strategy, params, n_paths, seed, length, block, slippage_jitter, fee_jitter = job
+    prices = shm.frame()['Execution Price'].to_numpy()
+    # once per process, not per batch
+    returns = shm.derived('log_returns', lambda: np.diff(np.log(prices)))
+    rng = np.random.default_rng(seed)
+    paths = bootstrap_paths(rng, prices, n_paths, length, block, returns=returns)
+    params = dict(params)
+    params['slippage_pct'] = jitter(rng, params.get('slippage_pct', 0.02), slippage_jitter, n_paths)
+    params['fee_pct'] = jitter(rng, params.get('fee_pct', 0.04), fee_jitter, n_paths)
+    return STRATEGIES[strategy](paths, **params)
+
+
+def summarize(pnl, quantiles=QUANTILES):
+    """Distribution summary of a PnL sample: moments, loss odds, quantiles and 5% CVaR."""
+    pnl = np.asarray(pnl, dtype=float)
+    q = np.quantile(pnl, quantiles)
+    tail = pnl[pnl <= np.quantile(pnl, 0.05)] if len(pnl) else pnl
+    return {
+        'paths': len(pnl),
+        'mean': float(pnl.mean()),
+        'std': float(pnl.std(ddof=1)) if len(pnl) > 1 else 0.0,
+        'prob_loss': float((pnl < 0).mean()),
+        'cvar_5': float(tail.mean()) if len(tail) else float('nan'),
+        'quantiles': {float(k): float(v) for k, v in zip(quantiles, q)},
+    }
+
+
+def run_monte_carlo(strategy, params, df=None, paths=1000, length=None, block=BLOCK,
+                    slippage_jitter=0.5, fee_jitter=0.0, seed=0, batch_size=BATCH_SIZE, workers=None):
+    """PnL of ``strategy`` (``'twap'`` or ``'grid'``) over ``paths`` bootstrapped paths.
+
+    ``params`` are the ``run_twap``/``run_grid`` keyword arguments (TWAP
+    without ``bucket``/``every``; slices are always spread over the path).
+    ``length`` is ticks per path, by default the history's length. Returns
+    ``{'pnl': array, 'summary': summarize(pnl), 'historical': pnl on the
+    actual history}``.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f'unknown strategy: {strategy}')
+    if int(paths) < 1:
+        raise ValueError(f'paths must be at least 1, got {paths}')
+    if df is None:
+        df = backtester.sort_ticks(backtester.load_data(columns=backtester.TICK_COLUMNS))
+    prices = df['Execution Price'].to_numpy(dtype=float)
+    length = int(length or len(prices))
+    batch_size = max(1, min(int(batch_size), BATCH_CELLS // max(1, length)))
+    sizes = [batch_size] * (int(paths) // batch_size)
+    if int(paths) % batch_size:
+        sizes.append(int(paths) % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(strategy, params, n, s, length, block, slippage_jitter, fee_jitter) for n, s in zip(sizes, seeds)]
+    workers = max(1, int(workers or os.cpu_count() or 1))
+
+    with shm.shared({'Execution Price': prices}) as specs:
+        if workers == 1 or len(jobs) <= 1:
+            shm.attach(specs)
+            try:
+                outcomes = [_run_batch(job) for job in jobs]
+            finally:
+                shm.detach()
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=shm.attach, initargs=(specs,)) as pool:
+                outcomes = list(pool.map(_run_batch, jobs))
+
+    pnl = np.concatenate(outcomes)
+    historical = float(STRATEGIES[strategy](prices[None, :], **params)[0])
+    return {'pnl': pnl, 'summary': summarize(pnl), 'historical': historical}
+
+
+def add_arguments(parser):
+    """Register the ``montecarlo`` sub-commands on the backtester CLI."""
+    sub = parser.add_subparsers(dest='strategy', required=True)
+    t = sub.add_parser('twap', help='TWAP PnL distribution')
+    t.add_argument('total_qty', type=float)
+    t.add_argument('intervals', type=int)
+    t.add_argument('--side', choices=['BUY', 'SELL'], default='BUY')
+
+    g = sub.add_parser('grid', help='grid PnL distribution')
+    g.add_argument('lower_price', type=float)
+    g.add_argument('upper_price', type=float)
+    g.add_argument('levels', type=int)
+    g.add_argument('qty_per_order', type=float)
+
+    for p in (t, g):
+        p.add_argument('--slippage', type=float, default=0.02, help='slippage percent')
+        p.add_argument('--fee', type=float, default=0.04, help='fee percent')
+        p.add_argument('--paths', type=int, default=1000)
+        p.add_argument('--length', type=int, default=None, help='ticks per path (default: the history\'s length)')
+        p.add_argument('--block', type=int, default=BLOCK, help='bootstrap block length in ticks')
+        p.add_argument('--slippage-jitter', type=float, default=0.5, help='relative std of per-path slippage')
+        p.add_argument('--fee-jitter', type=float, default=0.0, help='relative std of per-path fees')
+        p.add_argument('--seed', type=int, default=0)
+        p.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+        p.add_argument('--out', default=None, help='per-path PnL CSV (default: data/montecarlo_<strategy>.csv)')
+
+
+def params_from_args(args):
+    if args.strategy == 'twap':
+        params = {'total_qty': args.total_qty, 'intervals': args.intervals, 'side': args.side}
+    else:
+        params = {'lower_price': args.lower_price, 'upper_price': args.upper_price,
+                  'levels': args.levels, 'qty_per_order': args.qty_per_order}
+    return dict(params, slippage_pct=args.slippage, fee_pct=args.fee)
+
+
+def main(args):
+    res = run_monte_carlo(args.strategy, params_from_args(args), paths=args.paths, length=args.length,
+                          block=args.block, slippage_jitter=args.slippage_jitter, fee_jitter=args.fee_jitter,
+                          seed=args.seed, workers=args.workers)
+    out = args.out or backtester.DATA_PATH.parent / f'montecarlo_{args.strategy}.csv'
+    pd.DataFrame({'path': np.arange(len(res['pnl'])), 'pnl': res['pnl']}).to_csv(out, index=False)
+    s = res['summary']
+    print(f"{s['paths']} {args.strategy} paths. Historical PnL {res['historical']:.4f}; per-path PnL saved to", out)
+    print(f"  mean {s['mean']:.4f}  std {s['std']:.4f}  P(loss) {s['prob_loss']:.1%}  CVaR 5% {s['cvar_5']:.4f}")
+    for q, v in s['quantiles'].items():
+        print(f'  p{q * 100:g}: {v:.4f}')
+    return res
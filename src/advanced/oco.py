@@ -1,50 +1,75 @@
 import time
 from src.config import get_client, logger
+from src.validation import prepare_order
 
-def place_oco(symbol, side, quantity, tp_price, sl_price, poll_interval=2, timeout=300):
+# statuses that complete each leg of the pair (a partial stop fill already exits)
+FILL_STATUSES = {'tp': ('FILLED',), 'sl': ('FILLED', 'PARTIALLY_FILLED')}
+
+
+def place_pair(client, symbol, side, quantity, tp_price, sl_price):
+    """Place the take-profit LIMIT and stop-loss STOP_MARKET legs; returns ``(tp_order, sl_order)``."""
+    exit_side = 'SELL' if side.upper() == 'BUY' else 'BUY'
+    quantity, tp_price, sl_price = prepare_order(client, symbol.upper(), quantity, tp_price, sl_price)
+    # Place take-profit (LIMIT) order
+    tp_order = client.futures_create_order(
+        symbol=symbol.upper(),
+        side=exit_side,
+        type='LIMIT',
+        timeInForce='GTC',
+        quantity=quantity,
+        price=str(tp_price)
+    )
+
+    # Place stop-loss (STOP_MARKET) order
+    sl_order = client.futures_create_order(
+        symbol=symbol.upper(),
+        side=exit_side,
+        type='STOP_MARKET',
+        stopPrice=str(sl_price),
+        quantity=quantity
+    )
+    return tp_order, sl_order
+
+
+def _order_status(client, state, symbol, order_id):
+    if state is not None and state.synced:
+        order = state.order(order_id)
+        if order is not None:
+            return order
+    return client.futures_get_order(symbol=symbol, orderId=order_id)
+
+
+def place_oco(symbol, side, quantity, tp_price, sl_price, poll_interval=2, timeout=300, state=None):
     """Place a take-profit limit and a stop-market (stop-loss) and cancel the other when one fills.
 
     Note: Binance Futures doesn't have a single OCO endpoint; this implements an app-level OCO via polling.
+    With a synced ``state`` (``src.account_state.AccountState``) leg statuses
+    are read locally and REST is only queried for orders the state lacks.
     """
     client = get_client()
     side = side.upper()
     try:
         logger.info('Placing OCO orders for %s %s qty=%s TP=%s SL=%s', symbol, side, quantity, tp_price, sl_price)
-
-        # Place take-profit (LIMIT) order
-        tp_order = client.futures_create_order(
-            symbol=symbol.upper(),
-            side='SELL' if side == 'BUY' else 'BUY',
-            type='LIMIT',
-            timeInForce='GTC',
-            quantity=quantity,
-            price=str(tp_price)
-        )
-
-        # Place stop-loss (STOP_MARKET) order
-        sl_order = client.futures_create_order(
-            symbol=symbol.upper(),
-            side='SELL' if side == 'BUY' else 'BUY',
-            type='STOP_MARKET',
-            stopPrice=str(sl_price),
-            quantity=quantity
-        )
+        tp_order, sl_order = place_pair(client, symbol, side, quantity, tp_price, sl_price)
 
         tp_id = tp_order['orderId']
         sl_id = sl_order['orderId']
+        if state is not None:
+            state.record_order(tp_order)
+            state.record_order(sl_order)
         start = time.time()
 
         # Poll for fills
         while time.time() - start < timeout:
-            tp_status = client.futures_get_order(symbol=symbol.upper(), orderId=tp_id)
-            sl_status = client.futures_get_order(symbol=symbol.upper(), orderId=sl_id)
+            tp_status = _order_status(client, state, symbol.upper(), tp_id)
+            sl_status = _order_status(client, state, symbol.upper(), sl_id)
 
-            if tp_status.get('status') == 'FILLED':
+            if tp_status.get('status') in FILL_STATUSES['tp']:
                 logger.info('TP filled. Cancelling SL %s', sl_id)
                 client.futures_cancel_order(symbol=symbol.upper(), orderId=sl_id)
                 return {'filled':'tp', 'order': tp_status}
 
-            if sl_status.get('status') in ('FILLED','PARTIALLY_FILLED'):
+            if sl_status.get('status') in FILL_STATUSES['sl']:
                 logger.info('SL filled. Cancelling TP %s', tp_id)
                 client.futures_cancel_order(symbol=symbol.upper(), orderId=tp_id)
                 return {'filled':'sl', 'order': sl_status}
@@ -0,0 +1,160 @@
+"""Track many OCO pairs from one shared REST poll loop.
+
+Each cycle fetches open orders once per symbol (weight 1 each), not
+``futures_get_order`` twice per pair. A leg that leaves the open-order
+list is confirmed with one ``futures_get_order``, and the siblings of every
+filled leg are cancelled in bulk per symbol. REST weight therefore grows
+with the number of symbols rather than the number of orders.
+"""
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future
+
+from src.config import get_client, logger
+from src.advanced.oco import FILL_STATUSES, place_pair
+from src.rate_limit import weight_headroom
+
+# Binance futures cancel-multiple accepts at most 10 ids per request
+CANCEL_BATCH = 10
+
+
+class _Pair:
+    __slots__ = ('symbol', 'tp_id', 'sl_id', 'future')
+
+    def __init__(self, symbol, tp_id, sl_id):
+        self.symbol = symbol
+        self.tp_id = tp_id
+        self.sl_id = sl_id
+        self.future = Future()
+
+
+class OCOManager:
+    def __init__(self, client=None, poll_interval=2.0, max_interval=30.0, sleep=time.sleep):
+        self.client = client or get_client()
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.sleep = sleep
+        self.stats = {'cycles': 0, 'open_order_calls': 0, 'get_order_calls': 0, 'cancel_calls': 0}
+        self._pairs = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def add(self, symbol, tp_id, sl_id):
+        """Track an already placed pair; returns a Future with ``{'filled', 'order'}``."""
+        pair = _Pair(symbol.upper(), tp_id, sl_id)
+        with self._lock:
+            self._pairs[(pair.symbol, tp_id, sl_id)] = pair
+        return pair.future
+
+    def place(self, symbol, side, quantity, tp_price, sl_price):
+        logger.info('Placing OCO orders for %s %s qty=%s TP=%s SL=%s', symbol, side, quantity, tp_price, sl_price)
+        tp_order, sl_order = place_pair(self.client, symbol, side, quantity, tp_price, sl_price)
+        return self.add(symbol, tp_order['orderId'], sl_order['orderId'])
+
+    def next_interval(self):
+        """Poll faster with plenty of weight headroom, back off as it runs out."""
+        headroom = weight_headroom(self.client)
+        if headroom is None or headroom >= 0.5:
+            return self.poll_interval
+        return self.poll_interval + (self.max_interval - self.poll_interval) * (1.0 - headroom / 0.5)
+
+    def _order_status(self, symbol, order_id):
+        self.stats['get_order_calls'] += 1
+        return self.client.futures_get_order(symbol=symbol, orderId=order_id)
+
+    def _fill(self, pair, open_orders):
+        """Return ``(leg, order)`` if a leg of ``pair`` has filled, else None."""
+        for leg, oid in (('tp', pair.tp_id), ('sl', pair.sl_id)):
+            order = open_orders.get(oid)
+            if order is None:
+                # gone from the book: filled, or cancelled/expired elsewhere
+                order = self._order_status(pair.symbol, oid)
+            if order.get('status') in FILL_STATUSES[leg]:
+                return leg, order
+        return None
+
+    def poll_once(self):
+        """Run one cycle over every tracked pair; returns the number resolved."""
+        with self._lock:
+            by_symbol = defaultdict(list)
+            for pair in self._pairs.values():
+                by_symbol[pair.symbol].append(pair)
+        self.stats['cycles'] += 1
+        resolved = 0
+        for symbol, pairs in by_symbol.items():
+            try:
+                self.stats['open_order_calls'] += 1
+                open_orders = {o['orderId']: o for o in self.client.futures_get_open_orders(symbol=symbol)}
+                done = []
+                for pair in pairs:
+                    if pair.tp_id in open_orders and pair.sl_id in open_orders \
+                            and open_orders[pair.sl_id].get('status') not in FILL_STATUSES['sl']:
+                        continue
+                    fill = self._fill(pair, open_orders)
+                    if fill is not None:
+                        done.append((pair, fill))
+                    elif pair.tp_id not in open_orders or pair.sl_id not in open_orders:
+                        # a leg was cancelled or expired outside the manager
+                        logger.warning('OCO %s/%s closed without a fill; dropping', pair.tp_id, pair.sl_id)
+                        done.append((pair, None))
+            except Exception as e:
+                logger.error('OCO poll for %s failed: %s', symbol, e)
+                continue
+            self._cancel_siblings(symbol, [(p, f) for p, f in done if f is not None], open_orders)
+            with self._lock:
+                for pair, fill in done:
+                    self._pairs.pop((pair.symbol, pair.tp_id, pair.sl_id), None)
+                    leg, order = fill if fill else (None, None)
+                    pair.future.set_result({'filled': leg, 'order': order})
+            resolved += len(done)
+        return resolved
+
+    def _cancel_siblings(self, symbol, fills, open_orders):
+        ids = []
+        for pair, (leg, _) in fills:
+            sibling = pair.sl_id if leg == 'tp' else pair.tp_id
+            logger.info('%s filled. Cancelling %s %s', leg.upper(), 'SL' if leg == 'tp' else 'TP', sibling)
+            if sibling in open_orders:
+                ids.append(sibling)
+        for i in range(0, len(ids), CANCEL_BATCH):
+            chunk = ids[i:i + CANCEL_BATCH]
+            try:
+                self.stats['cancel_calls'] += 1
+                if len(chunk) == 1:
+                    self.client.futures_cancel_order(symbol=symbol, orderId=chunk[0])
+                else:
+                    self.client.futures_cancel_orders(symbol=symbol, orderidlist=chunk)
+            except Exception as e:
+                logger.error('OCO cancel of %s on %s failed: %s', chunk, symbol, e)
+
+    def run(self, timeout=None):
+        """Poll until every pair resolves, ``stop()`` is called or ``timeout`` passes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stop.is_set() and self._pairs:
+            self.poll_once()
+            if not self._pairs or (deadline is not None and time.monotonic() >= deadline):
+                break
+            self.sleep(self.next_interval())
+
+    def start(self):
+        """Run the poll loop in a daemon thread; pairs may be added while it runs."""
+        def loop():
+            while not self._stop.is_set():
+                if self._pairs:
+                    self.poll_once()
+                self._stop.wait(self.next_interval())
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=loop, name='oco-manager', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
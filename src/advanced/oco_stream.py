@@ -0,0 +1,142 @@
+"""Event-driven OCO on top of the futures user-data stream.
+
+One ``OCOStream`` watches any number of TP/SL pairs. An ``ORDER_TRADE_UPDATE``
+that fills one leg cancels its sibling straight away, instead of waiting for
+the next REST poll. While the stream is down, the tracked pairs are polled
+over REST, and every (re)connect runs one poll to catch fills missed in
+the gap.
+"""
+import asyncio
+import time
+
+from src.config import get_client, logger
+from src.advanced.oco import FILL_STATUSES, place_pair
+from src.user_stream import UserDataStream
+
+
+class _Pair:
+    __slots__ = ('symbol', 'tp_id', 'sl_id', 'future', 'done')
+
+    def __init__(self, symbol, tp_id, sl_id, future):
+        self.symbol = symbol
+        self.tp_id = tp_id
+        self.sl_id = sl_id
+        self.future = future
+        self.done = False
+
+
+class OCOStream:
+    def __init__(self, client, stream=None, poll_interval=2):
+        self.client = client
+        self.stream = stream or UserDataStream(client)
+        self.stream.subscribe(self.on_event)
+        self.stream.on_connect.append(self.resync)
+        self.poll_interval = poll_interval
+        self.stats = {'stream_fills': 0, 'poll_fills': 0, 'polls': 0}
+        self._legs = {}
+        self._poll_task = None
+
+    @property
+    def pending(self):
+        return len({id(pair) for pair, _ in self._legs.values()})
+
+    def watch(self, symbol, tp_id, sl_id):
+        """Track a placed pair; returns a future resolved with ``{'filled', 'order', 'cancel_ms'}``."""
+        pair = _Pair(symbol.upper(), tp_id, sl_id, asyncio.get_running_loop().create_future())
+        self._legs[tp_id] = (pair, 'tp')
+        self._legs[sl_id] = (pair, 'sl')
+        return pair.future
+
+    def unwatch(self, future):
+        for oid, (pair, _) in list(self._legs.items()):
+            if pair.future is future:
+                pair.done = True
+                del self._legs[oid]
+
+    async def start(self):
+        await self.stream.start()
+        self._poll_task = asyncio.create_task(self._fallback_poll())
+
+    async def stop(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            await asyncio.gather(self._poll_task, return_exceptions=True)
+            self._poll_task = None
+        await self.stream.stop()
+
+    async def on_event(self, event):
+        if event.get('e') != 'ORDER_TRADE_UPDATE':
+            return
+        order = event.get('o', {})
+        entry = self._legs.get(order.get('i'))
+        if entry is None:
+            return
+        pair, leg = entry
+        if order.get('X') in FILL_STATUSES[leg]:
+            self.stats['stream_fills'] += 1
+            await self._resolve(pair, leg, order)
+
+    async def resync(self):
+        """Check every tracked pair over REST once (used on connect and while disconnected)."""
+        pairs = {id(p): p for p, _ in self._legs.values()}
+        self.stats['polls'] += 1
+        for pair in pairs.values():
+            for leg, oid in (('tp', pair.tp_id), ('sl', pair.sl_id)):
+                if pair.done:
+                    break
+                try:
+                    status = await asyncio.to_thread(self.client.futures_get_order, symbol=pair.symbol, orderId=oid)
+                except Exception as e:
+                    logger.warning('OCO poll for %s failed: %s', oid, e)
+                    continue
+                if status.get('status') in FILL_STATUSES[leg]:
+                    self.stats['poll_fills'] += 1
+                    await self._resolve(pair, leg, status)
+
+    async def _fallback_poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            if not self.stream.connected.is_set() and self._legs:
+                await self.resync()
+
+    async def _resolve(self, pair, leg, order):
+        if pair.done:
+            return
+        pair.done = True
+        self._legs.pop(pair.tp_id, None)
+        self._legs.pop(pair.sl_id, None)
+        sibling = pair.sl_id if leg == 'tp' else pair.tp_id
+        logger.info('%s filled. Cancelling %s %s', leg.upper(), 'SL' if leg == 'tp' else 'TP', sibling)
+        start = time.perf_counter()
+        try:
+            await asyncio.to_thread(self.client.futures_cancel_order, symbol=pair.symbol, orderId=sibling)
+        except Exception as e:
+            logger.error('OCO cancel of %s failed: %s', sibling, e)
+        if not pair.future.done():
+            pair.future.set_result({'filled': leg, 'order': order, 'cancel_ms': (time.perf_counter() - start) * 1000})
+
+
+async def place_oco_stream(symbol, side, quantity, tp_price, sl_price, timeout=300, oco_stream=None):
+    """Stream-driven counterpart of ``place_oco``; pass ``oco_stream`` to share one stream across pairs."""
+    client = oco_stream.client if oco_stream is not None else get_client()
+    own = oco_stream is None
+    if own:
+        oco_stream = OCOStream(client)
+    try:
+        logger.info('Placing OCO orders for %s %s qty=%s TP=%s SL=%s', symbol, side, quantity, tp_price, sl_price)
+        tp_order, sl_order = await asyncio.to_thread(place_pair, client, symbol, side, quantity, tp_price, sl_price)
+        future = oco_stream.watch(symbol, tp_order['orderId'], sl_order['orderId'])
+        if own:
+            await oco_stream.start()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            oco_stream.unwatch(future)
+            logger.warning('OCO timeout reached; leaving both orders active')
+            return {'filled': None}
+    except Exception as e:
+        logger.exception('OCO placement failed: %s', e)
+        return None
+    finally:
+        if own:
+            await oco_stream.stop()
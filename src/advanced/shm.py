@@ -0,0 +1,73 @@
+"""Tick columns shared with worker processes through named shared memory.
+
+The parent copies each column into a ``SharedMemory`` block once
+(``shared``). Workers map the blocks by name in their pool initializer
+(``attach``) and read them back as one DataFrame (``frame``), so no task
+pickles the ticks. Used by ``sweep`` and ``monte_carlo``.
+"""
+import contextlib
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# per-process view of the shared columns, set up by attach
+_local = {}
+
+
+def share(arr):
+    """Copy ``arr`` into a new shared block; returns ``(block, spec)``. The caller unlinks the block."""
+    arr = np.ascontiguousarray(arr)
+    block = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)[:] = arr
+    return block, (block.name, arr.shape, arr.dtype.str)
+
+
+@contextlib.contextmanager
+def shared(columns):
+    """Share every array in ``columns`` (name -> array); yields the specs for ``attach``."""
+    blocks = []
+    try:
+        specs = {}
+        for col, arr in columns.items():
+            block, specs[col] = share(arr)
+            blocks.append(block)
+        yield specs
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def attach(specs):
+    """Pool initializer: map the parent's shared blocks into this process."""
+    handles = []
+    cols = {}
+    for col, (name, shape, dtype) in specs.items():
+        block = shared_memory.SharedMemory(name=name)
+        handles.append(block)
+        cols[col] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    _local.clear()
+    _local['handles'] = handles
+    _local['df'] = pd.DataFrame(cols, copy=False)
+    _local['derived'] = {}
+
+
+def detach():
+    """Drop this process's mapping (for the in-process path; workers just exit)."""
+    for block in _local.pop('handles', []):
+        block.close()
+    _local.clear()
+
+
+def frame():
+    """The attached columns as a DataFrame."""
+    return _local['df']
+
+
+def derived(key, build):
+    """``build()`` computed once per attached process and kept under ``key``."""
+    cache = _local['derived']
+    if key not in cache:
+        cache[key] = build()
+    return cache[key]
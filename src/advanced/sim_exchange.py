@@ -0,0 +1,351 @@
+"""In-process futures exchange simulator that stands in for the Binance client.
+
+``SimExchange`` implements the order methods the strategies use:
+``futures_create_order``, ``futures_get_order``, ``futures_cancel_order``,
+``futures_get_open_orders``, ``futures_place_batch_order``,
+``futures_cancel_orders`` and ``futures_account_balance``. It fills LIMIT,
+STOP (stop-limit) and STOP_MARKET orders from a replayed tick tape. Resting
+orders sit in per-side heaps (price, then time priority). Replay only
+looks at the tops of the heaps, and it skips runs of ticks that cannot
+trigger anything with vectorized scans, so millions of ticks replay quickly.
+
+Inject it with ``src.config.use_client`` to backtest the live strategy
+functions unchanged::
+
+    ex = SimExchange.from_history(ticks_per_call=500)
+    with use_client(ex):
+        place_oco('BTCUSDT', 'BUY', 0.01, tp_price=..., sl_price=..., poll_interval=0)
+"""
+import heapq
+import itertools
+from collections import defaultdict
+
+import numpy as np
+
+ACTIVE = ('NEW', 'PARTIALLY_FILLED')
+
+
+class SimExchangeError(Exception):
+    """Mirrors ``BinanceAPIException``'s ``code``/``message`` attributes."""
+
+    def __init__(self, code, message):
+        super().__init__(f'APIError(code={code}): {message}')
+        self.code = code
+        self.message = message
+
+
+def _next_cross(prices, start, end, hi, lo, window=4096):
+    """First index in ``[start, end)`` with ``price <= hi`` or ``price >= lo``, or -1."""
+    i = start
+    while i < end:
+        j = min(end, i + window)
+        w = prices[i:j]
+        mask = np.zeros(len(w), dtype=bool)
+        if hi is not None:
+            mask |= w <= hi
+        if lo is not None:
+            mask |= w >= lo
+        k = int(mask.argmax())
+        if mask[k]:
+            return i + k
+        i = j
+        window *= 2
+    return -1
+
+
+class _Book:
+    """Resting orders for one symbol; heaps hold ``(key, seq, orderId)`` with lazy deletion."""
+
+    def __init__(self):
+        self.bids = []        # LIMIT BUY, best (highest) price first
+        self.asks = []        # LIMIT SELL, best (lowest) price first
+        self.buy_stops = []   # trigger when price >= stop, lowest stop first
+        self.sell_stops = []  # trigger when price <= stop, highest stop first
+
+
+class SimExchange:
+    def __init__(self, maker_fee_pct=0.02, taker_fee_pct=0.04, balance=10000.0, ticks_per_call=None):
+        self.maker_fee_pct = maker_fee_pct
+        self.taker_fee_pct = taker_fee_pct
+        self.start_balance = float(balance)
+        self.ticks_per_call = ticks_per_call
+        self.orders = {}
+        self.fills = []
+        self.positions = defaultdict(lambda: {'qty': 0.0, 'entry_price': 0.0, 'realized_pnl': 0.0, 'fees': 0.0})
+        self.last_price = {}
+        self.time = None
+        self._open = {}
+        self._books = defaultdict(_Book)
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._tape = None
+
+    # -- tape replay -------------------------------------------------------
+
+    @classmethod
+    def from_history(cls, path=None, symbol='BTCUSDT', **kwargs):
+        """Simulator loaded with the backtester's ``historical_data.csv`` tape."""
+        from src.advanced import backtester
+        df = backtester.sort_ticks(backtester.load_data(path or backtester.DATA_PATH, columns=backtester.TICK_COLUMNS))
+        ex = cls(**kwargs)
+        ex.load_tape(df['Execution Price'].to_numpy(dtype=float), df['Timestamp IST'].to_numpy(), symbol=symbol)
+        return ex
+
+    def load_tape(self, prices, timestamps=None, symbol='BTCUSDT'):
+        """Attach a tick tape; the first tick becomes the current price."""
+        prices = np.asarray(prices, dtype=float)
+        self._tape = {'symbol': symbol.upper(), 'prices': prices, 'ts': timestamps, 'cursor': 0}
+        if len(prices):
+            self._set_tick(symbol.upper(), 0)
+            self._tape['cursor'] = 1
+
+    @property
+    def exhausted(self):
+        return self._tape is None or self._tape['cursor'] >= len(self._tape['prices'])
+
+    def _set_tick(self, symbol, i):
+        tape = self._tape
+        self.last_price[symbol] = float(tape['prices'][i])
+        if tape['ts'] is not None:
+            self.time = tape['ts'][i]
+
+    def _thresholds(self, book):
+        """Prices at or below ``hi`` / at or above ``lo`` would trigger something."""
+        hi = lo = None
+        bid = self._top(book.bids)
+        if bid is not None:
+            hi = -bid[0]
+        sstop = self._top(book.sell_stops)
+        if sstop is not None:
+            hi = -sstop[0] if hi is None else max(hi, -sstop[0])
+        ask = self._top(book.asks)
+        if ask is not None:
+            lo = ask[0]
+        bstop = self._top(book.buy_stops)
+        if bstop is not None:
+            lo = bstop[0] if lo is None else min(lo, bstop[0])
+        return hi, lo
+
+    def advance(self, n=None):
+        """Replay the next ``n`` ticks (all remaining when None); returns ticks consumed."""
+        if self.exhausted:
+            return 0
+        tape = self._tape
+        symbol, prices = tape['symbol'], tape['prices']
+        start = tape['cursor']
+        end = len(prices) if n is None else min(len(prices), start + int(n))
+        book = self._books[symbol]
+        i = start
+        while i < end:
+            hi, lo = self._thresholds(book)
+            if hi is None and lo is None:
+                break
+            j = _next_cross(prices, i, end, hi, lo)
+            if j < 0:
+                break
+            self._set_tick(symbol, j)
+            self._match(symbol, float(prices[j]))
+            i = j + 1
+        if end > start:
+            self._set_tick(symbol, end - 1)
+        tape['cursor'] = end
+        return end - start
+
+    def _auto_advance(self, polling=False):
+        if self.ticks_per_call is None:
+            return
+        if polling and self.exhausted:
+            raise SimExchangeError(-1, 'simulation tape exhausted')
+        self.advance(self.ticks_per_call)
+
+    # -- matching ----------------------------------------------------------
+
+    def _top(self, heap):
+        while heap:
+            order = self.orders[heap[0][2]]
+            if order['status'] in ACTIVE and order['_resting'] is heap:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+
+    def _rest(self, order):
+        book = self._books[order['symbol']]
+        seq = next(self._seq)
+        if order['type'] == 'LIMIT':
+            heap, key = (book.bids, -order['_price']) if order['side'] == 'BUY' else (book.asks, order['_price'])
+        elif order['side'] == 'BUY':
+            heap, key = book.buy_stops, order['_stop']
+        else:
+            heap, key = book.sell_stops, -order['_stop']
+        order['_resting'] = heap
+        heapq.heappush(heap, (key, seq, order['orderId']))
+
+    def _match(self, symbol, price):
+        book = self._books[symbol]
+        while True:
+            top = self._top(book.bids)
+            if top is not None and price <= -top[0]:
+                heapq.heappop(book.bids)
+                order = self.orders[top[2]]
+                self._fill(order, order['_price'], taker=False)
+                continue
+            top = self._top(book.asks)
+            if top is not None and price >= top[0]:
+                heapq.heappop(book.asks)
+                order = self.orders[top[2]]
+                self._fill(order, order['_price'], taker=False)
+                continue
+            top = self._top(book.buy_stops)
+            if top is not None and price >= top[0]:
+                heapq.heappop(book.buy_stops)
+                self._trigger(self.orders[top[2]], price)
+                continue
+            top = self._top(book.sell_stops)
+            if top is not None and price <= -top[0]:
+                heapq.heappop(book.sell_stops)
+                self._trigger(self.orders[top[2]], price)
+                continue
+            return
+
+    def _trigger(self, order, price):
+        if order['type'] == 'STOP_MARKET':
+            self._fill(order, price, taker=True)
+            return
+        # stop-limit: becomes a resting LIMIT, or fills now if already marketable
+        order['type'] = 'LIMIT'
+        if self._marketable(order, price):
+            self._fill(order, price, taker=True)
+        else:
+            self._rest(order)
+
+    @staticmethod
+    def _marketable(order, price):
+        return price <= order['_price'] if order['side'] == 'BUY' else price >= order['_price']
+
+    def _fill(self, order, price, taker):
+        qty = order['_qty']
+        fee = price * qty * ((self.taker_fee_pct if taker else self.maker_fee_pct) / 100.0)
+        order.update(status='FILLED', executedQty=str(qty), avgPrice=str(price), updateTime=self.time, _resting=None)
+        self._open.pop(order['orderId'], None)
+        signed = qty if order['side'] == 'BUY' else -qty
+        pos = self.positions[order['symbol']]
+        if pos['qty'] == 0 or (pos['qty'] > 0) == (signed > 0):
+            total = pos['qty'] + signed
+            pos['entry_price'] = (pos['entry_price'] * abs(pos['qty']) + price * qty) / abs(total)
+            pos['qty'] = total
+        else:
+            closed = min(abs(signed), abs(pos['qty']))
+            direction = 1.0 if pos['qty'] > 0 else -1.0
+            pos['realized_pnl'] += (price - pos['entry_price']) * closed * direction
+            pos['qty'] += signed
+            if abs(pos['qty']) < 1e-12:
+                pos['qty'] = 0.0
+                pos['entry_price'] = 0.0
+            elif (pos['qty'] > 0) != (direction > 0):
+                pos['entry_price'] = price
+        pos['fees'] += fee
+        self.fills.append({'orderId': order['orderId'], 'symbol': order['symbol'], 'side': order['side'],
+                           'price': price, 'qty': qty, 'fee': fee, 'taker': taker, 'time': self.time})
+
+    # -- client surface ----------------------------------------------------
+
+    @staticmethod
+    def _public(order):
+        return {k: v for k, v in order.items() if not k.startswith('_')}
+
+    def _lookup(self, orderId):
+        order = self.orders.get(int(orderId))
+        if order is None:
+            raise SimExchangeError(-2013, 'Order does not exist.')
+        return order
+
+    def futures_create_order(self, **params):
+        self._auto_advance()
+        symbol = params['symbol'].upper()
+        side = params['side'].upper()
+        otype = params['type'].upper()
+        if otype not in ('MARKET', 'LIMIT', 'STOP', 'STOP_MARKET'):
+            raise SimExchangeError(-1116, f'Invalid orderType {otype}.')
+        qty = float(params['quantity'])
+        if qty <= 0:
+            raise SimExchangeError(-4003, 'Quantity less than or equal to zero.')
+        price = float(params['price']) if params.get('price') is not None else None
+        stop = float(params['stopPrice']) if params.get('stopPrice') is not None else None
+        if otype in ('LIMIT', 'STOP') and price is None:
+            raise SimExchangeError(-1102, "Mandatory parameter 'price' was not sent.")
+        if otype in ('STOP', 'STOP_MARKET') and stop is None:
+            raise SimExchangeError(-1102, "Mandatory parameter 'stopPrice' was not sent.")
+        last = self.last_price.get(symbol)
+        if last is None and otype == 'MARKET':
+            raise SimExchangeError(-1121, f'No price for {symbol}.')
+
+        oid = next(self._ids)
+        order = {
+            'orderId': oid, 'clientOrderId': params.get('newClientOrderId') or 'sim-%d' % oid, 'symbol': symbol, 'side': side, 'type': otype, 'origType': otype,
+            'status': 'NEW', 'origQty': str(qty), 'executedQty': '0', 'avgPrice': '0',
+            'price': str(price or 0), 'stopPrice': str(stop or 0),
+            'timeInForce': params.get('timeInForce', 'GTC'), 'updateTime': self.time,
+            '_qty': qty, '_price': price, '_stop': stop, '_resting': None,
+        }
+        self.orders[order['orderId']] = order
+        self._open[order['orderId']] = order
+
+        if otype == 'MARKET':
+            self._fill(order, last, taker=True)
+        elif otype == 'LIMIT' and last is not None and self._marketable(order, last):
+            self._fill(order, last, taker=True)
+        elif otype in ('STOP', 'STOP_MARKET') and last is not None and \
+                (last >= stop if side == 'BUY' else last <= stop):
+            raise SimExchangeError(-2021, 'Order would immediately trigger.')
+        else:
+            self._rest(order)
+        return self._public(order)
+
+    def futures_place_batch_order(self, batchOrders):
+        out = []
+        for params in batchOrders:
+            try:
+                out.append(self.futures_create_order(**params))
+            except SimExchangeError as e:
+                out.append({'code': e.code, 'msg': e.message})
+        return out
+
+    def futures_get_order(self, symbol, orderId, **params):
+        self._auto_advance(polling=True)
+        return self._public(self._lookup(orderId))
+
+    def futures_get_open_orders(self, symbol=None, **params):
+        self._auto_advance(polling=True)
+        symbol = symbol.upper() if symbol else None
+        return [self._public(o) for o in self._open.values() if symbol is None or o['symbol'] == symbol]
+
+    def futures_cancel_order(self, symbol, orderId, **params):
+        order = self._lookup(orderId)
+        if order['status'] not in ACTIVE:
+            raise SimExchangeError(-2011, 'Unknown order sent.')
+        order.update(status='CANCELED', updateTime=self.time, _resting=None)
+        self._open.pop(order['orderId'], None)
+        return self._public(order)
+
+    def futures_cancel_orders(self, symbol, orderidlist, **params):
+        out = []
+        for oid in orderidlist:
+            try:
+                out.append(self.futures_cancel_order(symbol=symbol, orderId=oid))
+            except SimExchangeError as e:
+                out.append({'code': e.code, 'msg': e.message})
+        return out
+
+    def futures_account_balance(self, **params):
+        pnl = sum(p['realized_pnl'] - p['fees'] for p in self.positions.values())
+        return [{'asset': 'USDT', 'balance': str(self.start_balance + pnl)}]
+
+    def summary(self):
+        """Per-symbol position, realized/unrealized PnL and fees."""
+        out = {}
+        for symbol, pos in self.positions.items():
+            last = self.last_price.get(symbol, pos['entry_price'])
+            unrealized = (last - pos['entry_price']) * pos['qty']
+            out[symbol] = dict(pos, last_price=last, unrealized_pnl=unrealized,
+                               net_pnl=pos['realized_pnl'] + unrealized - pos['fees'])
+        return out
@@ -1,4 +1,5 @@
 from src.config import get_client, logger
+from src.validation import prepare_order
 
 def place_stop_limit(symbol, side, quantity, stop_price, limit_price, time_in_force='GTC'):
     """Place a STOP-LIMIT by creating a STOP order that places a limit when triggered.
@@ -7,6 +8,7 @@ def place_stop_limit(symbol, side, quantity, stop_price, limit_price, time_in_fo
     """
     client = get_client()
     try:
+        quantity, limit_price, stop_price = prepare_order(client, symbol.upper(), quantity, limit_price, stop_price)
         order = client.futures_create_order(
             symbol=symbol.upper(),
             side=side.upper(),
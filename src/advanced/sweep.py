@@ -0,0 +1,154 @@
+"""Parallel parameter sweeps for the TWAP and grid backtests.
+
+The tick arrays are loaded once in the parent and placed in shared memory
+(``src.advanced.shm``); worker processes attach to them by name instead of
+receiving pickled DataFrames, so each extra configuration only costs the
+simulation itself.
+"""
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+from src.advanced import backtester, shm
+
+PARAMS = {
+    'twap': ['total_qty', 'intervals', 'side', 'slippage_pct', 'fee_pct'],
+    'grid': ['lower_price', 'upper_price', 'levels', 'qty_per_order', 'slippage_pct', 'fee_pct'],
+}
+
+
+def parse_values(tokens, cast=float):
+    """Expand CLI tokens into values; ``start:stop:step`` is an inclusive range."""
+    values = []
+    for tok in tokens:
+        tok = str(tok)
+        if ':' not in tok:
+            values.append(cast(tok))
+            continue
+        start, stop, step = (Decimal(x) for x in tok.split(':'))
+        if step <= 0:
+            raise ValueError(f'range step must be positive: {tok}')
+        v = start
+        while v <= stop:
+            values.append(cast(v))
+            v += step
+    return values
+
+
+def build_tasks(strategy, grid):
+    """Cartesian product of ``grid`` (param -> values) in a stable order."""
+    names = PARAMS[strategy]
+    return [dict(zip(names, combo)) for combo in itertools.product(*(grid[n] for n in names))]
+
+
+def _run_one(job):
+    strategy, params = job
+    df = shm.frame()
+    if strategy == 'twap':
+        res = backtester.run_twap(df, **params)
+        return {'pnl': float(res['pnl']), 'avg_price': float(res['avg_price'])}
+    res = backtester.run_grid(df, **params)
+    fills = res['fills']
+    return {'pnl': float(res['total_pnl']), 'filled_levels': len(fills)}
+
+
+def run_sweep(strategy, tasks, df=None, workers=None):
+    """Run every parameter set in ``tasks`` and return a DataFrame ranked by PnL.
+
+    Ties keep the input order, so identical inputs always give identical output.
+    """
+    if df is None:
+        df = backtester.sort_ticks(backtester.load_data(columns=backtester.TICK_COLUMNS))
+    workers = max(1, int(workers or os.cpu_count() or 1))
+    jobs = [(strategy, params) for params in tasks]
+
+    with shm.shared({col: df[col].to_numpy() for col in backtester.TICK_COLUMNS}) as specs:
+        if workers == 1 or len(jobs) <= 1:
+            shm.attach(specs)
+            try:
+                outcomes = [_run_one(job) for job in jobs]
+            finally:
+                shm.detach()
+        else:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=shm.attach, initargs=(specs,)) as pool:
+                outcomes = list(pool.map(_run_one, jobs, chunksize=chunksize))
+
+    rows = [{'run': i, **params, **out} for i, (params, out) in enumerate(zip(tasks, outcomes))]
+    res = pd.DataFrame(rows)
+    if res.empty:
+        return res
+    res = res.sort_values(['pnl', 'run'], ascending=[False, True], kind='mergesort').reset_index(drop=True)
+    res.insert(0, 'rank', np.arange(1, len(res) + 1))
+    return res
+
+
+def add_arguments(parser):
+    """Register the ``sweep`` sub-commands on the backtester CLI."""
+    sub = parser.add_subparsers(dest='strategy', required=True)
+    t = sub.add_parser('twap', help='sweep TWAP parameters')
+    t.add_argument('--total-qty', nargs='+', required=True)
+    t.add_argument('--intervals', nargs='+', required=True, help='values or start:stop:step')
+    t.add_argument('--side', nargs='+', choices=['BUY', 'SELL'], default=['BUY'])
+    t.add_argument('--slippage', nargs='+', default=['0.02'])
+    t.add_argument('--fee', nargs='+', default=['0.04'])
+
+    g = sub.add_parser('grid', help='sweep grid parameters')
+    g.add_argument('--lower', nargs='+', required=True)
+    g.add_argument('--upper', nargs='+', required=True)
+    g.add_argument('--levels', nargs='+', required=True, help='values or start:stop:step')
+    g.add_argument('--qty', nargs='+', required=True)
+    g.add_argument('--slippage', nargs='+', default=['0.02'])
+    g.add_argument('--fee', nargs='+', default=['0.04'])
+
+    for p in (t, g):
+        p.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+        p.add_argument('--out', default=None, help='results CSV (default: data/sweep_<strategy>.csv)')
+        p.add_argument('--top', type=int, default=10, help='rows to print')
+        p.add_argument('--charts', type=int, default=0, help='render charts for the best N configurations')
+
+
+def grid_from_args(args):
+    if args.strategy == 'twap':
+        return {
+            'total_qty': parse_values(args.total_qty),
+            'intervals': parse_values(args.intervals, int),
+            'side': list(args.side),
+            'slippage_pct': parse_values(args.slippage),
+            'fee_pct': parse_values(args.fee),
+        }
+    return {
+        'lower_price': parse_values(args.lower),
+        'upper_price': parse_values(args.upper),
+        'levels': parse_values(args.levels, int),
+        'qty_per_order': parse_values(args.qty),
+        'slippage_pct': parse_values(args.slippage),
+        'fee_pct': parse_values(args.fee),
+    }
+
+
+def render_top(strategy, tasks, res, df, n, out_dir=None, workers=None):
+    """Re-run the ``n`` best configurations and render their charts in one batch."""
+    run = backtester.run_twap if strategy == 'twap' else backtester.run_grid
+    jobs = []
+    for rank, idx in zip(res['rank'][:n], res['run'][:n]):
+        jobs.append((strategy, run(df, **tasks[idx]), out_dir, f'sweep_{strategy}_rank{rank}.png'))
+    return backtester.render_batch(jobs, workers=workers)
+
+
+def main(args):
+    tasks = build_tasks(args.strategy, grid_from_args(args))
+    df = backtester.sort_ticks(backtester.load_data(columns=backtester.TICK_COLUMNS))
+    res = run_sweep(args.strategy, tasks, df=df, workers=args.workers)
+    out = args.out or backtester.DATA_PATH.parent / f'sweep_{args.strategy}.csv'
+    res.to_csv(out, index=False)
+    print(f'{len(res)} {args.strategy} configurations ranked by PnL. Results saved to', out)
+    print(res.head(args.top).to_string(index=False))
+    if args.charts:
+        imgs = render_top(args.strategy, tasks, res, df, args.charts, workers=args.workers)
+        print(f'{len(imgs)} charts saved under', imgs[0].parent if imgs else backtester.DATA_PATH.parent)
+    return res
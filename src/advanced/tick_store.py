@@ -0,0 +1,143 @@
+"""Columnar on-disk cache for the historical tick CSV.
+
+The CSV is parsed once into one ``.npy`` file per column under
+``data/.cache/<stem>/``. Later loads memory-map only the requested columns,
+so startup no longer pays the CSV parse and RSS stays flat for large files.
+The cache is rebuilt when the source changes (size, then mtime, then sha256).
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+
+def cache_dir_for(path):
+    path = Path(path)
+    return path.parent / '.cache' / path.stem
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(chunk_size), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(Path(cache_dir) / MANIFEST) as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def _write_manifest(cache_dir, manifest):
+    tmp = Path(cache_dir) / (MANIFEST + '.tmp')
+    with open(tmp, 'w') as fh:
+        json.dump(manifest, fh, indent=1)
+    os.replace(tmp, Path(cache_dir) / MANIFEST)
+
+
+def _column_array(series):
+    """Return ``(array, tz)`` for a column in a form ``np.load(mmap_mode='r')`` can map."""
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return series.dt.tz_convert('UTC').dt.tz_localize(None).to_numpy(), str(series.dt.tz)
+    if series.dtype.kind in 'biufM':
+        return series.to_numpy(), None
+    # object/string columns become fixed-width unicode, which is mmap-able
+    return series.fillna('').astype(str).to_numpy(dtype=str), None
+
+
+def build_cache(path, parse_dates=None, cache_dir=None):
+    """Parse ``path`` once and write its columns to ``cache_dir``; returns the manifest."""
+    path = Path(path)
+    cache_dir = Path(cache_dir or cache_dir_for(path))
+    cache_dir.parent.mkdir(parents=True, exist_ok=True)
+    st = os.stat(path)
+    digest = _file_digest(path)
+    df = pd.read_csv(path, parse_dates=parse_dates or False)
+
+    tmp = Path(tempfile.mkdtemp(prefix=cache_dir.name + '.', dir=cache_dir.parent))
+    try:
+        columns = []
+        for i, name in enumerate(df.columns):
+            arr, tz = _column_array(df[name])
+            fname = f'c{i}.npy'
+            np.save(tmp / fname, arr, allow_pickle=False)
+            columns.append({'name': name, 'file': fname, 'tz': tz})
+        manifest = {
+            'version': FORMAT_VERSION,
+            'source': str(path),
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'sha256': digest,
+            'rows': len(df),
+            'parse_dates': list(parse_dates or []),
+            'columns': columns,
+        }
+        _write_manifest(tmp, manifest)
+        if cache_dir.exists():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        os.replace(tmp, cache_dir)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return manifest
+
+
+def ensure_cache(path, parse_dates=None, cache_dir=None):
+    """Return a manifest that matches the current contents of ``path``, rebuilding if stale."""
+    path = Path(path)
+    cache_dir = Path(cache_dir or cache_dir_for(path))
+    manifest = _read_manifest(cache_dir)
+    st = os.stat(path)
+    if manifest and manifest['size'] == st.st_size and manifest['parse_dates'] == list(parse_dates or []):
+        if manifest['mtime_ns'] == st.st_mtime_ns:
+            return manifest
+        # touched but possibly unchanged: confirm with the hash before rebuilding
+        if _file_digest(path) == manifest['sha256']:
+            manifest['mtime_ns'] = st.st_mtime_ns
+            _write_manifest(cache_dir, manifest)
+            return manifest
+    return build_cache(path, parse_dates=parse_dates, cache_dir=cache_dir)
+
+
+def load_columns(path, columns=None, parse_dates=None, cache_dir=None):
+    """Memory-map the cached columns of ``path`` (all of them when ``columns`` is None)."""
+    cache_dir = Path(cache_dir or cache_dir_for(path))
+    manifest = ensure_cache(path, parse_dates=parse_dates, cache_dir=cache_dir)
+    by_name = {c['name']: c for c in manifest['columns']}
+    wanted = list(columns) if columns is not None else list(by_name)
+    missing = [c for c in wanted if c not in by_name]
+    if missing:
+        raise KeyError(f'columns not in {path}: {missing}')
+    out = {}
+    for name in wanted:
+        meta = by_name[name]
+        out[name] = (np.load(cache_dir / meta['file'], mmap_mode='r'), meta['tz'])
+    return out
+
+
+def load_frame(path, columns=None, parse_dates=None, cache_dir=None):
+    """Like ``pd.read_csv(path, usecols=columns, parse_dates=...)`` but backed by the cache."""
+    data = {}
+    for name, (arr, tz) in load_columns(path, columns, parse_dates, cache_dir).items():
+        if tz:
+            data[name] = pd.Series(pd.DatetimeIndex(arr).tz_localize('UTC').tz_convert(tz))
+        elif arr.dtype.kind == 'U':
+            data[name] = pd.Series(arr.astype(object))
+        else:
+            data[name] = arr
+    return pd.DataFrame(data, copy=False)
@@ -1,11 +1,19 @@
 import time
 from src.config import get_client, logger
+from src.validation import order_validator
 
 def twap_order(symbol, side, total_qty, intervals, delay):
     client = get_client()
     chunk_qty = float(total_qty) / int(intervals)
+    try:
+        # snap the slice size down to the lot step once, before any order goes out
+        validator = order_validator(client, symbol.upper())
+        chunk_qty = validator.snap_qty(chunk_qty) if validator is not None else round(chunk_qty, 3)
+    except ValueError as e:
+        logger.error("TWAP rejected before sending: %s", e)
+        return
     
-    logger.info(f"Starting TWAP: {total_qty} {symbol} over {intervals} intervals.")
+    logger.info("Starting TWAP: %s %s over %s intervals.", total_qty, symbol, intervals)
     
     for i in range(int(intervals)):
         try:
@@ -13,13 +21,13 @@ def twap_order(symbol, side, total_qty, intervals, delay):
                 symbol=symbol.upper(),
                 side=side.upper(),
                 type='MARKET',
-                quantity=round(chunk_qty, 3)
+                quantity=chunk_qty
             )
-            logger.info(f"TWAP Progress: {i+1}/{intervals} executed. OrderID: {order['orderId']}")
+            logger.info("TWAP Progress: %d/%s executed. OrderID: %s", i + 1, intervals, order['orderId'])
             if i < int(intervals) - 1:
                 time.sleep(delay)
         except Exception as e:
-            logger.error(f"TWAP Error at step {i+1}: {str(e)}")
+            logger.error("TWAP Error at step %d: %s", i + 1, e)
             break
 
 if __name__ == "__main__":
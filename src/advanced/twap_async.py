@@ -0,0 +1,173 @@
+"""Asyncio TWAP engine: many TWAP jobs, one event loop.
+
+Slice ``i`` of a job fires at ``start + i * delay``, an absolute deadline,
+so order round trips never push later slices back. Each slice records its
+scheduling lag (fire time minus deadline) and fill latency (order round
+trip). The clock is pluggable: ``SimulatedClock`` plus a fake async
+exchange make the engine testable without waiting in real time.
+"""
+import asyncio
+import heapq
+import itertools
+
+from src.config import logger
+
+
+class LoopClock:
+    """Wall clock backed by the running event loop's monotonic time."""
+
+    def now(self):
+        return asyncio.get_running_loop().time()
+
+    async def sleep_until(self, deadline):
+        await asyncio.sleep(max(0.0, deadline - self.now()))
+
+    async def sleep(self, secs):
+        await asyncio.sleep(secs)
+
+
+class SimulatedClock:
+    """Virtual time: when every task is waiting, jump to the earliest deadline."""
+
+    def __init__(self, start=0.0, settle_steps=20):
+        self._now = float(start)
+        self._waiters = []
+        self._seq = itertools.count()
+        self._driver = None
+        self.settle_steps = settle_steps
+
+    def now(self):
+        return self._now
+
+    async def sleep_until(self, deadline):
+        if deadline <= self._now:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (deadline, next(self._seq), fut))
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.create_task(self._drive())
+        await fut
+
+    async def sleep(self, secs):
+        await self.sleep_until(self._now + secs)
+
+    async def _drive(self):
+        while self._waiters:
+            # let runnable tasks reach their next sleep before time moves
+            for _ in range(self.settle_steps):
+                await asyncio.sleep(0)
+            deadline = self._waiters[0][0]
+            self._now = max(self._now, deadline)
+            while self._waiters and self._waiters[0][0] <= self._now:
+                _, _, fut = heapq.heappop(self._waiters)
+                if not fut.done():
+                    fut.set_result(None)
+
+
+class TwapJob:
+    def __init__(self, symbol, side, total_qty, intervals, delay, start=None):
+        self.symbol = symbol.upper()
+        self.side = side.upper()
+        self.total_qty = float(total_qty)
+        self.intervals = int(intervals)
+        self.delay = float(delay)
+        self.start = start
+        self.slices = []
+        self.error = None
+
+    @property
+    def chunk_qty(self):
+        return round(self.total_qty / self.intervals, 3)
+
+    def stats(self):
+        lags = [s['lag'] for s in self.slices]
+        latencies = [s['latency'] for s in self.slices]
+        return {
+            'symbol': self.symbol,
+            'executed': len(self.slices),
+            'intervals': self.intervals,
+            'max_lag': max(lags, default=0.0),
+            'mean_lag': sum(lags) / len(lags) if lags else 0.0,
+            'max_latency': max(latencies, default=0.0),
+            'mean_latency': sum(latencies) / len(latencies) if latencies else 0.0,
+            'error': self.error,
+        }
+
+
+class TwapEngine:
+    def __init__(self, client, clock=None):
+        """``client`` must expose an async ``futures_create_order`` (e.g. binance.AsyncClient)."""
+        self.client = client
+        self.clock = clock or LoopClock()
+        self.jobs = []
+
+    def submit(self, symbol, side, total_qty, intervals, delay, start=None):
+        job = TwapJob(symbol, side, total_qty, intervals, delay, start=start)
+        self.jobs.append(job)
+        return job
+
+    async def run(self):
+        """Run every submitted job concurrently; returns the jobs."""
+        await asyncio.gather(*(self._run_job(job) for job in self.jobs))
+        return self.jobs
+
+    async def _run_job(self, job):
+        start = self.clock.now() if job.start is None else job.start
+        logger.info('Starting TWAP: %s %s over %s intervals.', job.total_qty, job.symbol, job.intervals)
+        for i in range(job.intervals):
+            deadline = start + i * job.delay
+            await self.clock.sleep_until(deadline)
+            fired = self.clock.now()
+            try:
+                order = await self.client.futures_create_order(
+                    symbol=job.symbol,
+                    side=job.side,
+                    type='MARKET',
+                    quantity=job.chunk_qty
+                )
+            except Exception as e:
+                job.error = str(e)
+                logger.error('TWAP Error at step %d: %s', i + 1, e)
+                break
+            done = self.clock.now()
+            job.slices.append({'slice': i + 1, 'deadline': deadline, 'lag': fired - deadline,
+                               'latency': done - fired, 'orderId': order.get('orderId')})
+            logger.info('TWAP Progress: %d/%d executed. OrderID: %s', i + 1, job.intervals, order.get('orderId'))
+
+
+async def run_twaps(specs, client=None, clock=None):
+    """Run several ``(symbol, side, total_qty, intervals, delay)`` TWAPs in one loop.
+
+    Without ``client`` a ``binance.AsyncClient`` is created from the config
+    credentials, signed and clock-synced like the sync client, paced by the
+    shared rate limiters, and closed afterwards.
+    """
+    own = client is None
+    if own:
+        client = await connect()
+    try:
+        engine = TwapEngine(client, clock=clock)
+        for spec in specs:
+            engine.submit(*spec)
+        return await engine.run()
+    finally:
+        if own:
+            if client.time_sync is not None:
+                client.time_sync.stop()
+            await client.close_connection()
+
+
+async def connect():
+    """``binance.AsyncClient`` from the config credentials, set up like ``config.get_client``'s."""
+    from binance import AsyncClient
+    from src import config
+    from src.metrics import InstrumentedClient
+    from src.rate_limit import RateLimitedClient
+    from src.time_sync import TimeSync, install_signer
+    raw = await AsyncClient.create(config.API_KEY, config.API_SECRET, testnet=config.USE_TESTNET)
+    install_signer(raw, config.API_SECRET)
+    client = RateLimitedClient(InstrumentedClient(raw))
+    if config.settings.time_sync_interval > 0:
+        client.time_sync = await TimeSync(client, config.settings.time_sync_interval).start_async()
+    return client
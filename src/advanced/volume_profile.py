@@ -0,0 +1,267 @@
+"""Intraday volume profile per symbol, built from the tick history.
+
+A profile is one float64 row per symbol holding the volume traded in each
+``bucket_minutes`` slot of the day (288 slots at 5 minutes), keyed by the
+time of day of ``Timestamp IST``. ``schedule`` turns it into the fraction
+of a day's volume expected in each slice of an execution window, which is
+what the VWAP executor and backtest size their slices by.
+
+``build_profile`` reads the CSV in chunks with one ``bincount`` per chunk
+and caches the result next to the tick cache
+(``data/.cache/<stem>.profile<minutes>.npz``). The cache records how many
+bytes it has consumed plus a fingerprint of the last block. When the file
+has only grown, a rebuild parses just the appended rows. Any other change
+starts over.
+"""
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.advanced import tick_store
+from src.config import logger
+
+BUCKET_MINUTES = 5
+MINUTES_PER_DAY = 24 * 60
+TIMESTAMP_COLUMN = 'Timestamp IST'
+# traded size per fill; without it every tick counts as one unit of volume
+VOLUME_COLUMN = 'Size Tokens'
+SYMBOL_COLUMN = 'Coin'
+ALL = '*'
+# futures quote assets, stripped from a symbol when exchange info is not at hand
+QUOTE_ASSETS = ('USDT', 'USDC', 'BUSD')
+CHUNK_ROWS = 1_000_000
+FINGERPRINT_BYTES = 1 << 16
+FORMAT_VERSION = 1
+
+
+class VolumeProfile:
+    def __init__(self, bucket_minutes=BUCKET_MINUTES):
+        if MINUTES_PER_DAY % bucket_minutes:
+            raise ValueError('bucket_minutes must divide a day')
+        self.bucket_minutes = int(bucket_minutes)
+        self.buckets = MINUTES_PER_DAY // self.bucket_minutes
+        self.volume = {}          # symbol -> float64[buckets]
+        self.rows = 0
+
+    def add(self, timestamps, volume=None, symbols=None):
+        """Accumulate ticks: ``timestamps`` (datetime64), optional sizes and symbol labels."""
+        ns = np.asarray(timestamps, dtype='datetime64[ns]').view('i8')
+        if not len(ns):
+            return self
+        bucket = (ns // 60_000_000_000) % MINUTES_PER_DAY // self.bucket_minutes
+        weights = None if volume is None else np.nan_to_num(np.asarray(volume, dtype=float))
+        if symbols is not None:
+            # one bincount over (symbol, bucket) pairs instead of a pass per symbol
+            codes, names = pd.factorize(np.asarray(symbols), sort=False)
+            flat = np.bincount(codes * self.buckets + bucket, weights=weights,
+                               minlength=len(names) * self.buckets).reshape(len(names), self.buckets)
+            for name, row in zip(names, flat):
+                self._add_row(str(name).upper(), row)
+            self._add_row(ALL, flat.sum(axis=0))
+        else:
+            self._add_row(ALL, np.bincount(bucket, weights=weights, minlength=self.buckets))
+        self.rows += len(ns)
+        return self
+
+    def _add_row(self, symbol, row):
+        current = self.volume.get(symbol)
+        if current is None:
+            self.volume[symbol] = row.astype(float)
+        else:
+            current += row
+
+    def weights(self, symbol=None):
+        """Share of daily volume per bucket for ``symbol`` (all symbols if unknown; flat if empty).
+
+        ``symbol`` is a history ``Coin`` (``BTC``) or an exchange symbol
+        (``BTCUSDT``), which is matched through ``coin_for``.
+        """
+        row = None
+        if symbol:
+            row = self.volume.get(symbol.upper())
+            if row is None:
+                row = self.volume.get(coin_for(symbol))
+            if row is None:
+                logger.warning('No %s volume in the history; using the all-coin profile', symbol.upper())
+        if row is None:
+            row = self.volume.get(ALL)
+        if row is None or row.sum() <= 0:
+            return np.full(self.buckets, 1.0 / self.buckets)
+        return row / row.sum()
+
+    def expected(self, minutes, symbol=None):
+        """Cumulative share of volume from midnight to ``minutes`` (may exceed one day)."""
+        cum = np.concatenate(([0.0], np.cumsum(self.weights(symbol))))
+        minutes = np.asarray(minutes, dtype=float)
+        days, within = np.divmod(minutes, MINUTES_PER_DAY)
+        return days + np.interp(within / self.bucket_minutes, np.arange(self.buckets + 1), cum)
+
+    def schedule(self, start_minute, duration_minutes, slices, symbol=None):
+        """Fraction of the total to trade in each of ``slices`` equal slices.
+
+        The window starts ``start_minute`` after midnight and lasts
+        ``duration_minutes``. Each slice gets its share of the volume
+        expected in the window. Volume is spread evenly within a bucket.
+        """
+        edges = start_minute + np.linspace(0.0, float(duration_minutes), int(slices) + 1)
+        share = np.diff(self.expected(edges, symbol))
+        total = share.sum()
+        if total <= 0:
+            return np.full(int(slices), 1.0 / int(slices))
+        return share / total
+
+    # -- persistence ---------------------------------------------------------
+
+    def save(self, path, state=None):
+        names = sorted(self.volume)
+        tmp = '%s.%d.tmp.npz' % (path, os.getpid())
+        np.savez(tmp, symbols=np.array(names, dtype=str),
+                 volume=np.array([self.volume[n] for n in names]).reshape(len(names), self.buckets),
+                 meta=np.array(json.dumps(dict(state or {}, version=FORMAT_VERSION, rows=self.rows,
+                                                    bucket_minutes=self.bucket_minutes))))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        """``(profile, state)`` from a file written by ``save``."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('version') != FORMAT_VERSION:
+                raise ValueError('unsupported volume profile format')
+            profile = cls(meta['bucket_minutes'])
+            profile.rows = meta['rows']
+            for name, row in zip(data['symbols'], data['volume']):
+                profile.volume[str(name)] = row.astype(float)
+        return profile, meta
+
+
+def coin_for(symbol, client=None):
+    """History ``Coin`` for an exchange symbol: ``BTCUSDT`` -> ``BTC``.
+
+    Uses the symbol's ``baseAsset`` from ``client``'s exchange info when a
+    client is given, otherwise strips a known quote asset.
+    """
+    symbol = symbol.upper()
+    if client is not None and hasattr(client, 'futures_exchange_info'):
+        from src.exchange_info import exchange_info_cache
+        try:
+            info = exchange_info_cache(client).symbol_info(symbol)
+        except Exception as e:
+            logger.warning('Exchange info unavailable for %s: %s', symbol, e)
+            info = None
+        if info and info.get('baseAsset'):
+            return info['baseAsset'].upper()
+    for quote in QUOTE_ASSETS:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return symbol[:-len(quote)]
+    return symbol
+
+
+def profile_path(path, bucket_minutes=BUCKET_MINUTES):
+    path = Path(path)
+    return tick_store.cache_dir_for(path).parent / ('%s.profile%d.npz' % (path.stem, bucket_minutes))
+
+
+class _ByteRange(io.RawIOBase):
+    """Read-only view of ``fh`` between two offsets, for parsing only complete lines."""
+
+    def __init__(self, fh, start, end):
+        self.fh = fh
+        self.left = end - start
+        fh.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        n = self.fh.readinto(memoryview(buf)[:min(len(buf), self.left)])
+        self.left -= n
+        return n
+
+
+def _fingerprint(fh, end):
+    start = max(0, end - FINGERPRINT_BYTES)
+    fh.seek(start)
+    return hashlib.sha256(fh.read(end - start)).hexdigest()
+
+
+def _complete_end(fh, size):
+    """Offset just past the last newline, so a half-written last line is left for later."""
+    pos = size
+    while pos > 0:
+        step = min(FINGERPRINT_BYTES, pos)
+        fh.seek(pos - step)
+        block = fh.read(step)
+        nl = block.rfind(b'\n')
+        if nl >= 0:
+            return pos - step + nl + 1
+        pos -= step
+    return 0
+
+
+def _read_rows(fh, start, end, header, chunk_rows):
+    usecols = [c for c in (TIMESTAMP_COLUMN, VOLUME_COLUMN, SYMBOL_COLUMN) if c in header]
+    if TIMESTAMP_COLUMN not in usecols:
+        raise KeyError('%s column missing from tick history' % TIMESTAMP_COLUMN)
+    reader = pd.read_csv(io.BufferedReader(_ByteRange(fh, start, end)), header=None, names=header,
+                         usecols=usecols, parse_dates=[TIMESTAMP_COLUMN], chunksize=chunk_rows)
+    for chunk in reader:
+        yield (chunk[TIMESTAMP_COLUMN].to_numpy(),
+               chunk[VOLUME_COLUMN].to_numpy(dtype=float) if VOLUME_COLUMN in chunk else None,
+               chunk[SYMBOL_COLUMN].astype(str).to_numpy() if SYMBOL_COLUMN in chunk else None)
+
+
+def build_profile(path=None, bucket_minutes=BUCKET_MINUTES, use_cache=True, chunk_rows=CHUNK_ROWS):
+    """Volume profile of the tick CSV at ``path``, reusing and extending the cached one."""
+    from src.advanced.backtester import DATA_PATH
+    path = Path(path or DATA_PATH)
+    cache = profile_path(path, bucket_minutes)
+    profile, start = None, 0
+    with open(path, 'rb') as fh:
+        header_line = fh.readline()
+        header = list(pd.read_csv(io.BytesIO(header_line), nrows=0).columns)
+        end = _complete_end(fh, os.fstat(fh.fileno()).st_size)
+        if use_cache and cache.exists():
+            try:
+                cached, state = VolumeProfile.load(cache)
+                consumed = state['consumed']
+                if (state.get('header') == header and consumed <= end
+                        and _fingerprint(fh, consumed) == state['fingerprint']):
+                    profile, start = cached, consumed
+            except (OSError, ValueError, KeyError):
+                profile = None
+        if profile is None:
+            profile, start = VolumeProfile(bucket_minutes), len(header_line)
+        if end > start:
+            for ts, volume, symbols in _read_rows(fh, start, end, header, chunk_rows):
+                profile.add(ts, volume, symbols)
+        state = {'consumed': end, 'fingerprint': _fingerprint(fh, end), 'header': header}
+    if use_cache and (end > start or not cache.exists()):
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            profile.save(cache, state)
+        except OSError:
+            pass
+    return profile
+
+
+_profiles = {}
+
+
+def load_profile(path=None, bucket_minutes=BUCKET_MINUTES):
+    """Process-wide cached ``build_profile``; re-checks the file only when its size or mtime moved."""
+    from src.advanced.backtester import DATA_PATH
+    path = Path(path or DATA_PATH)
+    st = os.stat(path)
+    key = (str(path), bucket_minutes)
+    hit = _profiles.get(key)
+    if hit is not None and hit[0] == (st.st_size, st.st_mtime_ns):
+        return hit[1]
+    profile = build_profile(path, bucket_minutes)
+    _profiles[key] = ((st.st_size, st.st_mtime_ns), profile)
+    return profile
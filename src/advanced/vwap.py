@@ -0,0 +1,113 @@
+"""VWAP/POV execution: slice sizes follow the historical intraday volume profile.
+
+``twap_order`` sends equal slices, so the slices that land in thin periods
+move the price the most. ``vwap_order`` splits ``duration`` seconds into
+``slices`` equal periods. Each period gets the share of ``total_qty`` that
+the symbol's volume profile (``src.advanced.volume_profile``) expects to
+trade in it. The start is the current time of day in IST, matching the
+history's ``Timestamp IST``.
+
+Slice sizes come from a running target, the profile's cumulative share
+times ``total_qty``, minus what was already sent, snapped to the lot step.
+Rounding therefore never accumulates. With ``max_participation`` each slice
+is also capped at that fraction of the volume the exchange printed over the
+previous period (1m klines). Whatever the cap holds back rolls into later
+slices, and what is left at the end is logged rather than dumped at market.
+"""
+import time
+
+from src.config import get_client, logger
+from src.validation import order_validator
+
+# Timestamp IST is UTC+05:30, no DST
+IST_OFFSET = 5.5 * 3600
+KLINE_VOLUME = 5
+
+
+def ist_minute_of_day(now):
+    return (now + IST_OFFSET) % 86400 / 60.0
+
+
+def load_schedule(symbol, duration, slices, profile=None, now=None, client=None):
+    """Fraction of the order for each slice, starting at ``now`` (epoch seconds).
+
+    ``symbol`` is the exchange symbol; the profile is looked up by its base
+    asset, which is what the history's ``Coin`` column holds.
+    """
+    from src.advanced.volume_profile import coin_for, load_profile
+    if profile is None:
+        try:
+            profile = load_profile()
+        except (OSError, KeyError, ValueError) as e:
+            logger.warning('No volume profile (%s); falling back to equal slices', e)
+            return [1.0 / slices] * slices
+    start = ist_minute_of_day(time.time() if now is None else now)
+    coin = coin_for(symbol, client)
+    return [float(f) for f in profile.schedule(start, duration / 60.0, slices, symbol=coin)]
+
+
+def recent_volume(client, symbol, seconds):
+    """Base-asset volume the exchange printed over roughly the last ``seconds``."""
+    bars = max(1, int(round(seconds / 60.0)))
+    klines = client.futures_klines(symbol=symbol, interval='1m', limit=bars)
+    return sum(float(k[KLINE_VOLUME]) for k in klines)
+
+
+def _round_qty(qty):
+    qty = round(qty, 3)
+    if qty <= 0:
+        raise ValueError('quantity %s rounds to zero' % qty)
+    return qty
+
+
+def vwap_order(symbol, side, total_qty, duration, slices, profile=None, max_participation=None,
+               clock=time.time, sleep=time.sleep):
+    client = get_client()
+    symbol, side = symbol.upper(), side.upper()
+    total_qty, slices = float(total_qty), int(slices)
+    period = float(duration) / slices
+    try:
+        validator = order_validator(client, symbol)
+    except ValueError as e:
+        logger.error("VWAP rejected before sending: %s", e)
+        return
+    snap = validator.snap_qty if validator is not None else _round_qty
+
+    start = clock()
+    fractions = load_schedule(symbol, float(duration), slices, profile, now=start, client=client)
+    logger.info("Starting VWAP: %s %s over %d slices of %.0fs; weights %s",
+                total_qty, symbol, slices, period, ' '.join('%.3f' % f for f in fractions))
+
+    sent, target, orders = 0.0, 0.0, []
+    for i, fraction in enumerate(fractions):
+        deadline = start + i * period
+        wait = deadline - clock()
+        if wait > 0:
+            sleep(wait)
+        target = total_qty if i == slices - 1 else target + total_qty * fraction
+        want = target - sent
+        if max_participation:
+            try:
+                want = min(want, max_participation * recent_volume(client, symbol, period))
+            except Exception as e:
+                logger.warning("VWAP volume check failed at step %d, sending unclipped: %s", i + 1, e)
+        try:
+            qty = snap(want)
+        except ValueError:
+            # outside the lot bounds (usually below the minimum): carry it to the next slice
+            continue
+        try:
+            order = client.futures_create_order(symbol=symbol, side=side, type='MARKET', quantity=qty)
+        except Exception as e:
+            logger.error("VWAP Error at step %d: %s", i + 1, e)
+            break
+        sent += float(qty)
+        orders.append(order)
+        logger.info("VWAP Progress: %d/%d, %s sent (%.1f%%). OrderID: %s",
+                    i + 1, slices, qty, 100.0 * sent / total_qty, order['orderId'])
+
+    remaining = total_qty - sent
+    if remaining > 1e-12:
+        logger.warning("VWAP finished with %.8g %s unfilled", remaining, symbol)
+    return {'symbol': symbol, 'side': side, 'sent': sent, 'remaining': max(remaining, 0.0),
+            'orders': len(orders), 'weights': fractions}
@@ -0,0 +1,182 @@
+"""Submit a file of orders in one run.
+
+Orders are read lazily from CSV (header row) or JSON lines, one order per
+line, using the REST field names: ``symbol``, ``side``, ``type``,
+``quantity``, ``price``, ``stopPrice``, ``timeInForce``, ``reduceOnly`` and
+``newClientOrderId``. ``type`` defaults to LIMIT when a price is given and
+MARKET otherwise.
+
+Each line is snapped to its symbol's cached filters. A line that fails
+there is rejected without a request. Valid orders are grouped into
+batch-order requests of up to five. At most ``workers`` requests are in
+flight, each paced by the shared rate limiters. One JSON result per input
+line is written in input order.
+
+Every order is sent with a ``newClientOrderId`` (one is generated per line
+when the file has none) and its result carries it. When a request fails in
+transit the orders may still be live, so those lines are written with
+``"unknown": true`` instead of as failures. Look them up by client order id
+before sending them again.
+"""
+import csv
+import json
+import time
+import uuid
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from src.config import get_client, logger, settings
+from src.advanced.grid_trading import BATCH_SIZE, _send_batch
+from src.validation import prepare_order
+
+FIELDS = ('symbol', 'side', 'type', 'quantity', 'price', 'stopPrice', 'timeInForce',
+          'reduceOnly', 'newClientOrderId')
+PRICED_TYPES = ('LIMIT', 'STOP', 'TAKE_PROFIT')
+
+
+def read_orders(path):
+    """Yield ``(line_number, row_dict)`` from a CSV or JSONL file.
+
+    JSONL is chosen by a ``.jsonl``/``.json`` extension. A line that cannot
+    be decoded yields an ``Exception`` in place of the dict.
+    """
+    with open(path, newline='') as fh:
+        if path.lower().endswith(('.jsonl', '.json')):
+            for n, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield n, json.loads(line)
+                except ValueError as e:
+                    yield n, e
+        else:
+            reader = csv.DictReader(fh)
+            for row in reader:
+                # header is line 1, so the first order is line 2
+                yield reader.line_num, {k.strip(): (v or '').strip() for k, v in row.items() if k}
+
+
+def build_order(client, row):
+    """REST params for one input row; raises ValueError if the row is unusable."""
+    if isinstance(row, Exception):
+        raise ValueError('unreadable line: %s' % row)
+    row = {k: row[k] for k in FIELDS if row.get(k) not in (None, '')}
+    for field in ('symbol', 'side', 'quantity'):
+        if field not in row:
+            raise ValueError('missing %s' % field)
+    symbol = str(row['symbol']).upper()
+    side = str(row['side']).upper()
+    if side not in ('BUY', 'SELL'):
+        raise ValueError('bad side %r' % row['side'])
+    order_type = str(row.get('type') or ('LIMIT' if 'price' in row else 'MARKET')).upper()
+    if order_type in PRICED_TYPES and 'price' not in row:
+        raise ValueError('%s order needs a price' % order_type)
+    quantity, price, stop = prepare_order(client, symbol, row['quantity'], row.get('price'), row.get('stopPrice'))
+    order = dict(row, symbol=symbol, side=side, type=order_type, quantity=str(quantity))
+    if price is not None:
+        order['price'] = str(price)
+    if stop is not None:
+        order['stopPrice'] = str(stop)
+    if order_type in PRICED_TYPES:
+        order.setdefault('timeInForce', 'GTC')
+    return order
+
+
+class _ResultWriter:
+    """Write results in line order although batches complete out of order."""
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.waiting = {}
+        self.order = deque()
+
+    def expect(self, line):
+        self.order.append(line)
+
+    def put(self, line, result):
+        self.waiting[line] = result
+        while self.order and self.order[0] in self.waiting:
+            n = self.order.popleft()
+            self.fh.write(json.dumps(dict(self.waiting.pop(n), line=n)) + '\n')
+
+
+def _result(res):
+    if res.get('orderId') is not None:
+        return {'ok': True, 'orderId': res['orderId'], 'status': res.get('status')}
+    if res.get('unknown'):
+        return {'ok': False, 'unknown': True, 'error': res.get('msg')}
+    return {'ok': False, 'error': res.get('msg'), 'code': res.get('code')}
+
+
+def submit_file(path, out=None, workers=None, batch_size=BATCH_SIZE, dry_run=False, client=None):
+    """Validate and submit every order in ``path``; returns a stats dict.
+
+    Results go to ``out`` (default ``<path>.results.jsonl``). With
+    ``dry_run`` orders are validated and written back without being sent.
+    """
+    client = client or get_client()
+    out = out or path + '.results.jsonl'
+    workers = max(1, int(workers or settings.pool_size))
+    size = max(1, min(int(batch_size), BATCH_SIZE))
+    stats = {'lines': 0, 'placed': 0, 'rejected': 0, 'failed': 0, 'unknown': 0, 'requests': 0}
+    # client order ids for lines without one: <run>-<line>, within the 36-char limit
+    run_id = 'b' + uuid.uuid4().hex[:12]
+    start = time.perf_counter()
+
+    with open(out, 'w') as fh, ThreadPoolExecutor(max_workers=workers) as pool:
+        writer = _ResultWriter(fh)
+        in_flight = {}
+
+        def collect(done):
+            for fut in done:
+                lines = in_flight.pop(fut)
+                try:
+                    results = fut.result()
+                except Exception as e:
+                    results = [{'msg': str(e), 'unknown': True}] * len(lines)
+                for (n, client_id), res in zip(lines, results):
+                    r = _result(res)
+                    stats['placed' if r['ok'] else 'unknown' if r.get('unknown') else 'failed'] += 1
+                    writer.put(n, dict(r, clientOrderId=client_id))
+
+        def send(batch):
+            # bounded queue: never more than two batches per worker outstanding
+            while len(in_flight) >= 2 * workers:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            stats['requests'] += 1
+            in_flight[pool.submit(_send_batch, client, [o for _, o in batch])] = [
+                (n, o['newClientOrderId']) for n, o in batch]
+
+        batch = []
+        for n, row in read_orders(path):
+            stats['lines'] += 1
+            writer.expect(n)
+            try:
+                order = build_order(client, row)
+                order.setdefault('newClientOrderId', '%s-%d' % (run_id, n))
+            except ValueError as e:
+                stats['rejected'] += 1
+                writer.put(n, {'ok': False, 'error': str(e)})
+                continue
+            if dry_run:
+                writer.put(n, {'ok': True, 'order': order})
+                continue
+            batch.append((n, order))
+            if len(batch) == size:
+                send(batch)
+                batch = []
+        if batch:
+            send(batch)
+        while in_flight:
+            collect(wait(in_flight).done)
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['orders_per_sec'] = stats['placed'] / stats['seconds'] if stats['seconds'] else 0.0
+    logger.info('Batch %s: %d lines, %d placed, %d rejected, %d failed, %d unknown in %.3fs '
+                '(%.1f orders/s, %d requests) -> %s',
+                path, stats['lines'], stats['placed'], stats['rejected'], stats['failed'], stats['unknown'],
+                stats['seconds'], stats['orders_per_sec'], stats['requests'], out)
+    if stats['unknown']:
+        logger.warning('Batch %s: %d orders may be live although their request failed; look them up by '
+                       'clientOrderId before resubmitting', path, stats['unknown'])
+    return stats
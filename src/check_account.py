@@ -1,6 +1,10 @@
 from src.config import get_client, logger
 
-def check_connection():
+def check_connection(state=None):
+    """Print the wallet balance; a synced ``AccountState`` answers without a REST call."""
+    if state is not None and state.synced and state.balance('USDT') is not None:
+        print(f"Your Wallet Balance: {state.balance('USDT')['balance']} USDT")
+        return
     client = get_client()
     try:
         # This only requires 'Enable Reading' permission
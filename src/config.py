@@ -1,62 +1,175 @@
 import os
 import logging
-from dotenv import load_dotenv, find_dotenv
-from binance.client import Client
-
-# 1. This finds the .env file even if you are in a different folder
-load_dotenv(find_dotenv())
-
-# 2. Get API Keys
-API_KEY = os.getenv('BINANCE_API_KEY')
-API_SECRET = os.getenv('BINANCE_API_SECRET')
-# Default to False unless user explicitly enables testnet in .env
-USE_TESTNET = os.getenv('USE_TESTNET', 'False').lower() in ('1', 'true', 'yes')
-
-# 3. DEBUG CHECK: This will help us see if keys are missing
-if not API_KEY or not API_SECRET:
-    print("❌ ERROR: API Keys not found! Check your .env file. See .env.example")
-else:
-    print("✅ API Keys loaded successfully.")
-
-# Configure Logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("bot.log"),
-        logging.StreamHandler()
-    ]
-)
+import tempfile
+import threading
+from contextlib import contextmanager
+from src.metrics import InstrumentedClient
+from src.rate_limit import RateLimitedClient
+
+# Importing this module is deliberately cheap and side-effect free: .env is
+# read on first settings access, logging is configured on first use and the
+# binance package is only imported when a client is actually built.
+
+
+def default_socket_path():
+    """Per-user daemon socket: ``$XDG_RUNTIME_DIR`` if set, else a private directory in the temp dir."""
+    runtime = os.getenv('XDG_RUNTIME_DIR')
+    if runtime:
+        return os.path.join(runtime, 'binance-bot.sock')
+    uid = getattr(os, 'getuid', lambda: 'user')()
+    return os.path.join(tempfile.gettempdir(), 'binance-bot-%s' % uid, 'bot.sock')
+
+
+class Settings:
+    """Environment-backed settings, loaded from ``.env`` on first attribute access."""
+
+    def __init__(self):
+        self._loaded = False
+
+    def load(self):
+        if not self._loaded:
+            from dotenv import load_dotenv, find_dotenv
+            # This finds the .env file even if you are in a different folder
+            load_dotenv(find_dotenv())
+            self.api_key = os.getenv('BINANCE_API_KEY')
+            self.api_secret = os.getenv('BINANCE_API_SECRET')
+            # Default to False unless user explicitly enables testnet in .env
+            self.use_testnet = os.getenv('USE_TESTNET', 'False').lower() in ('1', 'true', 'yes')
+            # Size of the keep-alive HTTP connection pool behind each shared client
+            self.pool_size = int(os.getenv('BINANCE_POOL_SIZE', '10'))
+            self.log_file = os.getenv('BOT_LOG_FILE', 'bot.log')
+            self.log_max_bytes = int(os.getenv('BOT_LOG_MAX_BYTES', str(10 * 1024 * 1024)))
+            self.log_backups = int(os.getenv('BOT_LOG_BACKUPS', '5'))
+            # optional metrics export: periodic JSON snapshot and/or Prometheus /metrics
+            self.metrics_file = os.getenv('BOT_METRICS_FILE') or None
+            self.metrics_interval = float(os.getenv('BOT_METRICS_INTERVAL', '10'))
+            self.metrics_port = int(os.getenv('BOT_METRICS_PORT', '0')) or None
+            # seconds between exchange clock-offset refreshes; 0 disables time sync
+            self.time_sync_interval = float(os.getenv('BOT_TIME_SYNC_INTERVAL', '300'))
+            # Unix socket of the warm ``serve`` daemon that CLI commands forward to
+            self.socket_path = os.getenv('BOT_SOCKET') or default_socket_path()
+            self._loaded = True
+        return self
+
+    def __getattr__(self, name):
+        if name.startswith('_') or self._loaded:
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+settings = Settings()
+
+# legacy module constants, resolved through ``settings`` on access
+_SETTING_ALIASES = {
+    'API_KEY': 'api_key',
+    'API_SECRET': 'api_secret',
+    'USE_TESTNET': 'use_testnet',
+    'POOL_SIZE': 'pool_size',
+    'LOG_FILE': 'log_file',
+}
+
+
+def __getattr__(name):
+    if name in _SETTING_ALIASES:
+        return getattr(settings, _SETTING_ALIASES[name])
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
 logger = logging.getLogger()
+log_pipeline = None
+_logging_lock = threading.Lock()
+
+
+def setup_logging():
+    """Start the queued JSON-lines log pipeline once; later calls are no-ops.
+
+    Callers only enqueue records; a background listener writes them to a
+    size-rotated ``bot.log`` and echoes them to the console.
+    """
+    global log_pipeline
+    if log_pipeline is None:
+        with _logging_lock:
+            if log_pipeline is None:
+                from src.log_pipeline import LogPipeline
+                pipeline = LogPipeline(settings.log_file, max_bytes=settings.log_max_bytes,
+                                       backup_count=settings.log_backups)
+                pipeline.install(logger)
+                log_pipeline = pipeline
+    return log_pipeline
+
+
+metrics_exporters = None
+
+
+def setup_metrics():
+    """Start the metrics exporters configured in ``.env`` once; later calls are no-ops."""
+    global metrics_exporters
+    if metrics_exporters is None:
+        with _logging_lock:
+            if metrics_exporters is None:
+                exporters = []
+                if settings.metrics_file:
+                    import atexit
+                    from src.metrics import SnapshotWriter
+                    writer = SnapshotWriter(settings.metrics_file, settings.metrics_interval).start()
+                    atexit.register(writer.stop)
+                    exporters.append(writer)
+                if settings.metrics_port:
+                    from src.metrics import serve_prometheus
+                    exporters.append(serve_prometheus(settings.metrics_port))
+                metrics_exporters = exporters
+    return metrics_exporters
 
-try:
-    # Add a JSON-like structured logger for convenience
-    import json
-    class JsonFormatter(logging.Formatter):
-        def format(self, record):
-            base = {
-                'time': self.formatTime(record),
-                'level': record.levelname,
-                'message': record.getMessage()
-            }
-            if record.exc_info:
-                base['exception'] = self.formatException(record.exc_info)
-            return json.dumps(base)
-
-    fh = logging.FileHandler('bot.log')
-    fh.setFormatter(JsonFormatter())
-    logger.addHandler(fh)
-except Exception:
-    # best-effort; fallback to default formatting
-    pass
-
-def get_client():
-    client = Client(API_KEY, API_SECRET, testnet=USE_TESTNET)
+
+# binance.client.Client; imported by _client_class() the first time it is needed
+Client = None
+
+
+def _client_class():
+    global Client
+    if Client is None:
+        from binance.client import Client as cls
+        Client = cls
+    return Client
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+# set by use_client(): every get_client() caller receives this instead
+_client_override = None
+
+
+def _tune_session(session, pool_size=None):
+    """Mount a keep-alive pool sized for concurrent callers on a requests session.
+
+    ``pool_block`` makes extra threads wait for a free connection instead of
+    opening (and then discarding) throwaway ones.
+    """
+    from requests.adapters import HTTPAdapter
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size or settings.pool_size, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _new_client(api_key, api_secret, testnet):
+    if not api_key or not api_secret:
+        logger.warning('API keys not found; check your .env file (see .env.example)')
+    client_cls = _client_class()
+    try:
+        # defer the constructor's ping until the tuned pool is mounted
+        client = client_cls(api_key, api_secret, testnet=testnet, ping=False)
+        deferred_ping = True
+    except TypeError:
+        # older python-binance without the ping argument
+        client = client_cls(api_key, api_secret, testnet=testnet)
+        deferred_ping = False
+    _tune_session(client.session)
     try:
         # When using futures testnet, python-binance may still keep the
         # default production FUTURES URL. Force the well-known testnet
         # endpoints so futures methods use testnet when requested.
-        if USE_TESTNET:
+        if testnet:
             try:
                 client.API_URL = 'https://testnet.binance.vision/api'
             except Exception:
@@ -71,7 +184,89 @@ def get_client():
         # expose current API URLs for diagnostics
         api_url = getattr(client, 'API_URL', None)
         fut_url = getattr(client, 'FUTURES_API_URL', None) or getattr(client, 'FUTURES_URL', None)
-        logger.info('Created Binance Client (testnet=%s) api_url=%s futures_api=%s', USE_TESTNET, api_url, fut_url)
+        logger.info('Created Binance Client (testnet=%s) api_url=%s futures_api=%s', testnet, api_url, fut_url)
     except Exception:
         pass
+    if deferred_ping:
+        client.ping()
+    from src.time_sync import TimeSync, install_signer
+    install_signer(client, api_secret)
+    # time every call, then pace it through the shared weight/order limiters;
+    # the limiter sits outside so its waits do not count as exchange latency
+    wrapped = RateLimitedClient(InstrumentedClient(client))
+    if settings.time_sync_interval > 0:
+        wrapped.time_sync = TimeSync(wrapped, settings.time_sync_interval).start()
+    return wrapped
+
+
+def get_client(api_key=None, api_secret=None, testnet=None):
+    """Return the process-wide client for ``(api_key, testnet)``, creating it once.
+
+    The client and its HTTP session are shared by every caller (and thread),
+    so orders reuse warm keep-alive connections instead of paying a new
+    TCP+TLS handshake and ping each time. It comes wrapped in a
+    ``RateLimitedClient``; clients installed with ``use_client`` are returned
+    as given.
+    """
+    setup_logging()
+    setup_metrics()
+    if _client_override is not None:
+        return _client_override
+    api_key = api_key or settings.api_key
+    api_secret = api_secret or settings.api_secret
+    testnet = settings.use_testnet if testnet is None else testnet
+    key = (api_key, bool(testnet))
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _new_client(api_key, api_secret, testnet)
     return client
+
+
+@contextmanager
+def use_client(client):
+    """Route every ``get_client()`` call to ``client`` (e.g. a simulated exchange)."""
+    global _client_override
+    previous = _client_override
+    _client_override = client
+    try:
+        yield client
+    finally:
+        _client_override = previous
+
+
+def reset_clients():
+    """Close and forget every pooled client (e.g. after rotating keys)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        time_sync = getattr(client, 'time_sync', None)
+        if time_sync is not None:
+            time_sync.stop()
+        try:
+            client.session.close()
+        except Exception:
+            pass
+
+
+def connection_stats(client=None):
+    """Connections opened vs requests sent through the pooled sessions.
+
+    ``new_connections`` staying at one per host while ``requests`` grows
+    means keep-alive reuse is working.
+    """
+    clients = [client] if client is not None else list(_clients.values())
+    stats = {'new_connections': 0, 'requests': 0}
+    for c in clients:
+        for adapter in set(c.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for pool_key in list(pools.keys()):
+                pool = pools.get(pool_key)
+                if pool is None:
+                    continue
+                stats['new_connections'] += pool.num_connections
+                stats['requests'] += pool.num_requests
+    return stats
@@ -0,0 +1,381 @@
+"""Warm bot process that serves CLI commands over a Unix domain socket.
+
+``python -m src.main serve`` builds the client, loads exchange info and
+(optionally) starts the user-data stream once, then listens on
+``settings.socket_path``. While it runs, the other subcommands connect to
+the socket and send their argv instead of importing binance and building a
+client themselves. The daemon parses the argv with the CLI's own parser
+and runs the command on its warm client.
+
+The wire format is one JSON object per line in each direction. A
+connection may carry any number of requests, so scripted flows can keep
+one socket open:
+
+    -> {"argv": ["market", "BTCUSDT", "BUY", "0.01"]}
+    <- {"ok": true, "result": {...}, "output": ""}
+
+Commands that run for minutes (sync TWAP, VWAP, polling OCO, ``grid --run``)
+start in the background and reply with a job name straight away.
+
+The socket lives in a directory only its user can write to, and a client
+only talks to a socket owned by its own uid. Anything else is treated as
+"no daemon", so orders never go to another user's process.
+"""
+import contextlib
+import io
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+
+from src.config import get_client, logger, settings
+
+BACKGROUND_COMMANDS = ('twap', 'vwap', 'oco')
+CONNECT_TIMEOUT = 1.0
+
+
+def socket_path(path=None):
+    return path or settings.socket_path
+
+
+def owned_by_me(path):
+    """True if ``path`` exists and belongs to the current user."""
+    try:
+        return os.stat(path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def _private_dir(path):
+    """Create the socket's directory (0700) if needed and check nobody else can swap the socket."""
+    parent = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(parent):
+        os.makedirs(parent, mode=0o700)
+    st = os.stat(parent)
+    # ours, or a root-owned sticky directory like /tmp where others can't replace our file
+    if st.st_uid != os.getuid() and not (st.st_uid == 0 and st.st_mode & stat.S_ISVTX):
+        raise RuntimeError('socket directory %s belongs to another user' % parent)
+
+
+def _read_line(reader):
+    line = reader.readline()
+    if not line:
+        raise ConnectionError('daemon closed the connection')
+    return json.loads(line)
+
+
+class Connection:
+    """Client side of the socket: one request/reply pair per ``call``."""
+
+    def __init__(self, path=None, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            self.sock.connect(socket_path(path))
+        except OSError:
+            self.sock.close()
+            raise
+        self.sock.settimeout(timeout)
+        self.reader = self.sock.makefile('rb')
+
+    def call(self, request):
+        self.sock.sendall(json.dumps(request).encode() + b'\n')
+        return _read_line(self.reader)
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def running(path=None):
+    """True if a daemon of this user answers on the socket."""
+    if not owned_by_me(socket_path(path)):
+        return False
+    try:
+        with Connection(path) as conn:
+            return conn.call({'op': 'ping'}).get('ok', False)
+    except (OSError, ValueError):
+        return False
+
+
+def forward(argv, path=None):
+    """Send ``argv`` to a running daemon; returns its reply, or None if there is none.
+
+    Only a failed connect means "no daemon". Once the request is sent,
+    errors propagate, so a command is never run twice. A socket owned by
+    another user is ignored and the command runs locally.
+    """
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path(path)):
+        return None
+    if not owned_by_me(socket_path(path)):
+        logger.warning('Ignoring daemon socket %s: it belongs to another user', socket_path(path))
+        return None
+    try:
+        conn = Connection(path)
+    except OSError:
+        return None
+    with conn:
+        # relative file arguments are resolved against the caller's directory
+        return conn.call({'argv': list(argv), 'cwd': os.getcwd()})
+
+
+class _ThreadOutput:
+    """``sys.stdout``/``sys.stderr`` stand-in that lets one thread capture its own prints."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def write(self, text):
+        buf = getattr(self._local, 'buf', None)
+        return (buf if buf is not None else self.stream).write(text)
+
+    def flush(self):
+        if getattr(self._local, 'buf', None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @contextlib.contextmanager
+    def capture(self, buf):
+        self._local.buf = buf
+        try:
+            yield buf
+        finally:
+            self._local.buf = None
+
+
+def _install_output():
+    # cheap enough to call per request; also re-wraps streams swapped out since
+    if not isinstance(sys.stdout, _ThreadOutput):
+        sys.stdout = _ThreadOutput(sys.stdout)
+    if not isinstance(sys.stderr, _ThreadOutput):
+        sys.stderr = _ThreadOutput(sys.stderr)
+
+
+@contextlib.contextmanager
+def _capture(buf):
+    with contextlib.ExitStack() as stack:
+        for stream in (sys.stdout, sys.stderr):
+            if isinstance(stream, _ThreadOutput):
+                stack.enter_context(stream.capture(buf))
+        yield buf
+
+
+class BotDaemon:
+    def __init__(self, path=None, stream=False):
+        self.path = socket_path(path)
+        self.stream = stream
+        self.client = None
+        self.state = None
+        self.jobs = {}
+        self.stats = {'requests': 0, 'errors': 0, 'started': time.time()}
+        self._server = None
+        self._engine = None
+        self._loop = None
+        self._lock = threading.Lock()
+
+    # -- startup ----------------------------------------------------------
+
+    def warm(self):
+        """Build everything a command would otherwise build per process."""
+        from src.main import build_parser
+        self.parser = build_parser()
+        self.client = get_client()
+        if hasattr(self.client, 'futures_exchange_info'):
+            from src.exchange_info import exchange_info_cache
+            try:
+                exchange_info_cache(self.client).refresh()
+            except Exception as e:
+                logger.warning('Daemon could not preload exchange info: %s', e)
+        if self.stream:
+            self._start_account_state()
+
+    def _start_account_state(self):
+        import asyncio
+        from src.account_state import AccountStateService
+        ready = threading.Event()
+
+        def run():
+            loop = self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            service = AccountStateService(self.client)
+            self.state = service.state
+            loop.run_until_complete(service.start())
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(service.stop())
+            loop.close()
+
+        threading.Thread(target=run, name='daemon-stream', daemon=True).start()
+        ready.wait(30)
+
+    # -- request handling -------------------------------------------------
+
+    def handle(self, request):
+        """Reply dict for one decoded request."""
+        op = request.get('op', 'run')
+        if op == 'ping':
+            return {'ok': True, 'pid': os.getpid()}
+        if op == 'status':
+            return {'ok': True, 'result': self.status()}
+        if op == 'shutdown':
+            threading.Thread(target=self.shutdown, daemon=True).start()
+            return {'ok': True}
+        self.stats['requests'] += 1
+        buf = io.StringIO()
+        _install_output()
+        try:
+            with _capture(buf):
+                result = self.run(request.get('argv') or [], request.get('cwd'))
+            return {'ok': True, 'result': result, 'output': buf.getvalue()}
+        except SystemExit as e:
+            # argparse has already written its usage or --help text into buf
+            if e.code in (0, None):
+                return {'ok': True, 'result': None, 'output': buf.getvalue()}
+            self.stats['errors'] += 1
+            return {'ok': False, 'error': 'invalid arguments', 'output': buf.getvalue()}
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.exception('Daemon command %s failed', request.get('argv'))
+            return {'ok': False, 'error': str(e), 'output': buf.getvalue()}
+
+    def run(self, argv, cwd=None):
+        from src.main import run_command
+        args = self.parser.parse_args(argv)
+        if args.command in (None, 'serve'):
+            raise ValueError('not a daemon command: %s' % (args.command,))
+        if args.command == 'batch' and cwd:
+            args.file = os.path.join(cwd, args.file)
+            args.out = args.out and os.path.join(cwd, args.out)
+        if args.command == 'grid' and args.run:
+            return self._run_grid(args)
+        if args.command == 'stats' and not args.probe:
+            return self._stats(args)
+        if args.command in BACKGROUND_COMMANDS:
+            return self._background(args)
+        return run_command(args, state=self.state)
+
+    def _background(self, args):
+        from src.main import run_command
+        with self._lock:
+            name = '%s-%d' % (args.command, len(self.jobs) + 1)
+            thread = threading.Thread(target=run_command, args=(args,), kwargs={'state': self.state},
+                                      name=name, daemon=True)
+            self.jobs[name] = thread
+        thread.start()
+        logger.info('Daemon started job %s', name)
+        return {'job': name}
+
+    def _run_grid(self, args):
+        from src.advanced.grid_engine import GridEngine
+        with self._lock:
+            if self._engine is None:
+                self._engine = GridEngine(self.client, poll_interval=args.poll).start()
+                self.jobs['grid'] = self._engine._thread
+        symbol = args.symbol.upper()
+        mid = args.mid
+        if mid is None:
+            mid = float(self.client.futures_symbol_ticker(symbol=symbol)['price'])
+        book = self._engine.add_grid(symbol, args.lower, args.upper, args.levels, args.qty, mid=mid)
+        return dict(book.counts(), grid=book.symbol)
+
+    def _stats(self, args):
+        # the daemon's own registry has every call since it started
+        from src.metrics import format_table, metrics
+        print(metrics.prometheus() if args.prometheus else format_table(metrics.snapshot()),
+              end='' if args.prometheus else '\n')
+        return None
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'uptime': time.time() - self.stats['started'],
+            'requests': self.stats['requests'],
+            'errors': self.stats['errors'],
+            'jobs': {name: t.is_alive() for name, t in self.jobs.items()},
+            'grids': self._engine.summary() if self._engine is not None else {},
+            'stream': self.state is not None and self.state.synced,
+        }
+
+    # -- socket server ----------------------------------------------------
+
+    def _serve_connection(self, conn):
+        with conn, conn.makefile('rb') as reader:
+            for line in reader:
+                try:
+                    reply = self.handle(json.loads(line))
+                except ValueError as e:
+                    reply = {'ok': False, 'error': 'bad request: %s' % e}
+                conn.sendall(json.dumps(reply, default=str).encode() + b'\n')
+
+    def bind(self):
+        _private_dir(self.path)
+        if os.path.lexists(self.path) and not owned_by_me(self.path):
+            raise RuntimeError('%s belongs to another user' % self.path)
+        if running(self.path):
+            raise RuntimeError('a daemon is already listening on %s' % self.path)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)  # stale socket from a crashed daemon
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        os.chmod(self.path, 0o600)
+        server.listen(64)
+        self._server = server
+        return self
+
+    def serve_forever(self):
+        """Accept connections until ``shutdown``; each gets its own thread."""
+        if self._server is None:
+            self.bind()
+        logger.info('Daemon listening on %s (pid %d)', self.path, os.getpid())
+        server = self._server
+        # poll so shutdown() from another thread is noticed; closing a socket
+        # does not wake a blocked accept() on every platform
+        server.settimeout(0.5)
+        while self._server is not None:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._serve_connection, args=(conn,), name='daemon-conn',
+                             daemon=True).start()
+
+    def shutdown(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+        if self._engine is not None:
+            self._engine.stop()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        logger.info('Daemon on %s stopped', self.path)
+
+
+def serve(path=None, stream=False):
+    """Run a daemon in the foreground until Ctrl-C or ``serve --stop``."""
+    daemon = BotDaemon(path, stream=stream)
+    daemon.bind()
+    try:
+        daemon.warm()
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.shutdown()
+    return daemon
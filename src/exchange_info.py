@@ -0,0 +1,138 @@
+"""Process-wide cache of futures exchange info with pre-parsed symbol filters.
+
+``futures_exchange_info`` returns every futures symbol and is heavily
+weighted, so it is fetched once per client and indexed by symbol. Threads
+that race for the first fetch share a single request. Entries older than
+``ttl`` keep being served while a background thread refreshes them. A lookup
+of an unknown symbol (say, one listed after startup) refetches at most once
+per ``MISS_REFRESH_INTERVAL``.
+"""
+import threading
+import time
+import weakref
+from decimal import Decimal
+
+from src.config import logger
+
+DEFAULT_TTL = 300.0
+MISS_REFRESH_INTERVAL = 30.0
+
+
+def _find_filter(filters, filter_type):
+    for f in filters:
+        if f.get('filterType') == filter_type:
+            return f
+    return None
+
+
+class SymbolFilters:
+    """LOT_SIZE / PRICE_FILTER values for one symbol, parsed to Decimal once."""
+
+    __slots__ = ('symbol', 'info', 'min_qty', 'max_qty', 'step_size', 'min_price', 'max_price', 'tick_size',
+                 'validator')
+
+    def __init__(self, info):
+        self.symbol = info.get('symbol', '').upper()
+        self.info = info
+        lot = _find_filter(info['filters'], 'LOT_SIZE')
+        tick = _find_filter(info['filters'], 'PRICE_FILTER')
+        self.min_qty = Decimal(lot['minQty']) if lot else None
+        self.max_qty = Decimal(lot['maxQty']) if lot else None
+        self.step_size = Decimal(lot['stepSize']) if lot else None
+        self.min_price = Decimal(tick['minPrice']) if tick else None
+        self.max_price = Decimal(tick['maxPrice']) if tick else None
+        self.tick_size = Decimal(tick['tickSize']) if tick else None
+        # compiled src.validation.OrderValidator, built on first use
+        self.validator = None
+
+
+class ExchangeInfoCache:
+    def __init__(self, client, ttl=DEFAULT_TTL, clock=time.monotonic, miss_refresh_interval=MISS_REFRESH_INTERVAL):
+        self.client = client
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self.clock = clock
+        self.stats = {'hits': 0, 'misses': 0, 'fetches': 0, 'errors': 0}
+        self._symbols = {}
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        # held for the whole request so concurrent callers share one fetch
+        self._fetch_lock = threading.Lock()
+        self._refresh_thread = None
+
+    def refresh(self):
+        """Fetch exchange info now and rebuild the symbol index."""
+        info = self.client.futures_exchange_info()
+        index = {}
+        for s in info.get('symbols', []):
+            try:
+                index[s['symbol'].upper()] = SymbolFilters(s)
+            except (KeyError, TypeError, ArithmeticError) as e:
+                logger.warning('Skipping malformed symbol info %s: %s', s.get('symbol'), e)
+        with self._lock:
+            self._symbols = index
+            self._fetched_at = self.clock()
+            self.stats['fetches'] += 1
+        return index
+
+    def _refresh_older_than(self, age):
+        """Refresh unless someone fetched in the last ``age`` seconds; True if this call fetched."""
+        with self._fetch_lock:
+            if self._fetched_at is not None and self.clock() - self._fetched_at < age:
+                return False
+            self.refresh()
+            return True
+
+    def _background_refresh(self):
+        try:
+            self._refresh_older_than(self.ttl)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error('exchange info refresh failed: %s', e)
+
+    def _ensure_fresh(self):
+        if self._fetched_at is None:
+            self._refresh_older_than(self.ttl)
+            return
+        if self.clock() - self._fetched_at < self.ttl:
+            return
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(target=self._background_refresh, name='exchange-info-refresh', daemon=True)
+            self._refresh_thread.start()
+
+    def filters(self, symbol):
+        """Return the ``SymbolFilters`` for ``symbol`` or None if it is not listed."""
+        self._ensure_fresh()
+        symbol = symbol.upper()
+        f = self._symbols.get(symbol)
+        if f is None:
+            try:
+                if self._refresh_older_than(self.miss_refresh_interval):
+                    f = self._symbols.get(symbol)
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.warning('exchange info refresh for %s failed: %s', symbol, e)
+        if f is None:
+            self.stats['misses'] += 1
+        else:
+            self.stats['hits'] += 1
+        return f
+
+    def symbol_info(self, symbol):
+        f = self.filters(symbol)
+        return f.info if f is not None else None
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+
+
+def exchange_info_cache(client, ttl=DEFAULT_TTL):
+    """Return the shared cache for ``client``, creating it on first use."""
+    with _caches_lock:
+        cache = _caches.get(client)
+        if cache is None:
+            cache = _caches[client] = ExchangeInfoCache(client, ttl=ttl)
+        return cache
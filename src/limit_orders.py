@@ -1,10 +1,12 @@
 import sys
 from src.config import get_client, logger
+from src.validation import prepare_order
 
 def place_limit_order(symbol, side, quantity, price, time_in_force='GTC'):
     client = get_client()
     try:
-        logger.info(f"Attempting {side} Limit Order for {symbol} @ {price}...")
+        logger.info("Attempting %s Limit Order for %s @ %s...", side, symbol, price)
+        quantity, price, _ = prepare_order(client, symbol.upper(), quantity, price)
 
         order = client.futures_create_order(
             symbol=symbol.upper(),
@@ -14,10 +16,10 @@ def place_limit_order(symbol, side, quantity, price, time_in_force='GTC'):
             quantity=quantity,
             price=str(price)
         )
-        logger.info(f"SUCCESS: Limit Order ID {order['orderId']} placed.")
+        logger.info("SUCCESS: Limit Order ID %s placed.", order['orderId'])
         return order
     except Exception as e:
-        logger.error(f"FAILED: {str(e)}")
+        logger.error("FAILED: %s", e)
 
 
 if __name__ == "__main__":
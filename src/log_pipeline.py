@@ -0,0 +1,144 @@
+import atexit
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FILE = 'bot.log'
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+FLUSH_EVERY = 64        # records written between explicit flushes
+FLUSH_INTERVAL = 0.5    # seconds an idle listener waits before flushing
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message[, exception]."""
+
+    def format(self, record):
+        base = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            base['exception'] = self.formatException(record.exc_info)
+        return json.dumps(base)
+
+
+class BatchedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that leaves flushing to the caller.
+
+    The stock handler flushes after every record; here lines accumulate in
+    the file buffer and are flushed every ``flush_every`` records, on
+    rollover, or when the listener goes idle.
+    """
+
+    def __init__(self, filename, max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT,
+                 flush_every=FLUSH_EVERY):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count,
+                         encoding='utf-8', delay=True)
+        self.flush_every = flush_every
+        self.pending = 0
+
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self.stream.tell() + len(msg) >= self.maxBytes:
+                self.doRollover()
+            self.stream.write(msg)
+            self.pending += 1
+            if self.pending >= self.flush_every:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.pending = 0
+        super().flush()
+
+
+class LazyQueueHandler(QueueHandler):
+    """Enqueue the record untouched so %-formatting happens on the listener.
+
+    The stock ``prepare`` renders the message on the caller's thread to make
+    records picklable; the queue here never leaves the process, so that work
+    is pushed to the background thread instead.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener that flushes its handlers whenever the queue goes idle."""
+
+    def __init__(self, q, *handlers, flush_interval=FLUSH_INTERVAL):
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval)
+            except queue.Empty:
+                self.flush()
+
+    def flush(self):
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                pass
+
+
+class LogPipeline:
+    """Owns the queue, listener and sinks behind the root logger."""
+
+    def __init__(self, filename=LOG_FILE, console=True, level=logging.INFO,
+                 max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT,
+                 flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.queue = queue.SimpleQueue()
+        self.handler = LazyQueueHandler(self.queue)
+        self.sink = BatchedRotatingFileHandler(filename, max_bytes, backup_count,
+                                               flush_every)
+        self.sink.setFormatter(JsonFormatter())
+        sinks = [self.sink]
+        if console:
+            stream = logging.StreamHandler()
+            stream.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+            sinks.append(stream)
+        self.listener = BatchingQueueListener(self.queue, *sinks,
+                                              flush_interval=flush_interval)
+        self.level = level
+        self.running = False
+
+    def start(self):
+        if not self.running:
+            self.listener.start()
+            self.running = True
+        return self
+
+    def stop(self):
+        """Drain the queue, flush and close the sinks."""
+        if self.running:
+            self.listener.stop()
+            self.running = False
+        for handler in self.listener.handlers:
+            try:
+                handler.flush()
+            except (OSError, ValueError):
+                # the console stream may already be closed at interpreter exit
+                pass
+        self.sink.close()
+
+    def install(self, logger=None):
+        logger = logger if logger is not None else logging.getLogger()
+        if self.handler not in logger.handlers:
+            logger.addHandler(self.handler)
+        logger.setLevel(self.level)
+        self.start()
+        atexit.register(self.stop)
+        return logger
@@ -1,14 +1,15 @@
 import argparse
 import sys
-from src.config import logger
-from src.check_account import check_connection
-from src.market_orders import place_market_order
-from src.limit_orders import place_limit_order
-from src.advanced.twap import twap_order
+from src.config import logger, setup_logging
 
+# Subcommand modules are imported inside their branch below so that --help
+# and parse errors never pay for binance/pandas imports.
 
-def main():
+
+def build_parser():
     parser = argparse.ArgumentParser(description='Binance Futures Order Bot CLI')
+    parser.add_argument('--local', action='store_true',
+                        help='run in this process even if a serve daemon is listening')
     sub = parser.add_subparsers(dest='command')
 
     sub.add_parser('check', help='Check connection and wallet balance')
@@ -30,6 +31,17 @@ def main():
     tw.add_argument('total_qty')
     tw.add_argument('intervals', type=int)
     tw.add_argument('delay', type=int, help='seconds between slices')
+    tw.add_argument('--async', dest='use_async', action='store_true',
+                    help='schedule slices on absolute deadlines with the asyncio engine')
+
+    vw = sub.add_parser('vwap', help='Run a VWAP order sized by the historical volume profile')
+    vw.add_argument('symbol')
+    vw.add_argument('side', choices=['BUY', 'SELL'])
+    vw.add_argument('total_qty')
+    vw.add_argument('duration', type=float, help='seconds to spread the order over')
+    vw.add_argument('slices', type=int)
+    vw.add_argument('--max-participation', type=float, metavar='FRACTION',
+                    help='cap each slice at this share of the last period\'s exchange volume (POV)')
 
     sl = sub.add_parser('stoplimit', help='Place a STOP-LIMIT order')
     sl.add_argument('symbol')
@@ -44,6 +56,7 @@ def main():
     oco.add_argument('quantity')
     oco.add_argument('tp_price')
     oco.add_argument('sl_price')
+    oco.add_argument('--stream', action='store_true', help='react to fills via the user-data stream instead of polling')
 
     grid = sub.add_parser('grid', help='Start a simple grid')
     grid.add_argument('symbol')
@@ -51,28 +64,171 @@ def main():
     grid.add_argument('upper')
     grid.add_argument('levels')
     grid.add_argument('qty')
+    grid.add_argument('--run', action='store_true',
+                      help='keep running: re-arm filled levels with the opposite order until Ctrl-C')
+    grid.add_argument('--mid', type=float, help='price splitting BUY levels from empty ones (default: last price)')
+    grid.add_argument('--poll', type=float, default=5.0, help='seconds between exchange reconciles with --run')
+
+    st = sub.add_parser('stats', help='Print per-endpoint latency percentiles')
+    st.add_argument('--file', help='JSON snapshot written by a running bot (default: BOT_METRICS_FILE)')
+    st.add_argument('--probe', type=int, default=0, metavar='N',
+                    help='time N ping/server-time round trips from this process instead')
+    st.add_argument('--prometheus', action='store_true', help='with --probe, print Prometheus text instead of a table')
+
+    bt = sub.add_parser('batch', help='Submit every order in a CSV or JSONL file')
+    bt.add_argument('file')
+    bt.add_argument('--out', help='per-line JSONL results (default: FILE.results.jsonl)')
+    bt.add_argument('--workers', type=int, help='concurrent batch requests (default: BINANCE_POOL_SIZE)')
+    bt.add_argument('--dry-run', action='store_true', help='validate and write the snapped orders without sending')
+
+    sv = sub.add_parser('serve', help='Run a warm daemon that the other commands forward to')
+    sv.add_argument('--socket', help='Unix socket path (default: BOT_SOCKET or a per-user temp file)')
+    sv.add_argument('--stream', action='store_true',
+                    help='keep account state from the user-data stream for check/oco')
+    sv.add_argument('--stop', action='store_true', help='stop the running daemon')
+    sv.add_argument('--status', action='store_true', help='print the running daemon\'s status')
+    return parser
 
-    args = parser.parse_args()
 
+def main(argv=None):
+    parser = build_parser()
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return
+    if args.command == 'serve':
+        return serve(args)
+    if not args.local and not (args.command == 'stats' and args.file):
+        # a running daemon already has a warm client: skip building one here
+        from src.daemon import forward
+        reply = forward(argv)
+        if reply is not None:
+            return print_reply(reply)
+    setup_logging()
+    return run_command(args)
+
+
+def run_command(args, state=None):
+    """Run a parsed subcommand in this process and return its result."""
     if args.command == 'check':
-        check_connection()
+        from src.check_account import check_connection
+        return check_connection(state)
     elif args.command == 'market':
-        place_market_order(args.symbol, args.side, args.quantity)
+        from src.market_orders import place_market_order
+        return place_market_order(args.symbol, args.side, args.quantity)
     elif args.command == 'limit':
-        place_limit_order(args.symbol, args.side, args.quantity, args.price)
+        from src.limit_orders import place_limit_order
+        return place_limit_order(args.symbol, args.side, args.quantity, args.price)
     elif args.command == 'twap':
-        twap_order(args.symbol, args.side, args.total_qty, args.intervals, args.delay)
+        if args.use_async:
+            import asyncio
+            from src.advanced.twap_async import run_twaps
+            jobs = asyncio.run(run_twaps([(args.symbol, args.side, args.total_qty, args.intervals, args.delay)]))
+            logger.info('TWAP stats: %s', jobs[0].stats())
+            return jobs[0].stats()
+        else:
+            from src.advanced.twap import twap_order
+            return twap_order(args.symbol, args.side, args.total_qty, args.intervals, args.delay)
+    elif args.command == 'vwap':
+        from src.advanced.vwap import vwap_order
+        return vwap_order(args.symbol, args.side, args.total_qty, args.duration, args.slices,
+                          max_participation=args.max_participation)
     elif args.command == 'stoplimit':
         from src.advanced.stop_limit import place_stop_limit
-        place_stop_limit(args.symbol, args.side, args.quantity, args.stop_price, args.limit_price)
+        return place_stop_limit(args.symbol, args.side, args.quantity, args.stop_price, args.limit_price)
     elif args.command == 'oco':
-        from src.advanced.oco import place_oco
-        place_oco(args.symbol, args.side, args.quantity, args.tp_price, args.sl_price)
+        if args.stream:
+            import asyncio
+            from src.advanced.oco_stream import place_oco_stream
+            return asyncio.run(place_oco_stream(args.symbol, args.side, args.quantity, args.tp_price, args.sl_price))
+        else:
+            from src.advanced.oco import place_oco
+            return place_oco(args.symbol, args.side, args.quantity, args.tp_price, args.sl_price, state=state)
     elif args.command == 'grid':
-        from src.advanced.grid_trading import start_grid
-        start_grid(args.symbol, args.lower, args.upper, args.levels, args.qty)
+        if args.run:
+            return run_grid(args)
+        else:
+            from src.advanced.grid_trading import start_grid
+            return start_grid(args.symbol, args.lower, args.upper, args.levels, args.qty)
+    elif args.command == 'batch':
+        from src.batch_orders import submit_file
+        return submit_file(args.file, args.out, args.workers, dry_run=args.dry_run)
+    elif args.command == 'stats':
+        return print_stats(args.file, args.probe, args.prometheus)
+    raise ValueError('unknown command %r' % args.command)
+
+
+def print_reply(reply):
+    """Show a daemon reply the way the command would have printed it locally."""
+    import json
+    if reply.get('output'):
+        print(reply['output'], end='')
+    if not reply.get('ok'):
+        print('daemon: %s' % reply.get('error'), file=sys.stderr)
+        sys.exit(1)
+    if reply.get('result') is not None:
+        print(json.dumps(reply['result'], indent=2, default=str))
+    return reply.get('result')
+
+
+def serve(args):
+    import json
+    from src import daemon
+    if args.stop or args.status:
+        try:
+            with daemon.Connection(args.socket) as conn:
+                reply = conn.call({'op': 'shutdown' if args.stop else 'status'})
+        except OSError:
+            print('No daemon listening on %s' % daemon.socket_path(args.socket))
+            sys.exit(1)
+        if args.status:
+            print(json.dumps(reply.get('result'), indent=2))
+        return reply
+    setup_logging()
+    daemon.serve(args.socket, stream=args.stream)
+
+
+def run_grid(args):
+    import time
+    from src.advanced.grid_engine import GridEngine
+    engine = GridEngine(poll_interval=args.poll)
+    mid = args.mid
+    if mid is None:
+        mid = float(engine.client.futures_symbol_ticker(symbol=args.symbol.upper())['price'])
+    engine.add_grid(args.symbol, args.lower, args.upper, args.levels, args.qty, mid=mid)
+    engine.start()
+    try:
+        while True:
+            time.sleep(60)
+            logger.info('Grid state: %s fills=%d', engine.summary(), engine.stats['fills'])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+
+
+def print_stats(path=None, probe=0, prometheus=False):
+    import json
+    from src import config
+    from src.metrics import format_table, metrics
+    if probe:
+        client = config.get_client()
+        for _ in range(probe):
+            client.ping()
+            client.futures_time()
+        endpoints = metrics.snapshot()
+        if prometheus:
+            print(metrics.prometheus(), end='')
+            return
     else:
-        parser.print_help()
+        path = path or config.settings.metrics_file
+        if not path:
+            print('No metrics snapshot: pass --file, set BOT_METRICS_FILE, or use --probe N')
+            return
+        with open(path) as fh:
+            endpoints = json.load(fh)['endpoints']
+    print(format_table(endpoints))
 
 
 if __name__ == '__main__':
@@ -1,20 +1,22 @@
 import sys
 from src.config import get_client, logger
+from src.validation import prepare_order
 
 def place_market_order(symbol, side, quantity):
     client = get_client()
     try:
-        logger.info(f"Attempting {side} Market Order for {symbol}...")
+        logger.info("Attempting %s Market Order for %s...", side, symbol)
+        quantity, _, _ = prepare_order(client, symbol.upper(), quantity)
         order = client.futures_create_order(
             symbol=symbol.upper(),
             side=side.upper(),
             type='MARKET',
             quantity=quantity
         )
-        logger.info(f"SUCCESS: Order ID {order['orderId']} executed.")
+        logger.info("SUCCESS: Order ID %s executed.", order['orderId'])
         return order
     except Exception as e:
-        logger.error(f"FAILED: {str(e)}")
+        logger.error("FAILED: %s", e)
 
 if __name__ == "__main__":
     # Example usage: python src/market_orders.py BTCUSDT BUY 0.01
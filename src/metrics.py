@@ -0,0 +1,315 @@
+"""Per-endpoint latency histograms for exchange calls.
+
+``InstrumentedClient`` times every public client method into a
+``LatencyHistogram`` and counts errors and request weight per endpoint.
+The histograms use HDR-style log-linear buckets: values below 32 us are
+exact, and above that each power of two is split into 16 sub-buckets, so
+quantiles are within about 6% and recording is an index calculation and
+one list increment.
+"""
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+from src.rate_limit import UNSCOPED_WEIGHTS, request_weight
+
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS           # 32
+MAX_BITS = 40                                # ~12.7 days in microseconds
+QUANTILES = (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('p999', 0.999))
+
+
+def bucket_index(us):
+    if us < SUB_BUCKETS:
+        return us if us > 0 else 0
+    shift = us.bit_length() - SUB_BUCKET_BITS
+    return (shift << 4) + (us >> shift)
+
+
+def bucket_value(index):
+    """Midpoint (in microseconds) of the values that land in ``index``."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> 4) - 1
+    low = (index - (shift << 4)) << shift
+    return low + ((1 << shift) >> 1)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of microsecond latencies.
+
+    Writes take no lock. Concurrent writers can, rarely, lose an increment,
+    which is acceptable for latency statistics.
+    """
+
+    __slots__ = ('counts', 'last', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * bucket_index(1 << MAX_BITS)
+        self.last = len(self.counts) - 1
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def clear(self):
+        self.counts[:] = [0] * len(self.counts)
+        self.count = self.total = self.max = 0
+
+    def record(self, us):
+        # bucket_index() inlined: this runs once per exchange call
+        if us < SUB_BUCKETS:
+            i = us
+        else:
+            shift = us.bit_length() - SUB_BUCKET_BITS
+            i = (shift << 4) + (us >> shift)
+            if i > self.last:
+                i = self.last
+        self.counts[i] += 1
+        self.count += 1
+        self.total += us
+        if us > self.max:
+            self.max = us
+
+    def quantile(self, q):
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= rank:
+                    return min(bucket_value(i), self.max)
+        return self.max
+
+    def merge(self, other):
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+
+class EndpointStats:
+    """Latency, error, retry and request-weight counts for one endpoint.
+
+    Calls are the histogram count. Endpoints with a fixed weight derive
+    their weight from it; only symbol-dependent ones accumulate ``weight``.
+    ``retries`` counts attempts the rate limiter repeated (throttling or
+    clock skew).
+    """
+
+    __slots__ = ('latency', 'errors', 'retries', 'weight', 'unit_weight')
+
+    def __init__(self, unit_weight=None):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.retries = 0
+        self.weight = 0
+        self.unit_weight = unit_weight
+
+    @property
+    def calls(self):
+        return self.latency.count
+
+    def clear(self):
+        self.latency.clear()
+        self.errors = self.retries = self.weight = 0
+
+    def summary(self):
+        h = self.latency
+        weight = self.weight if self.unit_weight is None else self.unit_weight * h.count
+        out = {'calls': h.count, 'errors': self.errors, 'retries': self.retries, 'weight': weight,
+               'mean_us': h.total / h.count if h.count else 0.0, 'max_us': h.max}
+        for key, q in QUANTILES:
+            out[key] = h.quantile(q)
+        return out
+
+
+class Metrics:
+    """Registry of ``EndpointStats`` keyed by client method name."""
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def endpoint(self, name, weighted=True):
+        """Stats for ``name``; ``weighted=False`` for local timings that cost no request weight."""
+        stats = self.endpoints.get(name)
+        if stats is None:
+            if not weighted:
+                unit = 0
+            else:
+                unit = None if name in UNSCOPED_WEIGHTS else request_weight(name, {})
+            with self._lock:
+                stats = self.endpoints.setdefault(name, EndpointStats(unit))
+        return stats
+
+    def reset(self):
+        # clear in place: wrapped client methods hold on to their stats objects
+        with self._lock:
+            for stats in self.endpoints.values():
+                stats.clear()
+
+    def snapshot(self):
+        """``{endpoint: {calls, errors, retries, weight, mean_us, max_us, p50, p90, p99, p999}}``."""
+        return {name: stats.summary() for name, stats in sorted(self.endpoints.items())}
+
+    def prometheus(self, prefix='binance'):
+        """Prometheus text exposition of the current counters and quantiles."""
+        lines = [
+            '# TYPE %s_request_latency_seconds summary' % prefix,
+            '# TYPE %s_request_errors_total counter' % prefix,
+            '# TYPE %s_request_retries_total counter' % prefix,
+            '# TYPE %s_request_weight_total counter' % prefix,
+        ]
+        for name, stats in sorted(self.endpoints.items()):
+            h = stats.latency
+            label = 'endpoint="%s"' % name
+            for _, q in QUANTILES:
+                lines.append('%s_request_latency_seconds{%s,quantile="%s"} %.6f'
+                             % (prefix, label, q, h.quantile(q) / 1e6))
+            lines.append('%s_request_latency_seconds_sum{%s} %.6f' % (prefix, label, h.total / 1e6))
+            lines.append('%s_request_latency_seconds_count{%s} %d' % (prefix, label, h.count))
+            lines.append('%s_request_errors_total{%s} %d' % (prefix, label, stats.errors))
+            lines.append('%s_request_retries_total{%s} %d' % (prefix, label, stats.retries))
+            lines.append('%s_request_weight_total{%s} %d' % (prefix, label, stats.summary()['weight']))
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+class InstrumentedClient:
+    """Proxy that times every public client method into ``metrics``.
+
+    Latency covers the call itself, including retries inside the client
+    library but excluding any rate-limiter wait in front of this proxy.
+    Non-callable attributes pass straight through.
+    """
+
+    def __init__(self, client, registry=None):
+        self._client = client
+        self.metrics = registry or metrics
+
+    def _wrap(self, name, method):
+        stats = self.metrics.endpoint(name)
+        record = stats.latency.record
+        variable = stats.unit_weight is None
+        clock = time.perf_counter_ns
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def timed_async(*args, **params):
+                if variable:
+                    stats.weight += request_weight(name, params)
+                start = clock()
+                try:
+                    return await method(*args, **params)
+                except BaseException:
+                    stats.errors += 1
+                    raise
+                finally:
+                    record((clock() - start) // 1000)
+            return timed_async
+
+        @functools.wraps(method)
+        def timed(*args, **params):
+            if variable:
+                stats.weight += request_weight(name, params)
+            start = clock()
+            try:
+                return method(*args, **params)
+            except BaseException:
+                stats.errors += 1
+                raise
+            finally:
+                record((clock() - start) // 1000)
+        return timed
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not callable(attr) or inspect.isclass(attr):
+            return attr
+        wrapped = self._wrap(name, attr)
+        self.__dict__[name] = wrapped
+        return wrapped
+
+
+def write_snapshot(path, registry=None):
+    """Atomically write ``registry.snapshot()`` as JSON to ``path``."""
+    registry = registry or metrics
+    data = {'time': time.time(), 'endpoints': registry.snapshot()}
+    tmp = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp, 'w') as fh:
+        json.dump(data, fh, indent=2)
+    os.replace(tmp, path)
+
+
+class SnapshotWriter:
+    """Background thread that rewrites a JSON snapshot every ``interval`` seconds."""
+
+    def __init__(self, path, interval=10.0, registry=None):
+        self.path = path
+        self.interval = interval
+        self.registry = registry or metrics
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='metrics-snapshot', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            write_snapshot(self.path, self.registry)
+
+    def stop(self):
+        """Stop the thread and write one final snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        write_snapshot(self.path, self.registry)
+
+
+def serve_prometheus(port, host='127.0.0.1', registry=None):
+    """Serve ``/metrics`` in Prometheus text format from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    registry = registry or metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def format_table(endpoints):
+    """Render a snapshot's endpoints as the ``stats`` CLI table (latencies in ms)."""
+    header = '%-32s %8s %7s %7s %8s %9s %9s %9s' % ('endpoint', 'calls', 'errors', 'retries', 'weight',
+                                                   'p50 ms', 'p99 ms', 'p999 ms')
+    rows = [header, '-' * len(header)]
+    for name, s in sorted(endpoints.items()):
+        rows.append('%-32s %8d %7d %7d %8d %9.3f %9.3f %9.3f'
+                    % (name, s['calls'], s['errors'], s.get('retries', 0), s['weight'],
+                       s['p50'] / 1000.0, s['p99'] / 1000.0, s['p999'] / 1000.0))
+    return '\n'.join(rows)
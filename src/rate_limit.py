@@ -0,0 +1,342 @@
+"""Client-side pacing for Binance futures order and request-weight limits."""
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+
+# USD-M futures default account limits: (orders, seconds)
+ORDER_LIMITS = ((300, 10.0), (1200, 60.0))
+
+
+class OrderRateLimiter:
+    """Blocking sliding-window limiter for order counts.
+
+    ``acquire(n)`` waits until ``n`` more orders fit in every window instead
+    of letting the exchange reject them.
+    """
+
+    def __init__(self, limits=ORDER_LIMITS, clock=time.monotonic, sleep=time.sleep):
+        self.limits = tuple(limits)
+        self.clock = clock
+        self.sleep = sleep
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._horizon = max(period for _, period in self.limits)
+
+    def _wait_time(self, now, n):
+        while self._events and self._events[0][0] <= now - self._horizon:
+            self._events.popleft()
+        wait = 0.0
+        for limit, period in self.limits:
+            used = 0
+            # walk newest to oldest; the oldest entry that must expire sets the wait
+            for t, count in reversed(self._events):
+                if t <= now - period:
+                    break
+                used += count
+                if used + n > limit:
+                    wait = max(wait, t + period - now)
+                    break
+        return wait
+
+    def _reserve(self, n):
+        with self._lock:
+            now = self.clock()
+            wait = self._wait_time(now, n)
+            if wait <= 0:
+                self._events.append((now, n))
+            return wait
+
+    def acquire(self, n=1):
+        while True:
+            wait = self._reserve(n)
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+    async def acquire_async(self, n=1):
+        import asyncio
+        while True:
+            wait = self._reserve(n)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+order_limiter = OrderRateLimiter()
+
+
+# USD-M futures default IP request-weight budget per minute
+WEIGHT_LIMIT_1M = 2400
+
+
+# Request weights for endpoints that cost more than 1; unknown methods count as 1.
+WEIGHTS = {
+    'futures_account': 5,
+    'futures_account_balance': 5,
+    'futures_position_information': 5,
+    'futures_place_batch_order': 5,
+    'futures_klines': 5,
+    'futures_order_book': 10,
+    'futures_exchange_info': 1,
+}
+# endpoints that are far heavier when called without a symbol
+UNSCOPED_WEIGHTS = {
+    'futures_get_open_orders': 40,
+    'futures_ticker': 40,
+}
+RETRY_STATUSES = (418, 429)
+# "Timestamp for this request is outside of the recvWindow"
+TIMESTAMP_ERROR = -1021
+
+
+def request_weight(method, params):
+    if 'symbol' not in params and method in UNSCOPED_WEIGHTS:
+        return UNSCOPED_WEIGHTS[method]
+    return WEIGHTS.get(method, 1)
+
+
+def order_count(method, params):
+    """Orders a call adds to the account's order-count windows."""
+    if method == 'futures_create_order':
+        return 1
+    if method == 'futures_place_batch_order':
+        return len(params.get('batchOrders') or ())
+    return 0
+
+
+def _header(headers, name):
+    if not headers:
+        return None
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class WeightLimiter:
+    """Token bucket for the per-IP request-weight budget.
+
+    Tokens refill continuously at ``capacity / period`` per second. Callers
+    wait for enough tokens instead of failing. ``update`` corrects the bucket
+    from the server's ``X-MBX-USED-WEIGHT-1M`` header, and ``backoff`` stops
+    all callers after a 429/418. Both the blocking and asyncio variants share
+    one lock, so threads and coroutines draw from the same budget.
+    """
+
+    def __init__(self, capacity=WEIGHT_LIMIT_1M, period=60.0, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.server_used = None
+        self.blocked_until = 0.0
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'weight': 0, 'waits': 0, 'waited': 0.0, 'throttled': 0}
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _reserve(self, weight):
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if now < self.blocked_until:
+                wait = self.blocked_until - now
+            else:
+                # a call heavier than the whole bucket only needs a full one
+                need = min(weight, self.capacity)
+                if self.tokens >= need:
+                    self.tokens -= weight
+                    self.stats['requests'] += 1
+                    self.stats['weight'] += weight
+                    return 0.0
+                wait = (need - self.tokens) / self.rate
+            self.stats['waits'] += 1
+            self.stats['waited'] += wait
+            return wait
+
+    def acquire(self, weight=1):
+        while True:
+            wait = self._reserve(weight)
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+    async def acquire_async(self, weight=1):
+        import asyncio
+        while True:
+            wait = self._reserve(weight)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def update(self, headers):
+        """Adopt the server's used-weight count when it is ahead of ours."""
+        used = _header(headers, 'X-MBX-USED-WEIGHT-1M')
+        if used is None:
+            return
+        with self._lock:
+            self._refill(self.clock())
+            self.server_used = used
+            self.tokens = min(self.tokens, self.capacity - used)
+
+    def backoff(self, seconds):
+        with self._lock:
+            self.stats['throttled'] += 1
+            self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def headroom(self):
+        """Fraction of the weight budget available right now (0..1)."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if now < self.blocked_until:
+                return 0.0
+            return max(0.0, self.tokens) / self.capacity
+
+
+weight_limiter = WeightLimiter()
+
+
+def _retry_after(exc, default=1.0):
+    response = getattr(exc, 'response', None)
+    value = _header(getattr(response, 'headers', None), 'Retry-After')
+    return float(value) if value is not None else default
+
+
+class RateLimitedClient:
+    """Proxy that paces every public client method through the shared limiters.
+
+    Before a call it takes the endpoint's weight from ``weight_limiter`` and
+    any orders from ``order_limiter``. Afterwards it feeds the response
+    headers back into the bucket. A 429 or 418 pauses every caller for
+    ``Retry-After`` seconds, then the call is retried up to ``max_retries``
+    times. With a ``time_sync`` (``src.time_sync.TimeSync``) a ``-1021``
+    clock-skew rejection re-measures the server offset and retries once.
+    Retries are counted per endpoint in ``src.metrics``. Coroutine methods (``AsyncClient``) get an awaiting wrapper.
+    Non-callable attributes such as ``session`` and ``response`` pass
+    straight through.
+    """
+
+    def __init__(self, client, weights=None, orders=None, max_retries=3, time_sync=None):
+        self._client = client
+        self.limiter = weights or weight_limiter
+        self.orders = orders or order_limiter
+        self.max_retries = max_retries
+        self.time_sync = time_sync
+
+    def _after(self):
+        response = getattr(self._client, 'response', None)
+        self.limiter.update(getattr(response, 'headers', None))
+
+    def _throttled(self, exc, attempt):
+        if getattr(exc, 'status_code', None) not in RETRY_STATUSES or attempt >= self.max_retries:
+            return False
+        self.limiter.backoff(_retry_after(exc))
+        self.limiter.update(getattr(getattr(exc, 'response', None), 'headers', None))
+        return True
+
+    def _should_retry(self, exc, tries):
+        """Whether to retry after ``exc``; ``tries`` counts earlier retries of each kind.
+
+        The one clock re-sync retry is separate from ``max_retries``, so it
+        still happens with ``max_retries=0``.
+        """
+        if getattr(exc, 'code', None) == TIMESTAMP_ERROR:
+            if tries['resync'] or self.time_sync is None or not self.time_sync.resync():
+                return False
+            tries['resync'] += 1
+            return True
+        if not self._throttled(exc, tries['throttled']):
+            return False
+        tries['throttled'] += 1
+        return True
+
+    async def _should_retry_async(self, exc, tries):
+        # the re-sync itself is a request on the async client, so it is awaited
+        if getattr(exc, 'code', None) == TIMESTAMP_ERROR:
+            if tries['resync'] or self.time_sync is None or not await self.time_sync.resync_async():
+                return False
+            tries['resync'] += 1
+            return True
+        return self._should_retry(exc, tries)
+
+    def _wrap(self, name, method):
+        from src.metrics import metrics
+        stats = metrics.endpoint(name)
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def paced_async(*args, **params):
+                orders = order_count(name, params)
+                tries = {'throttled': 0, 'resync': 0}
+                while True:
+                    if orders:
+                        await self.orders.acquire_async(orders)
+                    await self.limiter.acquire_async(request_weight(name, params))
+                    try:
+                        result = await method(*args, **params)
+                    except Exception as e:
+                        if not await self._should_retry_async(e, tries):
+                            raise
+                        stats.retries += 1
+                        continue
+                    self._after()
+                    return result
+            return paced_async
+
+        @functools.wraps(method)
+        def paced(*args, **params):
+            orders = order_count(name, params)
+            tries = {'throttled': 0, 'resync': 0}
+            while True:
+                if orders:
+                    self.orders.acquire(orders)
+                self.limiter.acquire(request_weight(name, params))
+                try:
+                    result = method(*args, **params)
+                except Exception as e:
+                    if not self._should_retry(e, tries):
+                        raise
+                    stats.retries += 1
+                    continue
+                self._after()
+                return result
+        return paced
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name.startswith('_') or not callable(attr) or inspect.isclass(attr):
+            return attr
+        wrapped = self._wrap(name, attr)
+        # cache so later lookups skip __getattr__
+        self.__dict__[name] = wrapped
+        return wrapped
+
+
+def used_weight(client):
+    """Last ``X-MBX-USED-WEIGHT-1M`` reported to ``client``, or None if unknown."""
+    response = getattr(client, 'response', None)
+    return _header(getattr(response, 'headers', None), 'X-MBX-USED-WEIGHT-1M')
+
+
+def weight_headroom(client, limit=WEIGHT_LIMIT_1M):
+    """Fraction of the per-minute weight budget still free (0..1), or None if unknown.
+
+    Limited clients answer from the shared token bucket; bare clients fall
+    back to the last response header.
+    """
+    if isinstance(client, RateLimitedClient):
+        return client.limiter.headroom()
+    used = used_weight(client)
+    if used is None:
+        return None
+    return max(0.0, 1.0 - used / float(limit))
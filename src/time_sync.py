@@ -0,0 +1,223 @@
+"""Exchange clock offset and request signing for the binance clients.
+
+python-binance stamps every signed request with ``time.time() * 1000 +
+client.timestamp_offset`` and never sets the offset itself. A host whose
+clock drifts ahead of the exchange's gets ``-1021`` (timestamp outside
+``recvWindow``) rejections. ``TimeSync`` measures the offset from
+``futures_time`` and keeps it fresh from a background thread.
+``RateLimitedClient`` re-syncs and retries once when a ``-1021`` gets
+through anyway. ``AsyncClient`` gets the same through the ``*_async``
+methods, with the refresh running as a task on its event loop.
+
+``HmacSigner`` replaces the client's per-request ``hmac.new(secret, ...)``
+with a copy of an HMAC object keyed once, so the key pads are derived at
+startup instead of on every call. Its cost is timed into the ``sign``
+entry of ``src.metrics``.
+"""
+import asyncio
+import hmac
+import inspect
+import threading
+import time
+
+from src.config import logger
+from src.metrics import metrics
+
+TIME_SYNC_INTERVAL = 300.0
+SAMPLES = 3
+# python-binance releases whose BaseClient._hmac_signature(query_string) install_signer replaces
+SIGNER_VERSIONS = ((1, 0), (1, 0))
+
+
+def raw_client(client):
+    """The binance client under any ``RateLimitedClient``/``InstrumentedClient`` proxies."""
+    while '_client' in vars(client):
+        client = vars(client)['_client']
+    return client
+
+
+class TimeSync:
+    """Keeps ``timestamp_offset`` on a client equal to server time minus local time (ms)."""
+
+    def __init__(self, client, interval=TIME_SYNC_INTERVAL, samples=SAMPLES, clock=time.time):
+        self.client = client
+        self.target = raw_client(client)
+        self.interval = interval
+        self.samples = samples
+        self.clock = clock
+        self.offset = 0
+        self.rtt = None
+        self.stats = {'syncs': 0, 'errors': 0, 'resyncs': 0}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._task = None
+
+    @staticmethod
+    def _better(best, sent, server, received):
+        rtt = (received - sent) * 1000.0
+        if best is None or rtt < best[1]:
+            return int(round(server - (sent + received) * 500.0)), rtt
+        return best
+
+    def measure(self, samples=None):
+        """``(offset_ms, rtt_ms)`` from the lowest-latency of ``samples`` ``futures_time`` calls.
+
+        The server stamped its time somewhere inside the round trip, so the
+        midpoint of the fastest round trip gives the tightest estimate.
+        """
+        best = None
+        for _ in range(samples or self.samples):
+            sent = self.clock()
+            server = self.client.futures_time()['serverTime']
+            best = self._better(best, sent, server, self.clock())
+        return best
+
+    async def measure_async(self, samples=None):
+        """``measure`` for an ``AsyncClient``."""
+        best = None
+        for _ in range(samples or self.samples):
+            sent = self.clock()
+            server = (await self.client.futures_time())['serverTime']
+            best = self._better(best, sent, server, self.clock())
+        return best
+
+    def sync(self, samples=None):
+        """Measure and apply the offset now; returns it (ms)."""
+        return self._apply(*self.measure(samples))
+
+    async def sync_async(self, samples=None):
+        return self._apply(*await self.measure_async(samples))
+
+    def _apply(self, offset, rtt):
+        with self._lock:
+            self.offset, self.rtt = offset, rtt
+            self.target.timestamp_offset = offset
+            self.stats['syncs'] += 1
+        if abs(offset) >= 1000:
+            logger.warning('Local clock is %+d ms off the exchange (rtt %.1f ms)', -offset, rtt)
+        return offset
+
+    def resync(self):
+        """Re-measure after a ``-1021``; True if the offset could be refreshed."""
+        self.stats['resyncs'] += 1
+        try:
+            self.sync()
+            return True
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning('Time re-sync failed: %s', e)
+            return False
+
+    async def resync_async(self):
+        self.stats['resyncs'] += 1
+        try:
+            await self.sync_async()
+            return True
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning('Time re-sync failed: %s', e)
+            return False
+
+    def now_ms(self):
+        """Current exchange time in milliseconds, by the local clock plus the offset."""
+        return int(self.clock() * 1000 + self.offset)
+
+    def start(self):
+        """Sync once in the caller's thread, then every ``interval`` seconds in the background.
+
+        The first sync takes a single sample so startup pays one round trip.
+        """
+        try:
+            self.sync(samples=1)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning('Initial time sync failed, signing with the local clock: %s', e)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='time-sync', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sync()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.warning('Time sync failed: %s', e)
+
+    async def start_async(self):
+        """``start`` for an ``AsyncClient``: the refresh runs as a task on the current loop."""
+        try:
+            await self.sync_async(samples=1)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.warning('Initial time sync failed, signing with the local clock: %s', e)
+        self._task = asyncio.create_task(self._run_async())
+        return self
+
+    async def _run_async(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync_async()
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.warning('Time sync failed: %s', e)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+class HmacSigner:
+    """HMAC-SHA256 signer keyed once; ``sign(query_string)`` returns the hex digest."""
+
+    def __init__(self, secret, registry=None):
+        # hmac.new uses OpenSSL's HMAC underneath, and copy() copies that C object
+        self._mac = hmac.new(secret.encode('utf-8'), digestmod='sha256')
+        self._record = (registry or metrics).endpoint('sign', weighted=False).latency.record
+
+    def sign(self, query_string):
+        start = time.perf_counter_ns()
+        mac = self._mac.copy()
+        mac.update(query_string.encode('utf-8'))
+        signature = mac.hexdigest()
+        self._record((time.perf_counter_ns() - start) // 1000)
+        return signature
+
+
+def _signer_supported(raw):
+    """True if ``raw`` is a python-binance release whose ``_hmac_signature`` we know how to replace."""
+    method = getattr(raw, '_hmac_signature', None)
+    if method is None or list(inspect.signature(method).parameters) != ['query_string']:
+        return False
+    module = type(raw).__module__.split('.')[0]
+    if module != 'binance':
+        return True   # a stand-in client with the same hook
+    import binance
+    version = tuple(int(p) for p in binance.__version__.split('.')[:2] if p.isdigit())
+    return SIGNER_VERSIONS[0] <= version <= SIGNER_VERSIONS[1]
+
+
+def install_signer(client, secret, registry=None):
+    """Route the binance client's HMAC signing through an ``HmacSigner``.
+
+    ``_hmac_signature`` is private to python-binance, so it is only replaced
+    on the releases in ``SIGNER_VERSIONS``. Other releases, and RSA/Ed25519
+    keys (``PRIVATE_KEY``), keep the library's own signing.
+    """
+    raw = raw_client(client)
+    if not secret or getattr(raw, 'PRIVATE_KEY', None):
+        return None
+    if not _signer_supported(raw):
+        logger.info('Keeping python-binance request signing: no known _hmac_signature hook')
+        return None
+    signer = HmacSigner(secret, registry)
+    raw._hmac_signature = signer.sign
+    return signer
@@ -0,0 +1,105 @@
+"""Futures user-data stream client (asyncio).
+
+Holds a listen key, keeps it alive, reconnects with backoff and hands each
+decoded event (``ORDER_TRADE_UPDATE``, ``ACCOUNT_UPDATE``, ...) to the
+registered handlers. ``connected`` is cleared while the socket is down so
+consumers can fall back to REST.
+"""
+import asyncio
+import inspect
+import json
+
+import websockets
+
+from src.config import logger
+
+FUTURES_STREAM_URL = 'wss://fstream.binance.com/ws/'
+FUTURES_TESTNET_STREAM_URL = 'wss://stream.binancefuture.com/ws/'
+KEEPALIVE_INTERVAL = 30 * 60
+
+
+async def _call(fn, *args):
+    res = fn(*args)
+    if inspect.isawaitable(res):
+        await res
+
+
+class UserDataStream:
+    def __init__(self, client, url=None, testnet=None, reconnect_delay=1.0, max_reconnect_delay=30.0,
+                 keepalive_interval=KEEPALIVE_INTERVAL):
+        self.client = client
+        self.url = url
+        self.testnet = testnet
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.keepalive_interval = keepalive_interval
+        self.handlers = []
+        self.on_connect = []
+        self.connected = asyncio.Event()
+        self.stats = {'connects': 0, 'events': 0, 'drops': 0}
+        self._listen_key = None
+        self._tasks = []
+
+    def subscribe(self, handler):
+        """Call ``handler(event)`` (sync or async) for every stream event."""
+        self.handlers.append(handler)
+
+    async def start(self):
+        self._tasks.append(asyncio.create_task(self._run()))
+        if self.url is None:
+            self._tasks.append(asyncio.create_task(self._keepalive()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.connected.clear()
+
+    async def _stream_url(self):
+        if self.url is not None:
+            return self.url
+        from src import config
+        testnet = config.USE_TESTNET if self.testnet is None else self.testnet
+        self._listen_key = await asyncio.to_thread(self.client.futures_stream_get_listen_key)
+        base = FUTURES_TESTNET_STREAM_URL if testnet else FUTURES_STREAM_URL
+        return base + self._listen_key
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(self.keepalive_interval)
+            if self._listen_key:
+                try:
+                    await asyncio.to_thread(self.client.futures_stream_keepalive, listenKey=self._listen_key)
+                except Exception as e:
+                    logger.warning('listen key keepalive failed: %s', e)
+
+    async def _run(self):
+        delay = self.reconnect_delay
+        while True:
+            try:
+                url = await self._stream_url()
+                async with websockets.connect(url) as ws:
+                    self.connected.set()
+                    self.stats['connects'] += 1
+                    delay = self.reconnect_delay
+                    logger.info('User data stream connected')
+                    for cb in self.on_connect:
+                        await _call(cb)
+                    async for raw in ws:
+                        event = json.loads(raw)
+                        if event.get('e') == 'listenKeyExpired':
+                            logger.warning('listen key expired; reconnecting')
+                            break
+                        self.stats['events'] += 1
+                        for handler in self.handlers:
+                            await _call(handler, event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['drops'] += 1
+                logger.warning('User data stream dropped: %s', e)
+            finally:
+                self.connected.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
@@ -1,57 +1,209 @@
+import math
 from decimal import Decimal, getcontext
 from src.config import logger
+from src.exchange_info import SymbolFilters, exchange_info_cache, _find_filter
 
 getcontext().prec = 18
 
-def _find_filter(filters, filter_type):
-    for f in filters:
-        if f.get('filterType') == filter_type:
-            return f
-    return None
+
+def _filters(symbol_info):
+    """Accept a raw exchange-info symbol dict or an already parsed ``SymbolFilters``."""
+    if isinstance(symbol_info, SymbolFilters):
+        return symbol_info
+    return SymbolFilters(symbol_info)
+
 
 def validate_symbol(client, symbol):
     try:
-        info = client.futures_exchange_info()
-        for s in info.get('symbols', []):
-            if s['symbol'].upper() == symbol.upper():
-                return s
+        return exchange_info_cache(client).symbol_info(symbol)
     except Exception as e:
         logger.error('validate_symbol error: %s', e)
     return None
 
 def validate_quantity(symbol_info, qty):
     try:
-        qty = Decimal(str(qty))
-        lot = _find_filter(symbol_info['filters'], 'LOT_SIZE')
-        if not lot:
+        f = _filters(symbol_info)
+        if f.step_size is None:
             return False, 'LOT_SIZE filter not found'
-        min_qty = Decimal(lot['minQty'])
-        max_qty = Decimal(lot['maxQty'])
-        step = Decimal(lot['stepSize'])
-        if qty < min_qty or qty > max_qty:
-            return False, f'Quantity {qty} outside [{min_qty}, {max_qty}]'
+        qty = Decimal(str(qty))
+        if qty < f.min_qty or qty > f.max_qty:
+            return False, f'Quantity {qty} outside [{f.min_qty}, {f.max_qty}]'
         # check step alignment
-        remainder = (qty - min_qty) % step
+        remainder = (qty - f.min_qty) % f.step_size
         if remainder != 0:
-            return False, f'Quantity {qty} not multiple of step {step}'
+            return False, f'Quantity {qty} not multiple of step {f.step_size}'
         return True, ''
     except Exception as e:
         return False, str(e)
 
 def validate_price(symbol_info, price):
     try:
-        price = Decimal(str(price))
-        tick = _find_filter(symbol_info['filters'], 'PRICE_FILTER')
-        if not tick:
+        f = _filters(symbol_info)
+        if f.tick_size is None:
             return False, 'PRICE_FILTER not found'
-        min_price = Decimal(tick['minPrice'])
-        max_price = Decimal(tick['maxPrice'])
-        tick_size = Decimal(tick['tickSize'])
-        if price < min_price or price > max_price:
-            return False, f'Price {price} outside [{min_price}, {max_price}]'
-        remainder = (price - min_price) % tick_size
+        price = Decimal(str(price))
+        if price < f.min_price or price > f.max_price:
+            return False, f'Price {price} outside [{f.min_price}, {f.max_price}]'
+        remainder = (price - f.min_price) % f.tick_size
         if remainder != 0:
-            return False, f'Price {price} not aligned to tickSize {tick_size}'
+            return False, f'Price {price} not aligned to tickSize {f.tick_size}'
         return True, ''
     except Exception as e:
         return False, str(e)
+
+
+# beyond this many units a double can no longer resolve single units
+_FLOAT_SAFE_UNITS = 1e12
+# distance from a whole unit that snap_qty treats as float error rather than a real fraction
+_SNAP_EPSILON = 1e-9
+
+
+def _places(*values):
+    return max(max(-v.normalize().as_tuple().exponent, 0) for v in values)
+
+
+def _to_units(value, scale):
+    """``value * scale`` as ``(nearest_int, exact)``; exact means no sub-unit remainder.
+
+    ``u / scale`` is the double nearest to the decimal ``u`` units, so it
+    equals ``value`` exactly when ``value`` has no digits below one unit
+    (0.3 passes at scale 1000, 0.1 + 0.2 does not).
+    """
+    f = float(value)
+    if not math.isfinite(f):
+        raise ValueError('not a finite number: %r' % (value,))
+    v = f * scale
+    if -_FLOAT_SAFE_UNITS < v < _FLOAT_SAFE_UNITS:
+        u = round(v)
+        return u, u / scale == f
+    d = Decimal(str(value)) * scale
+    u = int(d.to_integral_value())
+    return u, d == u
+
+
+def _from_units(units, places):
+    # exact: the double nearest units / 10**places rounds back to the same digits
+    return '%.*f' % (places, units / 10 ** places)
+
+
+class OrderValidator:
+    """LOT_SIZE / PRICE_FILTER checks for one symbol in scaled integer units.
+
+    Bounds, step and tick are converted once to integers at the filters'
+    decimal precision. A check is then one float multiply and integer
+    modulo, with no Decimal construction per call.
+    """
+
+    __slots__ = ('symbol', 'qty_places', 'qty_scale', 'min_qty', 'max_qty', 'step',
+                 'price_places', 'price_scale', 'min_price', 'max_price', 'tick')
+
+    def __init__(self, symbol_info):
+        f = _filters(symbol_info)
+        if f.step_size is None or f.tick_size is None:
+            raise ValueError(f'{f.symbol}: LOT_SIZE or PRICE_FILTER filter not found')
+        self.symbol = f.symbol
+        self.qty_places = _places(f.min_qty, f.max_qty, f.step_size)
+        self.qty_scale = 10 ** self.qty_places
+        self.min_qty = int(f.min_qty * self.qty_scale)
+        self.max_qty = int(f.max_qty * self.qty_scale)
+        self.step = int(f.step_size * self.qty_scale)
+        self.price_places = _places(f.min_price, f.max_price, f.tick_size)
+        self.price_scale = 10 ** self.price_places
+        self.min_price = int(f.min_price * self.price_scale)
+        self.max_price = int(f.max_price * self.price_scale)
+        self.tick = int(f.tick_size * self.price_scale)
+
+    def check_qty(self, qty):
+        """Same contract as ``validate_quantity``: ``(ok, message)``."""
+        u, exact = _to_units(qty, self.qty_scale)
+        if u < self.min_qty or u > self.max_qty:
+            return False, f'Quantity {qty} outside [{_from_units(self.min_qty, self.qty_places)}, ' \
+                          f'{_from_units(self.max_qty, self.qty_places)}]'
+        if not exact or (u - self.min_qty) % self.step:
+            return False, f'Quantity {qty} not multiple of step {_from_units(self.step, self.qty_places)}'
+        return True, ''
+
+    def check_price(self, price):
+        """Same contract as ``validate_price``: ``(ok, message)``."""
+        u, exact = _to_units(price, self.price_scale)
+        if (self.min_price and u < self.min_price) or (self.max_price and u > self.max_price):
+            return False, f'Price {price} outside [{_from_units(self.min_price, self.price_places)}, ' \
+                          f'{_from_units(self.max_price, self.price_places)}]'
+        if not exact or (self.tick and (u - self.min_price) % self.tick):
+            return False, f'Price {price} not aligned to tickSize {_from_units(self.tick, self.price_places)}'
+        return True, ''
+
+    def snap_qty(self, qty):
+        """Round ``qty`` down onto the step grid; returns the exchange string.
+
+        Raises ValueError if the snapped quantity is outside the lot bounds.
+        """
+        u, exact = _to_units(qty, self.qty_scale)
+        if not exact:
+            v = float(qty) * self.qty_scale
+            # 0.3 / 3 is 0.0999...9: that is binary noise on a whole unit, not a remainder
+            if abs(v - u) > max(_SNAP_EPSILON, 4 * math.ulp(v)):
+                u = math.floor(v)
+        u -= (u - self.min_qty) % self.step
+        if u < self.min_qty or u > self.max_qty:
+            raise ValueError(f'{self.symbol}: quantity {qty} outside '
+                             f'[{_from_units(self.min_qty, self.qty_places)}, '
+                             f'{_from_units(self.max_qty, self.qty_places)}]')
+        return _from_units(u, self.qty_places)
+
+    def snap_price(self, price):
+        """Round ``price`` to the nearest tick; returns the exchange string.
+
+        Raises ValueError if the snapped price is outside the price filter.
+        """
+        u, _ = _to_units(price, self.price_scale)
+        if self.tick:
+            off = (u - self.min_price) % self.tick
+            u += -off if 2 * off < self.tick else self.tick - off
+        if (self.min_price and u < self.min_price) or (self.max_price and u > self.max_price):
+            raise ValueError(f'{self.symbol}: price {price} outside '
+                             f'[{_from_units(self.min_price, self.price_places)}, '
+                             f'{_from_units(self.max_price, self.price_places)}]')
+        return _from_units(u, self.price_places)
+
+
+def compiled_validator(filters):
+    """The ``OrderValidator`` for a ``SymbolFilters``, compiled once and kept on it."""
+    v = filters.validator
+    if v is None:
+        v = filters.validator = OrderValidator(filters)
+    return v
+
+
+def order_validator(client, symbol):
+    """Validator for ``symbol`` from the client's cached exchange info.
+
+    Returns None when the client has no exchange info to offer (test fakes,
+    simulators) or it cannot be fetched; orders then go out unchanged.
+    Raises ValueError for a symbol the exchange does not list.
+    """
+    if not hasattr(client, 'futures_exchange_info'):
+        return None
+    try:
+        f = exchange_info_cache(client).filters(symbol)
+    except Exception as e:
+        logger.warning('Exchange info unavailable; %s orders not pre-validated: %s', symbol, e)
+        return None
+    if f is None:
+        raise ValueError(f'Unknown symbol {symbol}')
+    return compiled_validator(f)
+
+
+def prepare_order(client, symbol, quantity, price=None, stop_price=None):
+    """Snap ``quantity`` (and prices) to the symbol's filters before sending.
+
+    Returns ``(quantity, price, stop_price)`` as exchange strings, or the
+    inputs unchanged when no exchange info is available. Raises ValueError
+    instead of spending a round trip on an order the exchange would reject.
+    """
+    v = order_validator(client, symbol)
+    if v is None:
+        return quantity, price, stop_price
+    return (v.snap_qty(quantity),
+            None if price is None else v.snap_price(price),
+            None if stop_price is None else v.snap_price(stop_price))
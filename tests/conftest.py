@@ -0,0 +1,54 @@
+import asyncio
+import os
+
+import pytest
+
+import src.config as config
+
+
+@pytest.fixture(autouse=True, scope='session')
+def log_to_temp_file(tmp_path_factory):
+    """Keep the test run's log pipeline out of ``./bot.log``.
+
+    The pipeline is created once per process on the first ``get_client``,
+    so the path has to be in place before any test runs.
+    """
+    path = str(tmp_path_factory.mktemp('logs') / 'bot.log')
+    os.environ['BOT_LOG_FILE'] = path
+    if config.settings._loaded:
+        config.settings.log_file = path
+    yield path
+
+
+class FakeStreamServer:
+    """Local WebSocket server; anything put on ``events`` is pushed to every client."""
+
+    def __init__(self):
+        self.events = asyncio.Queue()
+        self.server = None
+
+    async def _handler(self, ws, *args):
+        closed = asyncio.ensure_future(ws.wait_closed())
+        while True:
+            event = asyncio.ensure_future(self.events.get())
+            await asyncio.wait({event, closed}, return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                event.cancel()
+                return
+            await ws.send(event.result())
+
+    async def __aenter__(self):
+        import websockets
+        self.server = await websockets.serve(self._handler, '127.0.0.1', 0)
+        self.url = 'ws://127.0.0.1:%d' % self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+@pytest.fixture
+def stream_server():
+    """``FakeStreamServer`` class, for tests that run a user-data stream against it."""
+    return FakeStreamServer
@@ -0,0 +1,167 @@
+import asyncio
+import json
+
+from src.account_state import AccountState, AccountStateService
+from src.advanced import oco
+from src.user_stream import UserDataStream
+
+
+class FakeAccountClient:
+    def __init__(self):
+        self.open_orders = [
+            {'orderId': 1, 'symbol': 'BTCUSDT', 'status': 'NEW', 'executedQty': '0', 'updateTime': 100},
+            {'orderId': 2, 'symbol': 'ETHUSDT', 'status': 'NEW', 'executedQty': '0', 'updateTime': 100},
+        ]
+        self.positions = [
+            {'symbol': 'BTCUSDT', 'positionSide': 'BOTH', 'positionAmt': '0.010', 'entryPrice': '30000'},
+            {'symbol': 'ETHUSDT', 'positionSide': 'BOTH', 'positionAmt': '0.000', 'entryPrice': '0'},
+        ]
+        self.balances = [{'asset': 'USDT', 'balance': '1000.0', 'crossWalletBalance': '1000.0'}]
+        self.snapshots = 0
+        self.during_snapshot = None
+
+    def futures_get_open_orders(self):
+        self.snapshots += 1
+        return [dict(o) for o in self.open_orders]
+
+    def futures_position_information(self):
+        return [dict(p) for p in self.positions]
+
+    def futures_account_balance(self):
+        if self.during_snapshot:
+            self.during_snapshot()
+        return [dict(b) for b in self.balances]
+
+
+def order_event(order_id, status, t, symbol='BTCUSDT', filled='0'):
+    return {'e': 'ORDER_TRADE_UPDATE', 'E': t,
+            'o': {'s': symbol, 'i': order_id, 'X': status, 'z': filled, 'T': t, 'S': 'BUY', 'o': 'LIMIT'}}
+
+
+def account_event(wallet, amount):
+    return {'e': 'ACCOUNT_UPDATE', 'a': {'B': [{'a': 'USDT', 'wb': wallet, 'cw': wallet}],
+                                         'P': [{'s': 'BTCUSDT', 'pa': amount, 'ep': '30000', 'up': '0', 'ps': 'BOTH'}]}}
+
+
+def synced_state():
+    client = FakeAccountClient()
+    state = AccountState(client)
+    state.sync()
+    return client, state
+
+
+def test_snapshot_seeds_indexes():
+    _, state = synced_state()
+    assert state.order(1)['symbol'] == 'BTCUSDT'
+    assert [o['orderId'] for o in state.open_orders('ethusdt')] == [2]
+    assert state.position('BTCUSDT')['positionAmt'] == '0.010'
+    assert state.position('ETHUSDT') is None
+    assert state.balance('USDT')['balance'] == '1000.0'
+
+
+def test_order_events_update_and_close_orders():
+    _, state = synced_state()
+    state.on_event(order_event(3, 'NEW', 110))
+    state.on_event(order_event(3, 'PARTIALLY_FILLED', 120, filled='0.005'))
+    assert state.order(3)['executedQty'] == '0.005' and state.order(3)['type'] == 'LIMIT'
+    state.on_event(order_event(1, 'FILLED', 130, filled='0.01'))
+    # a late event must not resurrect the filled order
+    state.on_event(order_event(1, 'NEW', 105))
+    assert state.order(1)['status'] == 'FILLED'
+    assert sorted(o['orderId'] for o in state.open_orders('BTCUSDT')) == [3]
+    assert state.stats['stale'] == 1
+
+
+def test_rest_ack_after_stream_fill_does_not_reopen_the_order():
+    _, state = synced_state()
+    state.on_event(order_event(7, 'FILLED', 200, filled='0.01'))
+    state.record_order({'orderId': 7, 'symbol': 'BTCUSDT', 'status': 'NEW', 'updateTime': 150})
+    assert state.order(7)['status'] == 'FILLED'
+    assert 7 not in state.orders and 7 not in {o['orderId'] for o in state.open_orders('BTCUSDT')}
+    # an ack newer than what the stream reported still wins
+    state.record_order({'orderId': 3, 'symbol': 'BTCUSDT', 'status': 'NEW', 'updateTime': 100})
+    state.record_order({'orderId': 3, 'symbol': 'BTCUSDT', 'status': 'PARTIALLY_FILLED',
+                        'executedQty': '0.005', 'updateTime': 120})
+    assert state.order(3)['status'] == 'PARTIALLY_FILLED'
+
+
+def test_account_updates_move_balances_and_positions():
+    _, state = synced_state()
+    state.on_event(account_event('990.5', '0.020'))
+    assert state.balance('USDT')['balance'] == '990.5'
+    assert state.position('BTCUSDT')['positionAmt'] == '0.020'
+    state.on_event(account_event('1001.0', '0'))
+    assert state.position('BTCUSDT') is None
+
+
+def test_events_during_snapshot_are_replayed():
+    client = FakeAccountClient()
+    state = AccountState(client)
+    client.during_snapshot = lambda: state.on_event(order_event(1, 'CANCELED', 150))
+    state.sync()
+    assert state.order(1)['status'] == 'CANCELED'
+    assert [o['orderId'] for o in state.open_orders()] == [2]
+
+
+def test_reconcile_reports_and_repairs_drift():
+    client, state = synced_state()
+    assert state.reconcile() == {}
+    client.open_orders.pop(0)
+    client.open_orders.append({'orderId': 9, 'symbol': 'BTCUSDT', 'status': 'NEW', 'executedQty': '0'})
+    client.positions[0]['positionAmt'] = '0.030'
+    drift = state.reconcile()
+    assert drift == {'orders_missing': [9], 'orders_unknown': [1],
+                     'positions': [('BTCUSDT', 'BOTH')]}
+    assert state.reconcile() == {}
+    assert state.stats['drift'] == 1
+
+
+def test_service_applies_stream_events(stream_server):
+    async def scenario():
+        client = FakeAccountClient()
+        async with stream_server() as server:
+            service = AccountStateService(client, stream=UserDataStream(client, url=server.url))
+            state = await service.start()
+            await asyncio.wait_for(service.stream.connected.wait(), 2)
+            while not state.synced:
+                await asyncio.sleep(0.01)
+            await server.events.put(json.dumps(order_event(2, 'FILLED', 200, symbol='ETHUSDT')))
+            await server.events.put(json.dumps(account_event('1010.0', '0.010')))
+            while state.stats['events'] < 2:
+                await asyncio.sleep(0.01)
+            await service.stop()
+        return client, state
+
+    client, state = asyncio.run(scenario())
+    assert client.snapshots == 1
+    assert state.open_orders('ETHUSDT') == []
+    assert state.balance('USDT')['balance'] == '1010.0'
+
+
+def test_place_oco_reads_leg_status_from_state(monkeypatch):
+    class OrderClient(FakeAccountClient):
+        def __init__(self):
+            super().__init__()
+            self.rest_gets = 0
+            self.cancelled = []
+            self.next_id = 51
+
+        def futures_create_order(self, **params):
+            self.next_id += 1
+            return {'orderId': self.next_id, 'symbol': params['symbol'], 'status': 'NEW', 'updateTime': 1}
+
+        def futures_get_order(self, **params):
+            self.rest_gets += 1
+            return {'status': 'NEW'}
+
+        def futures_cancel_order(self, symbol, orderId):
+            self.cancelled.append(orderId)
+
+    client = OrderClient()
+    state = AccountState(client)
+    state.sync()
+    monkeypatch.setattr(oco, 'get_client', lambda: client)
+    monkeypatch.setattr(oco.time, 'sleep', lambda s: state.on_event(order_event(53, 'FILLED', 5)))
+    res = oco.place_oco('BTCUSDT', 'BUY', 0.01, 35000, 29000, poll_interval=0, timeout=5, state=state)
+    assert res['filled'] == 'sl' and client.cancelled == [52]
+    assert client.rest_gets == 0
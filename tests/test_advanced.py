@@ -1,4 +1,4 @@
-import time
+import threading
 from src.advanced.oco import place_oco
 from src.advanced.stop_limit import place_stop_limit
 from src.advanced.grid_trading import start_grid
@@ -68,3 +68,58 @@ def test_start_grid_places_levels(monkeypatch):
     assert orders is not None
     assert len(orders) == 5
     assert len(calls) == 5
+
+
+class FakeBatchClient:
+    """Batch endpoint; with ``gate`` set, calls hold until that many are in flight at once."""
+
+    def __init__(self, reject_price=None, gate=0):
+        self.reject_price = reject_price
+        self.gate = gate
+        self.batches = []
+        self.next_id = 0
+        self.active = self.peak = 0
+        self.cond = threading.Condition()
+
+    def futures_place_batch_order(self, batchOrders):
+        with self.cond:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.cond.notify_all()
+            # a serial caller never reaches the gate and gives up after the timeout
+            self.cond.wait_for(lambda: self.peak >= self.gate, timeout=2)
+            self.active -= 1
+            self.batches.append(batchOrders)
+        out = []
+        for o in batchOrders:
+            if o['price'] == self.reject_price:
+                out.append({'code': -4014, 'msg': 'Price not increased by tick size.'})
+            else:
+                self.next_id += 1
+                out.append({'orderId': self.next_id, 'price': o['price']})
+        return out
+
+
+def test_start_grid_batches_levels_concurrently(monkeypatch):
+    import src.advanced.grid_trading as grid_mod
+    fake = FakeBatchClient(gate=4)
+    monkeypatch.setattr(grid_mod, 'get_client', lambda: fake, raising=False)
+
+    orders = start_grid('BTCUSDT', 25000, 26000, 40, 0.001, max_workers=4)
+
+    assert len(orders) == 40 and all('orderId' in o for o in orders)
+    assert len(fake.batches) == 8 and all(len(b) <= 5 for b in fake.batches)
+    # four batches in flight at once, never more; timing is in benchmarks/bench_grid_setup.py
+    assert fake.peak == 4
+    prices = [float(o['price']) for o in orders]
+    assert prices == sorted(prices)
+
+
+def test_start_grid_reports_failed_levels(monkeypatch):
+    import src.advanced.grid_trading as grid_mod
+    fake = FakeBatchClient(reject_price='25500.00000')
+    monkeypatch.setattr(grid_mod, 'get_client', lambda: fake, raising=False)
+
+    orders = start_grid('BTCUSDT', 25000, 26000, 5, 0.001)
+    assert [('orderId' in o) for o in orders] == [True, True, False, True, True]
+    assert orders[2]['code'] == -4014
@@ -0,0 +1,145 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.advanced.backtester as bt
+
+
+def make_ticks(prices):
+    return pd.DataFrame({
+        'Timestamp IST': pd.date_range('2024-01-01', periods=len(prices), freq='min'),
+        'Execution Price': [float(p) for p in prices],
+    })
+
+
+def reference_grid_fills(df, grid_prices):
+    fills = []
+    for price in grid_prices:
+        hit = df.index[df['Execution Price'] <= price]
+        if len(hit) == 0:
+            continue
+        i = hit[0]
+        buy = df.at[i, 'Execution Price']
+        later = df.index[(df.index > i) & (df['Execution Price'] > buy)]
+        sell = df.at[later[0], 'Execution Price'] if len(later) else df['Execution Price'].iloc[-1]
+        fills.append((price, i, sell))
+    return fills
+
+
+@pytest.fixture
+def ticks(monkeypatch):
+    rng = np.random.default_rng(7)
+    df = make_ticks(np.round(100 + np.cumsum(rng.normal(0, 0.5, 3000)), 2))
+    monkeypatch.setattr(bt, 'load_data', lambda *a, **k: df.copy())
+    return df
+
+
+def test_grid_fills_matches_reference(ticks):
+    prices = ticks['Execution Price'].to_numpy()
+    grid = list(np.linspace(prices.min() - 1, prices.max() + 1, 40))
+    buy_idx, sell_market = bt.grid_fills(prices, grid)
+    got = [(p, i, s) for p, i, s in zip(grid, buy_idx, sell_market) if i < len(prices)]
+    assert got == reference_grid_fills(ticks, grid)
+
+
+def test_grid_fills_no_rebound_sells_at_last_price():
+    prices = np.array([10.0, 9.0, 8.0, 7.0])
+    buy_idx, sell_market = bt.grid_fills(prices, [8.5, 5.0])
+    assert list(buy_idx) == [2, 4]
+    assert sell_market[0] == 7.0
+
+
+def test_simulate_grid_pnl(ticks, tmp_path):
+    res, img = bt.simulate_grid(95, 105, 11, 0.5, out_dir=tmp_path)
+    assert img is None
+    fills = res['fills']
+    assert list(fills.columns) == ['level_price', 'buy_ts', 'buy_price', 'sell_price', 'pnl']
+    buy = fills['buy_price'] * 0.5
+    sell = fills['sell_price'] * 0.5
+    expected = (fills['sell_price'] - fills['buy_price']) * 0.5 - (buy * 0.0004 + sell * 0.0004)
+    assert np.allclose(fills['pnl'], expected)
+    assert res['total_pnl'] == fills['pnl'].sum()
+
+
+def test_render_is_deferred(ticks, tmp_path):
+    import subprocess
+    import sys
+    from pathlib import Path
+    code = 'import sys, src.advanced.backtester; print("matplotlib" in sys.modules)'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=Path(__file__).parents[1])
+    assert out.stdout.strip() == 'False'
+
+    res, img = bt.simulate_twap(1.0, 5, out_dir=tmp_path, render=True)
+    assert img == tmp_path / 'twap_pnl.png' and img.exists()
+
+
+def test_render_batch(ticks, tmp_path):
+    grid, _ = bt.simulate_grid(95, 105, 5, 0.5)
+    twap, _ = bt.simulate_twap(1.0, 3)
+    jobs = [('grid', grid, tmp_path, 'g.png'), ('twap', twap, tmp_path, 't.png')]
+    imgs = bt.render_batch(jobs, workers=2)
+    assert imgs == [tmp_path / 'g.png', tmp_path / 't.png']
+    assert all(p.exists() for p in imgs)
+
+
+def test_simulate_grid_no_fills(monkeypatch, tmp_path):
+    monkeypatch.setattr(bt, 'load_data', lambda *a, **k: make_ticks([100, 101, 102]))
+    res, _ = bt.simulate_grid(10, 20, 3, 1, out_dir=tmp_path)
+    assert res['fills'].empty
+    assert res['total_pnl'] == 0.0
+
+
+def reference_twap(df, total_qty, intervals, side, slippage_pct, fee_pct):
+    chunk = total_qty / intervals
+    notional = fees = 0.0
+    rows = []
+    for _, row in df.head(intervals).iterrows():
+        price = bt.apply_slippage(float(row['Execution Price']), side, slippage_pct)
+        fee = price * chunk * (fee_pct / 100.0)
+        notional += price * chunk
+        fees += fee
+        rows.append((price, fee))
+    return notional / total_qty, fees, rows
+
+
+@pytest.mark.parametrize('side', ['BUY', 'SELL'])
+@pytest.mark.parametrize('total_qty, intervals', [(0.3, 25), (1, 49)])
+def test_run_twap_rows_mode_matches_loop(ticks, side, total_qty, intervals):
+    res = bt.run_twap(ticks, total_qty, intervals, side=side)
+    avg, fees, rows = reference_twap(ticks, total_qty, intervals, side, 0.02, 0.04)
+    assert res['avg_price'] == avg
+    assert list(zip(res['executions']['exec_price'], res['executions']['fee'])) == rows
+    last = ticks['Execution Price'].iloc[-1]
+    expected = (last - avg) * total_qty - fees if side == 'BUY' else (avg - last) * total_qty - fees
+    assert res['pnl'] == expected
+    # 1 / 49 * 49 is not 1.0: a full fill must not report float dust as unfilled
+    assert res['filled_qty'] == total_qty and res['unfilled_qty'] == 0.0
+
+
+def test_twap_time_buckets_span_history():
+    ts = pd.Series(pd.to_datetime(['2024-01-01 00:00', '2024-01-01 00:01', '2024-01-01 00:30',
+                                   '2024-01-01 00:59', '2024-01-01 01:00']))
+    assert list(bt.twap_slice_index(ts, 4, bucket='time')) == [0, 2, 2, 3]
+    assert list(bt.twap_slice_index(ts, 4, bucket='time', every='20min')) == [0, 2, 3, 4]
+    assert list(bt.twap_slice_index(ts, 4, bucket='time', every='30min')) == [0, 2, 4]
+    assert list(bt.twap_slice_index(ts, 10, bucket='rows')) == [0, 1, 2, 3, 4]
+
+
+def test_run_twap_time_mode(ticks):
+    res = bt.run_twap(ticks, 1.0, 10, bucket='time')
+    ex = res['executions']
+    assert len(ex) == 10
+    assert ex['ts'].iloc[0] == ticks['Timestamp IST'].iloc[0]
+    gaps = ex['ts'].diff().dropna().unique()
+    assert len(gaps) == 1 and gaps[0] == pd.Timedelta(minutes=300)
+
+
+def test_run_twap_dropped_slices_are_reported_not_averaged():
+    flat = pd.DataFrame({'Timestamp IST': pd.date_range('2024-01-01', periods=5, freq='10min'),
+                         'Execution Price': np.full(5, 100.0)})
+    res = bt.run_twap(flat, 1.0, 10, bucket='time', every='20min', slippage_pct=0.0, fee_pct=0.0)
+    assert len(res['executions']) == 3
+    assert res['avg_price'] == pytest.approx(100.0)
+    assert res['pnl'] == pytest.approx(0.0)
+    assert res['filled_qty'] == pytest.approx(0.3) and res['unfilled_qty'] == pytest.approx(0.7)
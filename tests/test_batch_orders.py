@@ -0,0 +1,125 @@
+import itertools
+import json
+import threading
+import time
+
+from src.batch_orders import build_order, read_orders, submit_file
+from src.rate_limit import OrderRateLimiter, RateLimitedClient, WeightLimiter
+
+FILTERS = [
+    {'filterType': 'LOT_SIZE', 'minQty': '0.001', 'maxQty': '1000', 'stepSize': '0.001'},
+    {'filterType': 'PRICE_FILTER', 'minPrice': '0.1', 'maxPrice': '1000000', 'tickSize': '0.1'},
+]
+
+
+class LatencyExchange:
+    """Batch endpoint that sleeps ``rtt`` per request and rejects prices ending in .5."""
+
+    def __init__(self, rtt=0.0):
+        self.rtt = rtt
+        self.ids = itertools.count(1)
+        self.batches = []
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def futures_exchange_info(self):
+        return {'symbols': [{'symbol': s, 'filters': FILTERS} for s in ('BTCUSDT', 'ETHUSDT')]}
+
+    def futures_place_batch_order(self, batchOrders):
+        with self.lock:
+            self.batches.append(batchOrders)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.rtt)
+        with self.lock:
+            self.active -= 1
+        return [{'code': -2010, 'msg': 'rejected'} if o.get('price', '').endswith('.5')
+                else dict(o, orderId=next(self.ids), status='NEW') for o in batchOrders]
+
+
+def limited(exchange):
+    # private limiters so other tests' orders do not pace this one
+    return RateLimitedClient(exchange, WeightLimiter(), OrderRateLimiter())
+
+
+def results(path):
+    with open(path) as fh:
+        return [json.loads(line) for line in fh]
+
+
+def test_build_order_snaps_and_defaults():
+    client = LatencyExchange()
+    order = build_order(client, {'symbol': 'btcusdt', 'side': 'buy', 'quantity': '0.0019', 'price': '30000.04'})
+    assert order == {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'LIMIT', 'quantity': '0.001',
+                     'price': '30000.0', 'timeInForce': 'GTC'}
+    assert build_order(client, {'symbol': 'ETHUSDT', 'side': 'SELL', 'quantity': 2})['type'] == 'MARKET'
+
+
+def test_csv_results_follow_input_lines(tmp_path):
+    src = tmp_path / 'orders.csv'
+    src.write_text('symbol,side,type,quantity,price\n'
+                   'BTCUSDT,BUY,LIMIT,0.01,30000\n'
+                   'DOGEUSDT,BUY,LIMIT,1,0.1\n'         # unknown symbol: never sent
+                   'ETHUSDT,SELL,,0.5,\n'
+                   'BTCUSDT,SELL,LIMIT,0.0001,31000\n'  # below minQty
+                   'BTCUSDT,SELL,LIMIT,0.01,31000.5\n'  # exchange rejects
+                   'ETHUSDT,HOLD,MARKET,1,\n')
+    exchange = LatencyExchange()
+    stats = submit_file(str(src), workers=2, client=limited(exchange))
+    out = results(str(src) + '.results.jsonl')
+    assert [r['line'] for r in out] == [2, 3, 4, 5, 6, 7]
+    assert [r['ok'] for r in out] == [True, False, True, False, False, False]
+    assert 'Unknown symbol' in out[1]['error'] and 'side' in out[5]['error']
+    assert out[4]['error'] == 'rejected' and out[4]['code'] == -2010
+    assert (stats['lines'], stats['placed'], stats['rejected'], stats['failed']) == (6, 2, 3, 1)
+    assert stats['requests'] == 1 and len(exchange.batches[0]) == 3
+
+
+def test_jsonl_dispatch_is_concurrent_and_bounded(tmp_path):
+    src = tmp_path / 'orders.jsonl'
+    with open(src, 'w') as fh:
+        for i in range(60):
+            fh.write(json.dumps({'symbol': 'BTCUSDT', 'side': 'BUY', 'quantity': '0.01', 'price': 20000 + i}) + '\n')
+        fh.write('{not json\n')
+    exchange = LatencyExchange(rtt=0.05)
+    stats = submit_file(str(src), out=str(tmp_path / 'res.jsonl'), workers=4, client=limited(exchange))
+    assert stats['placed'] == 60 and stats['rejected'] == 1
+    assert stats['requests'] == 12 and all(len(b) == 5 for b in exchange.batches)
+    assert exchange.peak == 4
+    # 12 requests at 50 ms each take 0.6 s back to back, 0.15 s on four workers
+    assert stats['seconds'] < 0.45 and stats['orders_per_sec'] > 100
+    out = results(str(tmp_path / 'res.jsonl'))
+    assert [r['line'] for r in out] == list(range(1, 62))
+    assert len({r['orderId'] for r in out[:60]}) == 60
+
+
+def test_dry_run_sends_nothing(tmp_path):
+    src = tmp_path / 'orders.csv'
+    src.write_text('symbol,side,quantity,price\nBTCUSDT,BUY,0.0123,30000.07\n')
+    exchange = LatencyExchange()
+    stats = submit_file(str(src), dry_run=True, client=exchange)
+    assert exchange.batches == [] and stats['requests'] == 0
+    assert results(str(src) + '.results.jsonl')[0]['order']['price'] == '30000.1'
+    assert list(read_orders(str(src)))[0][0] == 2
+
+
+def test_lost_batch_reply_marks_lines_unknown_not_failed(tmp_path):
+    class LostReply(LatencyExchange):
+        def futures_place_batch_order(self, batchOrders):
+            super().futures_place_batch_order(batchOrders)
+            raise ConnectionError('connection reset by peer')
+
+    src = tmp_path / 'orders.csv'
+    src.write_text('symbol,side,quantity,price,newClientOrderId\n'
+                   'BTCUSDT,BUY,0.01,30000,mine-1\n'
+                   'BTCUSDT,BUY,0.01,30001,\n'
+                   'BTCUSDT,BUY,inf,30002,\n')           # not finite: rejected, run goes on
+    exchange = LostReply()
+    stats = submit_file(str(src), client=limited(exchange))
+    out = results(str(src) + '.results.jsonl')
+    sent = [o['newClientOrderId'] for o in exchange.batches[0]]
+    assert [r.get('unknown') for r in out[:2]] == [True, True]
+    assert [r['clientOrderId'] for r in out[:2]] == sent and sent[0] == 'mine-1'
+    assert 'connection reset' in out[0]['error'] and len(sent[1]) <= 36
+    assert not out[2]['ok'] and 'finite' in out[2]['error']
+    assert (stats['placed'], stats['failed'], stats['unknown'], stats['rejected']) == (0, 0, 2, 1)
@@ -0,0 +1,99 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+import src.config as config
+from src.rate_limit import RateLimitedClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        body = json.dumps({'orderId': 1}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.connections = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_client_cls(stub_server, monkeypatch):
+    url = 'http://127.0.0.1:%d' % stub_server.server_address[1]
+    created = []
+
+    class StubClient:
+        def __init__(self, api_key, api_secret, testnet=False, ping=True):
+            created.append(self)
+            self.session = requests.Session()
+            if ping:
+                self.ping()
+
+        def ping(self):
+            return self.session.get(url + '/ping').json()
+
+        def futures_create_order(self, **params):
+            return self.session.post(url + '/order', data=params).json()
+
+    monkeypatch.setattr(config, 'Client', StubClient)
+    config.reset_clients()
+    yield created
+    config.reset_clients()
+
+
+def test_get_client_is_shared_per_key(stub_client_cls):
+    a = config.get_client('key', 'secret', testnet=False)
+    b = config.get_client('key', 'secret', testnet=False)
+    c = config.get_client('other', 'secret', testnet=False)
+    assert a is b and a is not c
+    assert len(stub_client_cls) == 2
+    assert isinstance(a, RateLimitedClient) and a._client._client is stub_client_cls[0]
+
+
+def test_orders_reuse_one_connection(stub_server, stub_client_cls):
+    for _ in range(20):
+        config.get_client('key', 'secret', testnet=False).futures_create_order(symbol='BTCUSDT')
+    assert stub_server.connections == 1
+    stats = config.connection_stats()
+    assert stats == {'new_connections': 1, 'requests': 21}
+
+
+def test_concurrent_get_client_creates_one(stub_client_cls):
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(config.get_client('key', 'secret', testnet=False)))
+               for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(stub_client_cls) == 1
+    assert all(c is seen[0] for c in seen)
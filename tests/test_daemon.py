@@ -0,0 +1,130 @@
+import json
+import os
+import socket
+import threading
+
+import pytest
+
+import src.config as config
+from src import daemon as daemon_mod
+from src import main as cli
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='needs Unix domain sockets')
+
+
+class FakeClient:
+    def __init__(self):
+        self.orders = []
+        self.lock = threading.Lock()
+
+    def futures_create_order(self, **params):
+        with self.lock:
+            self.orders.append(params)
+            return dict(params, orderId=len(self.orders), status='NEW')
+
+    def futures_account_balance(self):
+        return [{'asset': 'USDT', 'balance': '123.4'}]
+
+
+@pytest.fixture
+def served(tmp_path):
+    client = FakeClient()
+    path = str(tmp_path / 'bot.sock')
+    with config.use_client(client):
+        d = daemon_mod.BotDaemon(path)
+        d.bind()
+        d.warm()
+        thread = threading.Thread(target=d.serve_forever, daemon=True)
+        thread.start()
+        yield d, client
+        d.shutdown()
+        thread.join(5)
+
+
+def test_forward_runs_on_the_warm_client(served):
+    d, client = served
+    reply = daemon_mod.forward(['market', 'btcusdt', 'BUY', '0.01'], d.path)
+    assert reply['ok'] and reply['result']['orderId'] == 1
+    assert client.orders == [{'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'MARKET', 'quantity': '0.01'}]
+    assert d.stats['requests'] == 1
+
+
+def test_one_connection_carries_many_requests_and_captures_prints(served):
+    d, client = served
+    with daemon_mod.Connection(d.path) as conn:
+        replies = [conn.call({'argv': ['limit', 'BTCUSDT', 'SELL', '0.01', str(30000 + i)]}) for i in range(5)]
+        check = conn.call({'argv': ['check']})
+        bad = conn.call({'argv': ['market', 'BTCUSDT']})
+    assert [r['result']['orderId'] for r in replies] == [1, 2, 3, 4, 5]
+    assert check['ok'] and 'Wallet Balance: 123.4 USDT' in check['output']
+    assert not bad['ok'] and 'usage:' in bad['output']
+    assert d.status()['errors'] == 1
+
+
+def test_forward_falls_back_when_no_daemon(tmp_path):
+    assert daemon_mod.forward(['check'], str(tmp_path / 'missing.sock')) is None
+    # a socket file left behind by a crashed daemon
+    stale = str(tmp_path / 'stale.sock')
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    s.bind(stale)
+    s.close()
+    assert os.path.exists(stale)
+    assert daemon_mod.forward(['check'], stale) is None
+    assert not daemon_mod.running(stale)
+
+
+def test_cli_forwards_to_running_daemon(served, monkeypatch, capsys):
+    d, client = served
+    config.settings.load()
+    monkeypatch.setattr(config.settings, 'socket_path', d.path)
+    result = cli.main(['stoplimit', 'ETHUSDT', 'BUY', '1', '2000', '2001'])
+    assert result['orderId'] == 1 and client.orders[0]['type'] == 'STOP'
+    assert json.loads(capsys.readouterr().out)['orderId'] == 1
+
+
+def test_shutdown_request_stops_the_daemon(served):
+    d, _ = served
+    with daemon_mod.Connection(d.path) as conn:
+        assert conn.call({'op': 'shutdown'})['ok']
+    for _ in range(100):
+        if not os.path.exists(d.path):
+            break
+        threading.Event().wait(0.05)
+    assert not os.path.exists(d.path)
+    assert daemon_mod.forward(['check'], d.path) is None
+
+
+def test_batch_paths_resolve_against_the_callers_directory(served, tmp_path, monkeypatch):
+    d, client = served
+    (tmp_path / 'orders.csv').write_text('symbol,side,quantity\nBTCUSDT,BUY,0.01\n')
+    monkeypatch.chdir(tmp_path)
+    reply = daemon_mod.forward(['batch', 'orders.csv', '--dry-run', '--out', 'res.jsonl'], d.path)
+    assert reply['ok'] and reply['result']['lines'] == 1
+    assert json.loads((tmp_path / 'res.jsonl').read_text())['order']['type'] == 'MARKET'
+
+
+def test_socket_owned_by_another_user_is_never_used(served, monkeypatch):
+    d, client = served
+    me = os.getuid()
+    monkeypatch.setattr(os, 'getuid', lambda: me + 1)
+    # an impostor's socket: nothing is sent, the CLI runs the command itself
+    assert daemon_mod.forward(['market', 'BTCUSDT', 'BUY', '0.01'], d.path) is None
+    assert not daemon_mod.running(d.path)
+    assert client.orders == [] and d.stats['requests'] == 0
+    with pytest.raises(RuntimeError, match='another user'):
+        daemon_mod.BotDaemon(d.path).bind()
+
+
+def test_default_socket_lives_in_a_private_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.setattr(config.tempfile, 'gettempdir', lambda: str(tmp_path))
+    path = config.default_socket_path()
+    assert os.path.dirname(path) == str(tmp_path / ('binance-bot-%d' % os.getuid()))
+    d = daemon_mod.BotDaemon(path).bind()
+    try:
+        assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+        assert daemon_mod.owned_by_me(path)
+    finally:
+        d.shutdown()
+    monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+    assert config.default_socket_path() == str(tmp_path / 'binance-bot.sock')
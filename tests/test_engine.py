@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.advanced import backtester as bt
+from src.advanced.engine import (BacktestEngine, GridStrategy, OCOStrategy, TwapStrategy,
+                                 iter_frame, iter_ticks)
+
+
+@pytest.fixture
+def ticks():
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        'Timestamp IST': pd.date_range('2024-01-01', periods=5000, freq='s'),
+        'Execution Price': np.round(100 + np.cumsum(rng.normal(0, 0.3, 5000)), 2),
+    })
+
+
+@pytest.mark.parametrize('chunk_rows', [7, 333, 10_000])
+def test_streamed_grid_matches_simulate_grid(ticks, chunk_rows):
+    engine = BacktestEngine([GridStrategy(90, 110, 21, 0.5)])
+    results, stats = engine.run(iter_frame(ticks, chunk_rows))
+    expected = bt.run_grid(ticks, 90, 110, 21, 0.5)
+    pd.testing.assert_frame_equal(results['grid']['fills'].drop(columns='buy_ts'),
+                                  expected['fills'].drop(columns='buy_ts'))
+    assert results['grid']['total_pnl'] == pytest.approx(expected['total_pnl'])
+    # every level closed at the end, so ledger PnL equals the per-level sum
+    assert results['grid']['position'] == pytest.approx(0.0)
+    assert results['grid']['pnl'] == pytest.approx(expected['total_pnl'])
+    assert stats['ticks'] == len(ticks)
+
+
+def test_twap_and_oco_share_one_pass(ticks):
+    engine = BacktestEngine([
+        TwapStrategy(1.0, 40, side='SELL'),
+        TwapStrategy(1.0, 10, every='5min'),
+        OCOStrategy('BUY', 1.0, tp_price=ticks['Execution Price'].iloc[0] + 3, sl_price=80),
+    ])
+    results, stats = engine.run(iter_frame(ticks, 100))
+    assert stats['chunks'] == 50
+
+    rows = bt.run_twap(ticks, 1.0, 40, side='SELL')
+    assert results['twap']['pnl'] == pytest.approx(rows['pnl'])
+    timed = bt.run_twap(ticks, 1.0, 10, bucket='time', every='5min')
+    assert results['twap_1']['pnl'] == pytest.approx(timed['pnl'])
+    assert results['oco']['filled'] == 'tp'
+    assert results['oco']['position'] == 0
+
+
+def test_iter_ticks_streams_from_cache_and_csv(ticks, tmp_path):
+    path = tmp_path / 'ticks.csv'
+    ticks.to_csv(path, index=False)
+    for use_cache in (True, False):
+        chunks = list(iter_ticks(path, chunk_rows=1000, use_cache=use_cache))
+        assert [len(p) for _, p in chunks] == [1000] * 5
+        assert np.array_equal(np.concatenate([p for _, p in chunks]), ticks['Execution Price'].to_numpy())
+
+
+def test_rejects_out_of_order_chunks(ticks):
+    chunks = list(iter_frame(ticks, 1000))
+    with pytest.raises(ValueError):
+        BacktestEngine([TwapStrategy(1, 5)]).run(reversed(chunks))
+
+
+def test_rejects_out_of_order_ticks_inside_a_chunk():
+    shuffled = pd.DataFrame({
+        'Timestamp IST': pd.to_datetime(['2024-01-01 00:03', '2024-01-01 00:00',
+                                         '2024-01-01 00:02', '2024-01-01 00:01']),
+        'Execution Price': [100.0, 101.0, 102.0, 103.0],
+    })
+    with pytest.raises(ValueError):
+        BacktestEngine([TwapStrategy(1, 2, every='1min')]).run(iter_frame(shuffled, 10))
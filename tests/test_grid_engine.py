@@ -0,0 +1,145 @@
+import numpy as np
+
+from src.advanced.grid_engine import BUY, EMPTY, SELL, GridEngine
+from src.advanced.sim_exchange import SimExchange
+
+
+def sim(prices):
+    ex = SimExchange(maker_fee_pct=0.0, taker_fee_pct=0.0)
+    ex.load_tape(np.asarray(prices, dtype=float))
+    return ex
+
+
+def test_fills_rearm_one_level_away_on_the_simulator():
+    # levels 90, 92, ..., 110; the tape dips through 98 and 96, recovers, dips again
+    ex = sim([99.0, 97.5, 95.5, 99.0, 100.5, 97.5])
+    engine = GridEngine(ex, poll_interval=0)
+    book = engine.add_grid('BTCUSDT', 90, 110, 11, 0.01, mid=99)
+    engine.flush()
+    assert list(np.flatnonzero(book.side == BUY)) == [0, 1, 2, 3, 4]
+    assert engine.stats['placed'] == 5
+
+    ex.advance(2)                      # BUYs at 98 and 96 fill in one poll
+    assert engine.run_once() == 2
+    assert list(book.side) == [BUY, BUY, BUY, EMPTY, SELL, SELL, 0, 0, 0, 0, 0]
+    assert engine.summary()['BTCUSDT'] == {'levels': 11, 'buys': 3, 'sells': 2, 'unarmed': 0}
+
+    ex.advance(1)                      # 99: SELL 98 fills, BUY 96 re-armed
+    assert engine.run_once() == 1
+    ex.advance(1)                      # 100.5: SELL 100 fills, BUY 98 re-armed
+    assert engine.run_once() == 1
+    assert list(np.flatnonzero(book.side == BUY)) == [0, 1, 2, 3, 4]
+    assert not (book.side == SELL).any()
+
+    ex.advance(1)                      # 97.5: BUY 98 fills again
+    engine.run_once()
+    assert engine.stats['fills'] == 5
+    # only the opposite orders were added after the initial five
+    assert engine.stats['placed'] == 5 + 5
+    assert ex.summary()['BTCUSDT']['realized_pnl'] > 0
+
+
+def test_restart_adopts_resting_orders():
+    ex = sim([99.0, 97.5])
+    first = GridEngine(ex, poll_interval=0)
+    first.add_grid('BTCUSDT', 90, 110, 11, 0.01, mid=99)
+    first.flush()
+    ex.advance(1)
+    first.run_once()                   # BUY 98 filled, SELL 100 resting
+
+    second = GridEngine(ex, poll_interval=0)
+    book = second.add_grid('BTCUSDT', 90, 110, 11, 0.01, mid=99)
+    assert second.stats['adopted'] == 5
+    # the resting SELL at 100 keeps the filled 98 slot empty
+    assert second.flush() == 0
+    assert book.side[5] == SELL and book.side[4] == EMPTY
+
+
+class EventClient:
+    """Acks every order and lets the test drive fills through stream events."""
+
+    def __init__(self):
+        self.orders = {}
+        self.batches = 0
+
+    def futures_place_batch_order(self, batchOrders):
+        self.batches += 1
+        out = []
+        for params in batchOrders:
+            oid = len(self.orders) + 1
+            self.orders[oid] = dict(params, orderId=oid, status='NEW', clientOrderId=params['newClientOrderId'])
+            out.append(self.orders[oid])
+        return out
+
+    def futures_get_open_orders(self, symbol):
+        return [o for o in self.orders.values() if o['symbol'] == symbol and o['status'] == 'NEW']
+
+    def futures_get_order(self, symbol, orderId):
+        return self.orders[orderId]
+
+
+def event(order_id, status):
+    return {'e': 'ORDER_TRADE_UPDATE', 'o': {'i': order_id, 'X': status}}
+
+
+def test_stream_events_drive_many_symbols():
+    client = EventClient()
+    engine = GridEngine(client, poll_interval=0)
+    books = {s: engine.add_grid(s, 100, 199, 100, 1, mid=150) for s in ('AUSDT', 'BUSDT', 'CUSDT')}
+    engine.flush()
+    assert engine.stats['placed'] == 150 and client.batches == 30
+
+    top_buy = {s: int(b.order_id[49]) for s, b in books.items()}
+    for s, oid in top_buy.items():
+        client.orders[oid]['status'] = 'FILLED'
+        engine.on_event(event(oid, 'FILLED'))
+    expired = int(books['AUSDT'].order_id[10])
+    client.orders[expired]['status'] = 'EXPIRED'
+    engine.on_event(event(expired, 'EXPIRED'))
+    engine.on_event(event(999999, 'FILLED'))     # not ours
+    assert engine.flush() == 4
+    for s, b in books.items():
+        assert b.side[50] == SELL and b.side[49] == EMPTY and b.order_id[50]
+    assert books['AUSDT'].order_id[10] and books['AUSDT'].side[10] == BUY
+    # nothing drifted, so a reconcile finds no work
+    assert engine.reconcile() == 0 and engine.flush() == 0
+
+
+def test_manual_cancels_disarm_engine_cancels_rearm():
+    client = EventClient()
+    engine = GridEngine(client, poll_interval=0)
+    book = engine.add_grid('AUSDT', 100, 109, 10, 1, mid=105)
+    engine.flush()
+
+    manual = int(book.order_id[2])             # cancelled by hand on the exchange
+    client.orders[manual]['status'] = 'CANCELED'
+    client.futures_cancel_order = lambda symbol, orderId: client.orders[orderId].update(status='CANCELED')
+    own = int(book.order_id[3])
+    engine.cancel('AUSDT', own)                # cancelled by the engine, seen on reconcile
+    assert engine.reconcile() == 0
+    assert engine.flush() == 1
+    assert book.side[2] == EMPTY and not book.order_id[2]
+    assert book.side[3] == BUY and book.order_id[3] and book.order_id[3] != own
+    assert engine.stats['disarmed'] == 1
+    # a disarmed level stays down on later reconciles
+    assert engine.reconcile() == 0 and engine.flush() == 0 and book.side[2] == EMPTY
+
+
+def test_reconcile_adopts_orders_from_a_batch_whose_reply_was_lost():
+    class LostReplyClient(EventClient):
+        def futures_place_batch_order(self, batchOrders):
+            super().futures_place_batch_order(batchOrders)
+            raise TimeoutError('read timed out')
+
+    client = LostReplyClient()
+    engine = GridEngine(client, poll_interval=0)
+    book = engine.add_grid('AUSDT', 100, 109, 10, 1, mid=105)
+    assert engine.flush() == 0 and len(client.orders) == 5
+    assert not book.order_id.any()
+    assert engine.stats['unknown'] == 5 and engine.stats['rejected'] == 0
+
+    client.futures_place_batch_order = EventClient.futures_place_batch_order.__get__(client)
+    assert engine.reconcile() == 0
+    assert engine.stats['adopted'] == 5
+    assert engine.flush() == 0 and len(client.orders) == 5   # nothing placed twice
+    assert sorted(book.order_id[:5]) == sorted(client.orders)
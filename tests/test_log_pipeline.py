@@ -0,0 +1,49 @@
+import json
+import logging
+
+from src.log_pipeline import LogPipeline
+
+
+def _pipeline(tmp_path, **kw):
+    pipe = LogPipeline(str(tmp_path / 'bot.log'), console=False, **kw)
+    log = logging.getLogger('test.pipeline.%s' % tmp_path.name)
+    log.propagate = False
+    pipe.install(log)
+    return pipe, log
+
+
+def test_records_are_json_lines_formatted_off_thread(tmp_path):
+    pipe, log = _pipeline(tmp_path)
+
+    class Loud:
+        calls = 0
+
+        def __str__(self):
+            Loud.calls += 1
+            return 'loud'
+
+    log.debug('skipped %s', Loud())
+    log.info('order %s filled at %s', Loud(), 101.5)
+    try:
+        raise RuntimeError('boom')
+    except RuntimeError:
+        log.exception('failed %d', 3)
+    pipe.stop()
+
+    lines = [json.loads(l) for l in (tmp_path / 'bot.log').read_text().splitlines()]
+    assert [l['message'] for l in lines] == ['order loud filled at 101.5', 'failed 3']
+    assert lines[1]['level'] == 'ERROR' and 'RuntimeError: boom' in lines[1]['exception']
+    assert Loud.calls == 1
+
+
+def test_sink_rotates_by_size(tmp_path):
+    pipe, log = _pipeline(tmp_path, max_bytes=2000, backup_count=2, flush_every=4)
+    for i in range(200):
+        log.info('tick %05d', i)
+    pipe.stop()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ['bot.log', 'bot.log.1', 'bot.log.2']
+    assert all(p.stat().st_size < 2000 for p in tmp_path.iterdir())
+    last = json.loads((tmp_path / 'bot.log').read_text().splitlines()[-1])
+    assert last['message'] == 'tick 00199'
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import urllib.request
+
+import pytest
+
+from src.main import print_stats
+from src.metrics import (InstrumentedClient, LatencyHistogram, Metrics, bucket_index, bucket_value,
+                         serve_prometheus, write_snapshot)
+
+
+class FakeClient:
+    def __init__(self):
+        self.response = 'passthrough'
+
+    def futures_create_order(self, **params):
+        return {'orderId': 1}
+
+    def futures_get_open_orders(self, **params):
+        raise RuntimeError('boom')
+
+    async def futures_get_order(self, **params):
+        return {'status': 'NEW'}
+
+
+def test_buckets_are_contiguous_and_tight():
+    prev = -1
+    for us in list(range(0, 5000)) + [10**6, 10**9]:
+        i = bucket_index(us)
+        assert i >= prev
+        prev = i
+        assert abs(bucket_value(i) - us) <= max(1, us * 0.04)
+
+
+def test_histogram_quantiles():
+    h = LatencyHistogram()
+    for us in range(1, 100001):
+        h.record(us)
+    for q in (0.5, 0.99, 0.999):
+        assert h.quantile(q) == pytest.approx(q * 100000, rel=0.04)
+    assert h.max == 100000 and h.count == 100000
+
+
+def test_instrumented_client_counts_calls_errors_and_weight():
+    registry = Metrics()
+    client = InstrumentedClient(FakeClient(), registry)
+    for _ in range(3):
+        client.futures_create_order(symbol='BTCUSDT')
+    with pytest.raises(RuntimeError):
+        client.futures_get_open_orders()
+    assert asyncio.run(client.futures_get_order(symbol='BTCUSDT')) == {'status': 'NEW'}
+    assert client.response == 'passthrough'
+
+    snap = registry.snapshot()
+    assert snap['futures_create_order']['calls'] == 3
+    assert snap['futures_create_order']['errors'] == 0
+    # an unscoped open-orders query costs 40 weight
+    opens = snap['futures_get_open_orders']
+    assert (opens['calls'], opens['errors'], opens['weight']) == (1, 1, 40)
+    assert snap['futures_get_order']['calls'] == 1
+
+    registry.reset()
+    client.futures_create_order(symbol='BTCUSDT')
+    assert registry.snapshot()['futures_create_order']['calls'] == 1
+
+
+def test_prometheus_endpoint_and_json_snapshot(tmp_path, capsys):
+    registry = Metrics()
+    client = InstrumentedClient(FakeClient(), registry)
+    client.futures_create_order(symbol='BTCUSDT')
+
+    server = serve_prometheus(0, registry=registry)
+    try:
+        url = 'http://127.0.0.1:%d/metrics' % server.server_address[1]
+        body = urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'binance_request_latency_seconds_count{endpoint="futures_create_order"} 1' in body
+    assert 'binance_request_weight_total{endpoint="futures_create_order"} 1' in body
+
+    path = tmp_path / 'metrics.json'
+    write_snapshot(str(path), registry)
+    assert json.loads(path.read_text())['endpoints']['futures_create_order']['calls'] == 1
+    print_stats(str(path))
+    out = capsys.readouterr().out
+    assert 'p999 ms' in out and 'futures_create_order' in out
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.advanced import backtester, monte_carlo
+
+
+@pytest.fixture
+def ticks():
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        'Timestamp IST': pd.date_range('2024-01-01', periods=1500, freq='min'),
+        'Execution Price': np.round(100 + np.cumsum(rng.normal(0, 0.3, 1500)), 2),
+    })
+
+
+@pytest.mark.parametrize('side', ['BUY', 'SELL'])
+def test_twap_on_the_historical_path_matches_run_twap(ticks, side):
+    prices = ticks['Execution Price'].to_numpy()
+    pnl = monte_carlo.twap_pnl(prices[None, :], 2.0, 7, side=side, slippage_pct=0.05, fee_pct=0.04)
+    expected = backtester.run_twap(ticks, 2.0, 7, side=side, slippage_pct=0.05, fee_pct=0.04, bucket='time')['pnl']
+    assert pnl[0] == pytest.approx(expected)
+
+
+def test_grid_on_the_historical_path_matches_run_grid(ticks):
+    prices = ticks['Execution Price'].to_numpy()
+    params = dict(lower_price=prices.min() + 1, upper_price=prices.max() - 1, levels=9, qty_per_order=0.5)
+    pnl = monte_carlo.grid_pnl(np.vstack([prices, prices]), **params)
+    expected = backtester.run_grid(ticks, **params)['total_pnl']
+    assert pnl == pytest.approx([expected, expected])
+
+
+def test_bootstrap_paths_reuse_historical_returns():
+    prices = np.array([100.0, 101.0, 99.0, 102.0, 103.0])
+    paths = monte_carlo.bootstrap_paths(np.random.default_rng(1), prices, 50, length=9, block=2)
+    assert paths.shape == (50, 9)
+    assert np.all(paths[:, 0] == 100.0)
+    steps = np.round(np.diff(np.log(paths), axis=1), 12)
+    assert set(steps.ravel()) <= set(np.round(np.diff(np.log(prices)), 12))
+
+
+@pytest.mark.parametrize('strategy,params', [
+    ('twap', {'total_qty': 1.0, 'intervals': 10, 'side': 'BUY'}),
+    ('grid', {'lower_price': 95.0, 'upper_price': 105.0, 'levels': 5, 'qty_per_order': 0.1}),
+])
+def test_results_depend_on_seed_not_workers(ticks, strategy, params):
+    kw = dict(df=ticks, paths=300, length=500, batch_size=64, slippage_jitter=0.5, fee_jitter=0.2)
+    a = monte_carlo.run_monte_carlo(strategy, params, seed=7, workers=1, **kw)
+    b = monte_carlo.run_monte_carlo(strategy, params, seed=7, workers=2, **kw)
+    c = monte_carlo.run_monte_carlo(strategy, params, seed=8, workers=1, **kw)
+    assert len(a['pnl']) == 300
+    np.testing.assert_array_equal(a['pnl'], b['pnl'])
+    assert not np.array_equal(a['pnl'], c['pnl'])
+    s = a['summary']
+    assert s['paths'] == 300 and s['quantiles'][0.05] <= s['quantiles'][0.5] <= s['quantiles'][0.95]
+    assert s['cvar_5'] <= s['quantiles'][0.05]
+
+
+def test_summarize():
+    s = monte_carlo.summarize(np.arange(-50, 50, dtype=float))
+    assert s['prob_loss'] == 0.5
+    assert s['quantiles'][0.5] == pytest.approx(-0.5)
+    assert s['cvar_5'] == pytest.approx(-48.0)
+
+
+def test_rejects_an_empty_run(ticks):
+    with pytest.raises(ValueError, match='paths'):
+        monte_carlo.run_monte_carlo('twap', {'total_qty': 1.0, 'intervals': 10}, df=ticks, paths=0)
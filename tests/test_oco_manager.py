@@ -0,0 +1,80 @@
+from src.advanced.oco_manager import OCOManager
+
+
+class FakeExchange:
+    def __init__(self):
+        self.orders = {}
+        self.next_id = 0
+        self.calls = {'create': 0, 'open': 0, 'get': 0, 'cancel': 0, 'cancel_many': 0}
+
+    def futures_create_order(self, **kwargs):
+        self.calls['create'] += 1
+        self.next_id += 1
+        self.orders[self.next_id] = {'orderId': self.next_id, 'symbol': kwargs['symbol'], 'status': 'NEW'}
+        return dict(self.orders[self.next_id])
+
+    def futures_get_open_orders(self, symbol):
+        self.calls['open'] += 1
+        return [dict(o) for o in self.orders.values()
+                if o['symbol'] == symbol and o['status'] in ('NEW', 'PARTIALLY_FILLED')]
+
+    def futures_get_order(self, symbol, orderId):
+        self.calls['get'] += 1
+        return dict(self.orders[orderId])
+
+    def futures_cancel_order(self, symbol, orderId):
+        self.calls['cancel'] += 1
+        self.orders[orderId]['status'] = 'CANCELED'
+
+    def futures_cancel_orders(self, symbol, orderidlist):
+        self.calls['cancel_many'] += 1
+        for oid in orderidlist:
+            self.orders[oid]['status'] = 'CANCELED'
+
+
+def test_weight_scales_with_symbols_not_orders():
+    ex = FakeExchange()
+    mgr = OCOManager(ex)
+    futures = [mgr.place(sym, 'BUY', 0.001, 50000, 40000) for sym in ('BTCUSDT', 'ETHUSDT') for _ in range(10)]
+    for _ in range(5):
+        assert mgr.poll_once() == 0
+    assert ex.calls['open'] == 10
+    assert ex.calls['get'] == 0
+    assert not any(f.done() for f in futures)
+
+
+def test_fills_resolve_and_cancel_siblings_in_bulk():
+    ex = FakeExchange()
+    mgr = OCOManager(ex)
+    futures = [mgr.place('BTCUSDT', 'BUY', 0.001, 50000, 40000) for _ in range(4)]
+    # TP of pairs 0 and 1 fill, the SL of pair 2 partially fills
+    ex.orders[1]['status'] = 'FILLED'
+    ex.orders[3]['status'] = 'FILLED'
+    ex.orders[6]['status'] = 'PARTIALLY_FILLED'
+
+    assert mgr.poll_once() == 3
+    assert [f.result()['filled'] for f in futures[:3]] == ['tp', 'tp', 'sl']
+    assert not futures[3].done()
+    assert [ex.orders[i]['status'] for i in (2, 4, 5)] == ['CANCELED'] * 3
+    assert ex.calls['cancel_many'] == 1 and ex.calls['get'] == 2
+    assert len(mgr) == 1
+
+
+def test_poll_interval_backs_off_with_low_headroom():
+    class Response:
+        headers = {'X-MBX-USED-WEIGHT-1M': '2200'}
+
+    ex = FakeExchange()
+    mgr = OCOManager(ex, poll_interval=1.0, max_interval=10.0)
+    assert mgr.next_interval() == 1.0
+    ex.response = Response()
+    assert 8.0 < mgr.next_interval() <= 10.0
+
+
+def test_run_until_all_resolved():
+    ex = FakeExchange()
+    mgr = OCOManager(ex, sleep=lambda s: ex.orders[2].update(status='FILLED'))
+    future = mgr.place('BTCUSDT', 'SELL', 0.001, 40000, 50000)
+    mgr.run(timeout=5)
+    assert future.result()['filled'] == 'sl'
+    assert ex.orders[1]['status'] == 'CANCELED'
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+from src.advanced.oco_stream import OCOStream, place_oco_stream
+from src.user_stream import UserDataStream
+
+
+class FakeClient:
+    def __init__(self):
+        self.next_id = 100
+        self.status = {}
+        self.cancelled = []
+        self.get_calls = 0
+
+    def futures_create_order(self, **kwargs):
+        self.next_id += 1
+        self.status[self.next_id] = 'NEW'
+        return {'orderId': self.next_id}
+
+    def futures_get_order(self, symbol, orderId):
+        self.get_calls += 1
+        return {'orderId': orderId, 'status': self.status[orderId]}
+
+    def futures_cancel_order(self, symbol, orderId):
+        self.cancelled.append(orderId)
+        self.status[orderId] = 'CANCELED'
+        return {'orderId': orderId, 'status': 'CANCELED'}
+
+
+def trade_update(order_id, status='FILLED'):
+    return json.dumps({'e': 'ORDER_TRADE_UPDATE', 'o': {'s': 'BTCUSDT', 'i': order_id, 'X': status}})
+
+
+def test_stream_fill_cancels_sibling(stream_server):
+    async def scenario():
+        client = FakeClient()
+        async with stream_server() as server:
+            oco = OCOStream(client, stream=UserDataStream(client, url=server.url), poll_interval=60)
+            task = asyncio.create_task(place_oco_stream('BTCUSDT', 'BUY', 0.001, 50000, 40000, timeout=5, oco_stream=oco))
+            await oco.start()
+            await asyncio.wait_for(oco.stream.connected.wait(), 2)
+            while not oco.pending:
+                await asyncio.sleep(0.01)
+            await server.events.put(trade_update(101))
+            res = await task
+            await oco.stop()
+        return client, oco, res
+
+    client, oco, res = asyncio.run(scenario())
+    assert res['filled'] == 'tp'
+    assert client.cancelled == [102]
+    assert oco.stats['stream_fills'] == 1
+    # only the one resync on connect hit REST
+    assert client.get_calls <= 2
+
+
+def test_many_pairs_share_one_stream(stream_server):
+    async def scenario():
+        client = FakeClient()
+        async with stream_server() as server:
+            oco = OCOStream(client, stream=UserDataStream(client, url=server.url), poll_interval=60)
+            futures = []
+            for i in range(20):
+                tp, sl = 1000 + 2 * i, 1001 + 2 * i
+                client.status[tp] = client.status[sl] = 'NEW'
+                futures.append(oco.watch('BTCUSDT', tp, sl))
+            await oco.start()
+            await asyncio.wait_for(oco.stream.connected.wait(), 2)
+            for i in range(20):
+                await server.events.put(trade_update(1000 + 2 * i + i % 2, 'FILLED'))
+            results = await asyncio.wait_for(asyncio.gather(*futures), 5)
+            await oco.stop()
+        return client, results
+
+    client, results = asyncio.run(scenario())
+    assert [r['filled'] for r in results] == ['tp', 'sl'] * 10
+    assert sorted(client.cancelled) == sorted(1000 + 2 * i + (1 - i % 2) for i in range(20))
+
+
+def test_falls_back_to_polling_when_stream_is_down():
+    async def scenario():
+        client = FakeClient()
+        stream = UserDataStream(client, url='ws://127.0.0.1:9', reconnect_delay=0.05, max_reconnect_delay=0.05)
+        oco = OCOStream(client, stream=stream, poll_interval=0.02)
+        client.status.update({7: 'NEW', 8: 'NEW'})
+        future = oco.watch('BTCUSDT', 7, 8)
+        await oco.start()
+        client.status[8] = 'FILLED'
+        res = await asyncio.wait_for(future, 2)
+        await oco.stop()
+        return client, oco, res
+
+    client, oco, res = asyncio.run(scenario())
+    assert res['filled'] == 'sl'
+    assert client.cancelled == [7]
+    assert oco.stats['poll_fills'] == 1
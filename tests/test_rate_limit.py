@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.rate_limit import OrderRateLimiter, RateLimitedClient, WeightLimiter, weight_headroom
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, secs):
+        self.slept.append(secs)
+        self.now += secs
+
+
+def test_order_limiter_waits_for_window():
+    clock = FakeClock()
+    limiter = OrderRateLimiter(limits=((10, 1.0),), clock=clock, sleep=clock.sleep)
+    for _ in range(2):
+        limiter.acquire(5)
+    assert clock.slept == []
+    limiter.acquire(5)
+    assert clock.slept == [1.0]
+
+
+def test_order_limiter_applies_every_window():
+    clock = FakeClock()
+    limiter = OrderRateLimiter(limits=((5, 1.0), (6, 10.0)), clock=clock, sleep=clock.sleep)
+    limiter.acquire(5)
+    limiter.acquire(1)
+    assert clock.now == 1.0
+    limiter.acquire(1)
+    assert clock.now == 10.0
+
+
+class Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class ApiError(Exception):
+    def __init__(self, status_code, headers):
+        super().__init__('HTTP %d' % status_code)
+        self.status_code = status_code
+        self.response = Response(headers)
+
+
+class WeightStub:
+    """Fake client whose responses report the server's used weight, like Binance."""
+
+    def __init__(self, used_per_call=1, fail=()):
+        self.used = 0
+        self.used_per_call = used_per_call
+        self.fail = list(fail)
+        self.calls = []
+        self.response = None
+
+    def futures_account_balance(self, **params):
+        return self._reply('balance', params)
+
+    def futures_create_order(self, **params):
+        return self._reply('order', params)
+
+    def _reply(self, name, params):
+        self.calls.append(name)
+        if self.fail:
+            raise self.fail.pop(0)
+        self.used += self.used_per_call
+        self.response = Response({'X-MBX-USED-WEIGHT-1M': str(self.used)})
+        return {'orderId': len(self.calls)}
+
+
+def _limited(stub, capacity=10, period=10.0):
+    clock = FakeClock()
+    weights = WeightLimiter(capacity, period, clock=clock, sleep=clock.sleep)
+    orders = OrderRateLimiter(limits=((100, 1.0),), clock=clock, sleep=clock.sleep)
+    return RateLimitedClient(stub, weights=weights, orders=orders), clock
+
+
+def test_weight_bucket_delays_instead_of_failing():
+    clock = FakeClock()
+    bucket = WeightLimiter(10, 10.0, clock=clock, sleep=clock.sleep)
+    bucket.acquire(6)
+    bucket.acquire(6)
+    assert clock.slept == [2.0]
+    assert bucket.stats['weight'] == 12 and bucket.stats['waits'] == 1
+
+
+def test_client_calls_are_weighted_and_follow_server_headers():
+    stub = WeightStub(used_per_call=4)
+    client, clock = _limited(stub)
+    client.futures_account_balance()          # weight 5; server reports 4 used
+    assert weight_headroom(client) == pytest.approx(0.5)
+    client.futures_create_order(symbol='BTCUSDT')
+    # server says 8 used, so only 2 tokens remain
+    assert client.limiter.tokens == pytest.approx(2.0)
+    client.futures_account_balance()
+    assert clock.slept == [3.0]
+    assert stub.calls == ['balance', 'order', 'balance']
+
+
+def test_throttled_call_backs_off_and_retries():
+    stub = WeightStub(fail=[ApiError(429, {'Retry-After': '7'})])
+    client, clock = _limited(stub, capacity=100)
+    assert client.futures_create_order(symbol='BTCUSDT') == {'orderId': 2}
+    assert clock.slept == [7.0]
+    assert client.limiter.stats['throttled'] == 1
+
+
+def test_non_throttle_errors_propagate():
+    stub = WeightStub(fail=[ApiError(400, {})])
+    client, clock = _limited(stub)
+    with pytest.raises(ApiError):
+        client.futures_create_order(symbol='BTCUSDT')
+    assert len(stub.calls) == 1 and clock.slept == []
+
+
+def test_async_methods_share_the_bucket():
+    class AsyncStub(WeightStub):
+        async def futures_create_order(self, **params):
+            return self._reply('order', params)
+
+    stub = AsyncStub()
+    # 2 tokens refilling at 20/s: four orders need two 50 ms refills
+    client = RateLimitedClient(stub, weights=WeightLimiter(2, 0.1))
+
+    async def burst():
+        return await asyncio.gather(*(client.futures_create_order(symbol='BTCUSDT') for _ in range(4)))
+
+    start = time.monotonic()
+    results = asyncio.run(burst())
+    assert len(results) == 4 and len(stub.calls) == 4
+    assert time.monotonic() - start >= 0.09
+
+
+def test_weight_bucket_is_thread_safe():
+    bucket = WeightLimiter(10000, 60.0)
+    threads = [threading.Thread(target=lambda: [bucket.acquire(3) for _ in range(200)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert bucket.stats['requests'] == 1600
+    assert bucket.tokens == pytest.approx(10000 - 4800, abs=5)
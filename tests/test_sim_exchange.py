@@ -0,0 +1,89 @@
+
+import numpy as np
+import pytest
+
+from src.advanced.sim_exchange import SimExchange, SimExchangeError
+from src.config import use_client
+
+
+def make_exchange(prices, **kwargs):
+    ex = SimExchange(**kwargs)
+    ex.load_tape(prices, symbol='BTCUSDT')
+    return ex
+
+
+def test_limits_fill_in_price_time_priority():
+    ex = make_exchange([100, 101, 97, 95])
+    a = ex.futures_create_order(symbol='BTCUSDT', side='BUY', type='LIMIT', quantity=1, price=98)
+    b = ex.futures_create_order(symbol='BTCUSDT', side='BUY', type='LIMIT', quantity=1, price=99)
+    c = ex.futures_create_order(symbol='BTCUSDT', side='BUY', type='LIMIT', quantity=1, price=98)
+    ex.advance()
+    assert [f['orderId'] for f in ex.fills] == [b['orderId'], a['orderId'], c['orderId']]
+    assert [f['price'] for f in ex.fills] == [99.0, 98.0, 98.0]
+    assert ex.futures_get_open_orders(symbol='BTCUSDT') == []
+
+
+def test_stop_orders_trigger_on_cross():
+    ex = make_exchange([100, 99, 96, 94, 97])
+    sm = ex.futures_create_order(symbol='BTCUSDT', side='SELL', type='STOP_MARKET', quantity=1, stopPrice=97)
+    sl = ex.futures_create_order(symbol='BTCUSDT', side='SELL', type='STOP', quantity=1, stopPrice=95, price=96.5)
+    ex.advance(2)
+    assert ex.futures_get_order('BTCUSDT', sm['orderId'])['avgPrice'] == '96.0'
+    ex.advance(1)
+    # the stop-limit triggered at 94 and now rests as a SELL LIMIT at 96.5
+    assert ex.futures_get_order('BTCUSDT', sl['orderId'])['status'] == 'NEW'
+    ex.advance()
+    assert ex.futures_get_order('BTCUSDT', sl['orderId'])['avgPrice'] == '96.5'
+
+
+def test_cancel_and_errors():
+    ex = make_exchange([100])
+    o = ex.futures_create_order(symbol='BTCUSDT', side='BUY', type='LIMIT', quantity=1, price=90)
+    assert ex.futures_cancel_order(symbol='BTCUSDT', orderId=o['orderId'])['status'] == 'CANCELED'
+    with pytest.raises(SimExchangeError) as err:
+        ex.futures_cancel_order(symbol='BTCUSDT', orderId=o['orderId'])
+    assert err.value.code == -2011
+    with pytest.raises(SimExchangeError):
+        ex.futures_create_order(symbol='BTCUSDT', side='SELL', type='STOP_MARKET', quantity=1, stopPrice=101)
+
+
+def test_place_oco_runs_unchanged_against_simulator():
+    from src.advanced.oco import place_oco
+    ex = make_exchange(np.linspace(100, 120, 500), ticks_per_call=50)
+    ex.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity=1)
+    with use_client(ex):
+        res = place_oco('BTCUSDT', 'BUY', 1, tp_price=110, sl_price=90, poll_interval=0, timeout=10)
+    assert res['filled'] == 'tp'
+    assert [o['status'] for o in ex.orders.values()] == ['FILLED', 'FILLED', 'CANCELED']
+    assert ex.positions['BTCUSDT']['qty'] == 0
+    assert ex.positions['BTCUSDT']['realized_pnl'] == pytest.approx(110 - ex.fills[0]['price'])
+
+
+def test_grid_and_twap_run_unchanged_against_simulator():
+    from src.advanced.grid_trading import start_grid
+    from src.advanced.twap import twap_order
+    ex = make_exchange(np.concatenate([np.linspace(110, 90, 200), np.linspace(90, 110, 200)]))
+    with use_client(ex):
+        orders = start_grid('BTCUSDT', 95, 105, 3, 0.1)
+        ex.advance(200)
+        assert sum(o['status'] == 'FILLED' for o in ex.orders.values()) == 3
+        ex.ticks_per_call = 50
+        twap_order('BTCUSDT', 'SELL', 0.3, 3, 0)
+    assert len(orders) == 3
+    assert ex.positions['BTCUSDT']['qty'] == pytest.approx(0.0)
+    assert len(ex.fills) == 6
+
+
+def test_replays_a_million_ticks():
+    # throughput is measured by benchmarks/bench_sim_exchange.py
+    rng = np.random.default_rng(0)
+    prices = 30000 * np.exp(np.cumsum(rng.normal(0, 1e-4, 1_000_000)))
+    ex = make_exchange(prices)
+    for k in range(1, 11):
+        ex.futures_create_order(symbol='BTCUSDT', side='BUY', type='LIMIT', quantity=1, price=prices[0] * (1 - k / 100))
+        ex.futures_create_order(symbol='BTCUSDT', side='SELL', type='LIMIT', quantity=1, price=prices[0] * (1 + k / 100))
+    assert ex.advance() == len(prices) - 1
+    # every level the path reached filled, and no other
+    lo, hi = prices.min() / prices[0], prices.max() / prices[0]
+    crossed = sum(1 - k / 100 >= lo for k in range(1, 11)) + sum(1 + k / 100 <= hi for k in range(1, 11))
+    assert len(ex.fills) == crossed == sum(o['status'] == 'FILLED' for o in ex.orders.values())
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ('binance', 'pandas', 'numpy', 'dotenv', 'requests', 'websockets', 'matplotlib')
+# src.main was ~0.8 s when it imported binance eagerly; the budget leaves
+# plenty of slack for slow machines while still catching a regression.
+IMPORT_BUDGET_US = 300000
+
+
+def _python(cwd, *args):
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+def _importtime(stderr):
+    """Parse ``-X importtime`` output into {module: cumulative_us}."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_skips_heavy_dependencies(tmp_path):
+    proc = _python(tmp_path, '-X', 'importtime', '-c', 'import src.main')
+    assert proc.returncode == 0, proc.stderr
+    times = _importtime(proc.stderr)
+    assert 'src.main' in times
+    heavy = sorted(m for m in times if m.split('.')[0] in HEAVY)
+    assert heavy == []
+    assert times['src.main'] < IMPORT_BUDGET_US
+
+
+def test_config_import_has_no_side_effects(tmp_path):
+    code = ('import logging, sys\n'
+            'import src.config as config\n'
+            'assert not logging.getLogger().handlers\n'
+            'assert "dotenv" not in sys.modules and "binance" not in sys.modules\n'
+            'config.USE_TESTNET\n'
+            'assert "dotenv" in sys.modules and "binance" not in sys.modules\n')
+    proc = _python(tmp_path, '-c', code)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout == ''
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_help_is_quiet(tmp_path):
+    proc = _python(tmp_path, '-m', 'src.main', '--help')
+    assert proc.returncode == 0
+    assert proc.stdout.startswith('usage:') and 'API Keys' not in proc.stdout
+    assert list(tmp_path.iterdir()) == []
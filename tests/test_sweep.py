@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.advanced import backtester, sweep
+
+
+@pytest.fixture
+def ticks():
+    rng = np.random.default_rng(11)
+    return pd.DataFrame({
+        'Timestamp IST': pd.date_range('2024-01-01', periods=2000, freq='min'),
+        'Execution Price': np.round(100 + np.cumsum(rng.normal(0, 0.4, 2000)), 2),
+    })
+
+
+def test_parse_values_ranges():
+    assert sweep.parse_values(['5:20:5'], int) == [5, 10, 15, 20]
+    assert sweep.parse_values(['0.01:0.03:0.01', '0.5']) == [0.01, 0.02, 0.03, 0.5]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_grid_sweep_matches_single_runs(ticks, workers):
+    tasks = sweep.build_tasks('grid', {
+        'lower_price': [90.0, 95.0], 'upper_price': [105.0], 'levels': [5, 9],
+        'qty_per_order': [0.1], 'slippage_pct': [0.02], 'fee_pct': [0.04],
+    })
+    res = sweep.run_sweep('grid', tasks, df=ticks, workers=workers)
+    assert list(res['rank']) == [1, 2, 3, 4]
+    assert res['pnl'].is_monotonic_decreasing
+    for run, pnl in zip(res['run'], res['pnl']):
+        assert pnl == pytest.approx(backtester.run_grid(ticks, **tasks[run])['total_pnl'])
+
+
+def test_twap_sweep_is_deterministic(ticks):
+    tasks = sweep.build_tasks('twap', {
+        'total_qty': [1.0], 'intervals': [1, 2, 3], 'side': ['BUY', 'SELL'],
+        'slippage_pct': [0.0], 'fee_pct': [0.0],
+    })
+    a = sweep.run_sweep('twap', tasks, df=ticks, workers=2)
+    b = sweep.run_sweep('twap', tasks, df=ticks, workers=1)
+    pd.testing.assert_frame_equal(a, b)
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.advanced import tick_store
+
+
+def write_csv(path, prices):
+    pd.DataFrame({
+        'Timestamp IST': pd.date_range('2024-01-01', periods=len(prices), freq='min'),
+        'Execution Price': prices,
+        'Side': ['BUY'] * len(prices),
+    }).to_csv(path, index=False)
+
+
+def test_load_frame_matches_read_csv(tmp_path):
+    src = tmp_path / 'ticks.csv'
+    write_csv(src, [1.5, 2.25, 3.0])
+    df = tick_store.load_frame(src, parse_dates=['Timestamp IST'])
+    expected = pd.read_csv(src, parse_dates=['Timestamp IST'])
+    pd.testing.assert_frame_equal(df, expected, check_dtype=False)
+    assert df['Timestamp IST'].dtype.kind == 'M'
+
+
+def test_projection_is_memory_mapped(tmp_path):
+    src = tmp_path / 'ticks.csv'
+    write_csv(src, [1.0, 2.0])
+    cols = tick_store.load_columns(src, ['Execution Price'], parse_dates=['Timestamp IST'])
+    arr, _ = cols['Execution Price']
+    assert list(cols) == ['Execution Price']
+    assert isinstance(arr, np.memmap)
+
+
+def test_cache_rebuilt_only_when_content_changes(tmp_path, monkeypatch):
+    src = tmp_path / 'ticks.csv'
+    write_csv(src, [1.0, 2.0])
+    tick_store.load_frame(src)
+
+    builds = []
+    real_build = tick_store.build_cache
+    monkeypatch.setattr(tick_store, 'build_cache', lambda *a, **k: builds.append(1) or real_build(*a, **k))
+
+    st = os.stat(src)
+    os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    tick_store.load_frame(src)
+    assert builds == []
+
+    write_csv(src, [1.0, 2.0, 5.0])
+    df = tick_store.load_frame(src)
+    assert builds == [1]
+    assert list(df['Execution Price']) == [1.0, 2.0, 5.0]
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+import pytest
+from binance.client import Client
+from binance.exceptions import BinanceAPIException
+
+from src.metrics import InstrumentedClient, Metrics, metrics
+from src.rate_limit import OrderRateLimiter, RateLimitedClient, WeightLimiter
+from src.time_sync import TimeSync, install_signer, raw_client
+
+SECRET = 'stub-secret'
+
+
+class SkewedExchange(BaseHTTPRequestHandler):
+    """Futures stub whose clock runs ``server.skew_ms`` off ours and that checks signatures."""
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _now(self):
+        return int(time.time() * 1000) + self.server.skew_ms
+
+    def do_GET(self):
+        if self.path.startswith('/fapi/v1/time'):
+            self.server.time_calls += 1
+            return self._send(200, {'serverTime': self._now()})
+        self._send(404, {'code': -1, 'msg': 'not found'})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0)).decode()
+        payload, _, signature = body.rpartition('&signature=')
+        expected = hmac.new(SECRET.encode(), payload.encode(), hashlib.sha256).hexdigest()
+        if signature != expected:
+            return self._send(400, {'code': -1022, 'msg': 'Signature for this request is not valid.'})
+        params = dict(parse_qsl(payload))
+        now, ts = self._now(), int(params['timestamp'])
+        if ts > now + 1000 or now - ts > int(params.get('recvWindow', 5000)):
+            self.server.rejected += 1
+            return self._send(400, {'code': -1021, 'msg': 'Timestamp for this request is outside of the recvWindow.'})
+        self.server.accepted += 1
+        self._send(200, {'orderId': self.server.accepted, 'status': 'NEW', 'symbol': params['symbol']})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def exchange():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SkewedExchange)
+    server.skew_ms = -10000   # exchange 10 s behind this host
+    server.time_calls = server.rejected = server.accepted = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_client(server, registry=None):
+    raw = Client('stub-key', SECRET, ping=False)
+    raw.FUTURES_URL = 'http://127.0.0.1:%d/fapi' % server.server_address[1]
+    return RateLimitedClient(InstrumentedClient(raw, registry or Metrics()), WeightLimiter(), OrderRateLimiter())
+
+
+def order(client):
+    return client.futures_create_order(symbol='BTCUSDT', side='BUY', type='MARKET', quantity='0.01')
+
+
+def test_skewed_clock_is_rejected_until_synced(exchange):
+    client = make_client(exchange)
+    with pytest.raises(BinanceAPIException) as err:
+        order(client)
+    assert err.value.code == -1021
+
+    sync = TimeSync(client, samples=3)
+    offset = sync.sync()
+    assert abs(offset + 10000) < 250
+    assert raw_client(client).timestamp_offset == offset
+    assert order(client)['orderId'] == 1
+    assert exchange.time_calls == 3
+    assert abs(sync.now_ms() - (int(time.time() * 1000) - 10000)) < 250
+
+
+def test_timestamp_error_resyncs_and_retries_once(exchange):
+    exchange.skew_ms = 0
+    client = make_client(exchange)
+    client.time_sync = TimeSync(client, interval=3600).start()
+    before = metrics.endpoint('futures_create_order').retries
+    try:
+        assert order(client)['orderId'] == 1
+        exchange.skew_ms = -10000   # the host clock jumps ahead between syncs
+        assert order(client)['orderId'] == 2
+    finally:
+        client.time_sync.stop()
+    assert exchange.rejected == 1
+    assert client.time_sync.stats['resyncs'] == 1
+    assert metrics.endpoint('futures_create_order').retries - before == 1
+
+
+def test_cached_signer_matches_library_signature(exchange):
+    registry = Metrics()
+    client = make_client(exchange)
+    raw = raw_client(client)
+    signer = install_signer(client, SECRET, registry)
+    query = 'symbol=BTCUSDT&side=BUY&type=MARKET&quantity=0.01&timestamp=1700000000000'
+    assert signer.sign(query) == Client._hmac_signature(raw, query)
+    exchange.skew_ms = 0
+    for _ in range(5):
+        order(client)
+    assert exchange.accepted == 5       # the stub verified every signature
+    sign = registry.snapshot()['sign']
+    assert sign['calls'] == 6 and sign['weight'] == 0
+
+
+def test_timestamp_retry_does_not_need_max_retries(exchange):
+    raw = Client('stub-key', SECRET, ping=False)
+    raw.FUTURES_URL = 'http://127.0.0.1:%d/fapi' % exchange.server_address[1]
+    client = RateLimitedClient(InstrumentedClient(raw, Metrics()), WeightLimiter(), OrderRateLimiter(),
+                               max_retries=0)
+    client.time_sync = TimeSync(client)
+    assert order(client)['orderId'] == 1      # skewed: rejected, re-synced, retried
+    assert exchange.rejected == 1
+    exchange.skew_ms = -20000
+    client.time_sync = None
+    with pytest.raises(BinanceAPIException):  # nothing to re-sync with: the error surfaces
+        order(client)
+
+
+def test_async_client_resyncs_and_retries(exchange):
+    from binance import AsyncClient
+
+    async def scenario():
+        raw = AsyncClient('stub-key', SECRET)
+        raw.FUTURES_URL = 'http://127.0.0.1:%d/fapi' % exchange.server_address[1]
+        install_signer(raw, SECRET, Metrics())
+        client = RateLimitedClient(InstrumentedClient(raw, Metrics()), WeightLimiter(), OrderRateLimiter(),
+                                   max_retries=0)
+        client.time_sync = TimeSync(client, interval=3600)
+        try:
+            first = await order(client)        # skewed: rejected, re-synced, retried
+            exchange.skew_ms = -20000
+            await client.time_sync.start_async()
+            second = await order(client)       # synced up front: accepted first time
+            return first, second, raw.timestamp_offset
+        finally:
+            client.time_sync.stop()
+            await raw.close_connection()
+
+    first, second, offset = asyncio.run(scenario())
+    assert (first['orderId'], second['orderId']) == (1, 2)
+    assert exchange.rejected == 1 and abs(offset + 20000) < 250
+
+
+def test_signer_is_only_installed_on_known_releases(exchange, monkeypatch):
+    import binance
+    client = make_client(exchange)
+    monkeypatch.setattr(binance, '__version__', '1.1.0')
+    assert install_signer(client, SECRET, Metrics()) is None
+    assert '_hmac_signature' not in vars(raw_client(client))
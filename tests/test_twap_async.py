@@ -0,0 +1,56 @@
+import asyncio
+
+from src.advanced.twap_async import SimulatedClock, TwapEngine
+
+
+class FakeAsyncExchange:
+    def __init__(self, clock, latency=0.0, fail_at=None):
+        self.clock = clock
+        self.latency = latency
+        self.fail_at = fail_at
+        self.orders = []
+
+    async def futures_create_order(self, **kwargs):
+        if self.fail_at is not None and len(self.orders) == self.fail_at:
+            raise RuntimeError('rejected')
+        await self.clock.sleep(self.latency)
+        self.orders.append((self.clock.now(), kwargs))
+        return {'orderId': len(self.orders)}
+
+
+def test_slices_fire_on_absolute_deadlines():
+    clock = SimulatedClock()
+    ex = FakeAsyncExchange(clock, latency=0.4)
+    engine = TwapEngine(ex, clock=clock)
+    job = engine.submit('btcusdt', 'buy', 0.05, 5, 1.0)
+    asyncio.run(engine.run())
+
+    assert [s['deadline'] for s in job.slices] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert all(s['lag'] == 0.0 for s in job.slices)
+    assert all(abs(s['latency'] - 0.4) < 1e-9 for s in job.slices)
+    # no drift: the last fill lands one latency after its deadline, not 5 of them
+    assert abs(ex.orders[-1][0] - 4.4) < 1e-9
+    assert ex.orders[0][1] == {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'MARKET', 'quantity': 0.01}
+
+
+def test_many_jobs_interleave_in_one_loop():
+    clock = SimulatedClock()
+    ex = FakeAsyncExchange(clock, latency=0.1)
+    engine = TwapEngine(ex, clock=clock)
+    jobs = [engine.submit(f'SYM{i}USDT', 'SELL', 1, 10, 2.0 + i) for i in range(20)]
+    asyncio.run(engine.run())
+
+    assert len(ex.orders) == 200
+    assert [t for t, _ in ex.orders] == sorted(t for t, _ in ex.orders)
+    assert all(j.stats()['executed'] == 10 and j.stats()['max_lag'] == 0.0 for j in jobs)
+    assert clock.now() == 9 * 21.0 + 0.1
+
+
+def test_job_stops_on_error():
+    clock = SimulatedClock()
+    ex = FakeAsyncExchange(clock, fail_at=2)
+    engine = TwapEngine(ex, clock=clock)
+    job = engine.submit('BTCUSDT', 'BUY', 0.3, 3, 1.0)
+    asyncio.run(engine.run())
+    assert len(job.slices) == 2
+    assert job.stats()['error'] == 'rejected'
@@ -1,4 +1,5 @@
 import pytest
+from decimal import Decimal
 from src.validation import validate_symbol, validate_quantity, validate_price
 
 
@@ -65,3 +66,151 @@ def test_validate_price_tick_mismatch():
     symbol = make_symbol()
     ok, msg = validate_price(symbol, '100.005')
     assert not ok
+
+
+class CountingClient(FakeClient):
+    def __init__(self, symbols):
+        super().__init__(symbols)
+        self.calls = 0
+
+    def futures_exchange_info(self):
+        self.calls += 1
+        return super().futures_exchange_info()
+
+
+def test_validate_symbol_fetches_exchange_info_once():
+    from src.exchange_info import exchange_info_cache
+    client = CountingClient([make_symbol(), make_symbol('ETHUSDT')])
+    for _ in range(5):
+        assert validate_symbol(client, 'btcusdt')['symbol'] == 'BTCUSDT'
+    assert validate_symbol(client, 'XRPUSDT') is None
+    assert client.calls == 1
+    stats = exchange_info_cache(client).stats
+    assert stats['hits'] == 5 and stats['misses'] == 1
+
+
+def test_exchange_info_cache_refreshes_in_background_after_ttl():
+    from src.exchange_info import ExchangeInfoCache
+    now = [0.0]
+    client = CountingClient([make_symbol()])
+    cache = ExchangeInfoCache(client, ttl=10, clock=lambda: now[0])
+    assert cache.filters('BTCUSDT').step_size == Decimal('0.001')
+    now[0] = 11.0
+    client._symbols = [make_symbol(), make_symbol('ETHUSDT')]
+    # the stale index is still served while the refresh runs
+    assert cache.filters('BTCUSDT') is not None
+    cache._refresh_thread.join(timeout=1)
+    assert client.calls == 2
+    assert cache.filters('ETHUSDT') is not None
+
+
+def test_concurrent_first_lookups_share_one_fetch():
+    import threading
+    import time
+    from src.exchange_info import ExchangeInfoCache
+
+    class SlowClient(CountingClient):
+        def futures_exchange_info(self):
+            time.sleep(0.05)
+            return super().futures_exchange_info()
+
+    client = SlowClient([make_symbol()])
+    cache = ExchangeInfoCache(client)
+    found = []
+    threads = [threading.Thread(target=lambda: found.append(cache.filters('BTCUSDT'))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert client.calls == 1
+    assert len(found) == 8 and all(f is not None for f in found)
+
+
+def test_unknown_symbol_refreshes_once_per_interval():
+    from src.exchange_info import ExchangeInfoCache
+    now = [0.0]
+    client = CountingClient([make_symbol()])
+    cache = ExchangeInfoCache(client, ttl=300, clock=lambda: now[0], miss_refresh_interval=30)
+    assert cache.filters('BTCUSDT') is not None
+    client._symbols = [make_symbol(), make_symbol('NEWUSDT')]
+    # too soon after the first fetch: the miss is not allowed to refetch
+    assert cache.filters('NEWUSDT') is None and client.calls == 1
+    now[0] = 31.0
+    assert cache.filters('NEWUSDT') is not None and client.calls == 2
+    # a symbol that really is unknown costs at most one fetch per interval
+    for _ in range(5):
+        assert cache.filters('NOPEUSDT') is None
+    assert client.calls == 2
+    now[0] = 62.0
+    assert cache.filters('NOPEUSDT') is None and client.calls == 3
+
+
+def test_validate_with_parsed_filters():
+    from src.exchange_info import SymbolFilters
+    f = SymbolFilters(make_symbol())
+    assert validate_quantity(f, '0.005')[0]
+    assert not validate_quantity(f, '0.0025')[0]
+    assert validate_price(f, '100.00')[0]
+    assert not validate_price(f, '100.005')[0]
+
+
+def test_compiled_validator_agrees_with_decimal_path():
+    from src.validation import OrderValidator
+    symbol = make_symbol()
+    v = OrderValidator(symbol)
+    for qty in ('0.005', '0.0025', '0.0001', '1000', '1000.001', 0.3, 0.1 + 0.2, '12.345', 7):
+        assert v.check_qty(qty)[0] == validate_quantity(symbol, qty)[0], qty
+    for price in ('100.00', '100.005', '0.001', 30000.07, 0.1 + 0.2, '2000000'):
+        assert v.check_price(price)[0] == validate_price(symbol, price)[0], price
+
+
+def test_compiled_validator_snaps_to_filters():
+    from src.validation import OrderValidator
+    v = OrderValidator(make_symbol())
+    assert v.snap_qty(0.1 / 3) == '0.033'
+    assert v.snap_qty(0.29999999999999998) == '0.300'
+    assert v.snap_price(30000.056) == '30000.06'
+    assert v.snap_price('30000.054') == '30000.05'
+    with pytest.raises(ValueError):
+        v.snap_qty('0.0004')
+
+
+@pytest.mark.parametrize('total,slices,expected', [(0.3, 3, '0.100'), (0.7, 7, '0.100'),
+                                                   (0.6, 6, '0.100'), (0.9, 9, '0.100'), (1.0, 3, '0.333')])
+def test_snap_qty_ignores_float_noise_in_equal_slices(total, slices, expected):
+    from src.validation import OrderValidator
+    v = OrderValidator(make_symbol())
+    assert v.snap_qty(total / slices) == expected
+    assert v.snap_qty(total / slices) == format(round(total / slices, 3), '.3f')
+
+
+def test_prepare_order_uses_cached_filters():
+    from src.validation import prepare_order
+    client = CountingClient([make_symbol()])
+    for _ in range(5):
+        assert prepare_order(client, 'BTCUSDT', 0.0126, 101.234, 99.999) == ('0.012', '101.23', '100.00')
+    assert client.calls == 1
+    with pytest.raises(ValueError):
+        prepare_order(client, 'DOGEUSDT', 1)
+    # clients without exchange info pass values through untouched
+    assert prepare_order(object(), 'BTCUSDT', 0.0126) == (0.0126, None, None)
+
+
+def test_invalid_order_never_reaches_the_exchange(monkeypatch):
+    from src import market_orders
+
+    class OrderClient(FakeClient):
+        def __init__(self, symbols):
+            super().__init__(symbols)
+            self.orders = []
+
+        def futures_create_order(self, **params):
+            self.orders.append(params)
+            return {'orderId': len(self.orders)}
+
+    client = OrderClient([make_symbol()])
+    monkeypatch.setattr(market_orders, 'get_client', lambda: client)
+    assert market_orders.place_market_order('BTCUSDT', 'BUY', '0.0004') is None
+    assert client.orders == []
+    assert market_orders.place_market_order('BTCUSDT', 'BUY', 0.0126)['orderId'] == 1
+    assert client.orders[0]['quantity'] == '0.012'
@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.config as config
+from src.advanced import volume_profile
+from src.advanced.backtester import run_vwap, split_vwap
+from src.advanced.volume_profile import VolumeProfile, build_profile, coin_for
+from src.advanced.vwap import IST_OFFSET, vwap_order
+
+
+def ticks(days=3, seed=0):
+    """One tick a minute; the 09:00-10:00 hour trades 20x the size of the rest of the day."""
+    ts = pd.date_range('2024-01-01', periods=days * 1440, freq='min')
+    busy = (ts.hour == 9)
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Timestamp IST': ts,
+        'Execution Price': 100 + rng.standard_normal(len(ts)).cumsum() * 0.01,
+        'Size Tokens': np.where(busy, 20.0, 1.0),
+        'Coin': np.where(np.arange(len(ts)) % 2, 'BTC', 'ETH'),
+    })
+
+
+def test_profile_buckets_by_time_of_day_and_symbol():
+    df = ticks(days=2)
+    p = VolumeProfile(bucket_minutes=60).add(df['Timestamp IST'], df['Size Tokens'], df['Coin'])
+    w = p.weights()
+    assert w.shape == (24,) and w.sum() == pytest.approx(1.0)
+    assert w[9] == pytest.approx(20 / 43)
+    assert p.volume['BTC'].sum() + p.volume['ETH'].sum() == pytest.approx(p.volume['*'].sum())
+    # unknown symbols fall back to the all-symbol profile
+    assert np.allclose(p.weights('DOGE'), w)
+
+
+def test_schedule_follows_volume_and_wraps_midnight():
+    df = ticks(days=1)
+    p = VolumeProfile(bucket_minutes=60).add(df['Timestamp IST'], df['Size Tokens'])
+    # 08:00-10:00 in two slices: quiet hour then busy hour
+    assert np.allclose(p.schedule(8 * 60, 120, 2), [1 / 21, 20 / 21])
+    # 23:00-01:00 crosses midnight: both hours are quiet
+    assert np.allclose(p.schedule(23 * 60, 120, 2), [0.5, 0.5])
+    assert np.allclose(VolumeProfile().schedule(0, 60, 4), 0.25)
+
+
+def test_build_is_cached_and_incremental(tmp_path, monkeypatch):
+    path = tmp_path / 'ticks.csv'
+    df = ticks(days=2)
+    df.iloc[:1440].to_csv(path, index=False)
+    first = build_profile(path, bucket_minutes=60)
+    assert first.rows == 1440
+
+    parsed = []
+    real = volume_profile._read_rows
+    monkeypatch.setattr(volume_profile, '_read_rows',
+                        lambda fh, start, end, *a: parsed.append(end - start) or real(fh, start, end, *a))
+    assert build_profile(path, bucket_minutes=60).rows == 1440
+    assert parsed == []   # nothing appended, nothing parsed
+
+    with open(path, 'a') as fh:
+        fh.write(df.iloc[1440:].to_csv(index=False, header=False))
+        fh.write('2024-01-03 00:00:00,100.0')   # half-written last line
+    grown = build_profile(path, bucket_minutes=60)
+    assert len(parsed) == 1 and parsed[0] < path.stat().st_size / 2 + 100
+    full = VolumeProfile(60).add(df['Timestamp IST'], df['Size Tokens'], df['Coin'])
+    assert grown.rows == 2880
+    for sym in ('*', 'BTC', 'ETH'):
+        assert np.allclose(grown.volume[sym], full.volume[sym])
+
+    # a rewritten file does not match the fingerprint and is rebuilt from scratch
+    df.iloc[:100].to_csv(path, index=False)
+    assert build_profile(path, bucket_minutes=60).rows == 100
+
+
+def test_backtest_vwap_beats_twap_on_uneven_volume():
+    df = ticks(days=1)
+    # 08:00-11:00 so one slice in three lands in the busy hour
+    window = df[(df['Timestamp IST'].dt.hour >= 8) & (df['Timestamp IST'].dt.hour < 11)].reset_index(drop=True)
+    profile = VolumeProfile().add(df['Timestamp IST'], df['Size Tokens'])
+    res = run_vwap(window, total_qty=300, intervals=36, slippage_pct=0.0, fee_pct=0.0,
+                   impact_pct=1.0, profile=profile)
+    assert res['vwap']['executions']['qty'].sum() == pytest.approx(300)
+    assert res['twap']['max_participation'] > res['vwap']['max_participation']
+    assert res['improvement_bps'] > 0
+    # SELL slippage is measured the other way round
+    sell = run_vwap(window, 300, 36, side='SELL', slippage_pct=0.0, fee_pct=0.0, impact_pct=1.0, profile=profile)
+    assert sell['vwap']['avg_price'] < sell['market_vwap']
+
+
+def test_split_vwap_profiles_only_the_training_ticks():
+    df = ticks(days=3)
+    # the scored day trades heavily at 15:00, which the training days never do
+    test_day = df['Timestamp IST'] >= '2024-01-03'
+    df.loc[test_day & (df['Timestamp IST'].dt.hour == 15), 'Size Tokens'] = 500.0
+    res = split_vwap(df, 100, 24, train_until='2024-01-03', slippage_pct=0.0, fee_pct=0.0)
+    assert res['train_until'] == pd.Timestamp('2024-01-03') and not res['in_sample']
+    assert (res['vwap']['executions']['ts'] >= '2024-01-03').all()
+    train = df[~test_day]
+    expected = VolumeProfile().add(train['Timestamp IST'], train['Size Tokens'], train['Coin'])
+    assert np.allclose(res['vwap']['executions']['qty'], 100 * expected.schedule(0, 1439, 24))
+    with pytest.raises(ValueError):
+        split_vwap(df, 100, 24, train_until='2023-12-31')
+
+
+def test_exchange_symbols_map_to_history_coins(caplog):
+    ts = pd.date_range('2024-01-01 09:00', periods=120, freq='min')
+    p = VolumeProfile(bucket_minutes=60).add(ts, np.ones(120), np.where(ts.hour == 9, 'BTC', 'ETH'))
+    assert np.allclose(p.weights('BTCUSDT'), p.weights('BTC'))
+    assert p.weights('BTCUSDT')[9] == 1.0
+    with caplog.at_level('WARNING'):
+        assert np.allclose(p.weights('DOGEUSDT'), p.weights())
+    assert 'DOGEUSDT' in caplog.text
+
+    class Info:
+        def futures_exchange_info(self):
+            return {'symbols': [{'symbol': '1000PEPEUSDT', 'baseAsset': '1000PEPE', 'quoteAsset': 'USDT',
+                                 'filters': []}]}
+    assert coin_for('1000pepeusdt', Info()) == '1000PEPE'
+    assert coin_for('ETHUSDC') == 'ETH' and coin_for('BTC') == 'BTC'
+
+
+class FakeClient:
+    def __init__(self, kline_volume=1000.0):
+        self.orders = []
+        self.kline_volume = kline_volume
+
+    def futures_create_order(self, **params):
+        self.orders.append(params)
+        return dict(params, orderId=len(self.orders))
+
+    def futures_klines(self, **params):
+        return [[0, '1', '1', '1', '1', str(self.kline_volume / params['limit'])]] * params['limit']
+
+
+class Clock:
+    def __init__(self, start):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def start_at_ist(hour):
+    # epoch seconds at ``hour``:00 IST on 2024-01-01
+    return pd.Timestamp('2024-01-01 %02d:00' % hour).timestamp() - IST_OFFSET
+
+
+def test_vwap_order_sizes_slices_from_the_profile():
+    df = ticks(days=1)
+    profile = VolumeProfile(bucket_minutes=60).add(df['Timestamp IST'], df['Size Tokens'])
+    client, clock = FakeClient(), Clock(start_at_ist(8))
+    with config.use_client(client):
+        res = vwap_order('btcusdt', 'BUY', '2.1', 7200, 2, profile=profile, clock=clock, sleep=clock.sleep)
+    assert [o['quantity'] for o in client.orders] == [0.1, 2.0]
+    assert res['sent'] == pytest.approx(2.1) and res['remaining'] == 0
+    assert clock.now == start_at_ist(8) + 3600   # absolute deadlines, no drift
+
+
+def test_vwap_participation_cap_carries_and_reports_remainder():
+    profile = VolumeProfile(bucket_minutes=60)
+    client, clock = FakeClient(kline_volume=10.0), Clock(start_at_ist(0))
+    with config.use_client(client):
+        res = vwap_order('BTCUSDT', 'SELL', 3, 180, 3, profile=profile, max_participation=0.1,
+                         clock=clock, sleep=clock.sleep)
+    assert [o['quantity'] for o in client.orders] == [1.0, 1.0, 1.0]
+
+    client, clock = FakeClient(kline_volume=5.0), Clock(start_at_ist(0))
+    with config.use_client(client):
+        res = vwap_order('BTCUSDT', 'SELL', 3, 180, 3, profile=profile, max_participation=0.1,
+                         clock=clock, sleep=clock.sleep)
+    assert [o['quantity'] for o in client.orders] == [0.5, 0.5, 0.5]
+    assert res['remaining'] == pytest.approx(1.5)